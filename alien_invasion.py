@@ -1,3 +1,4 @@
+import os
 import sys
 import pygame
 from settings import Settings
@@ -5,9 +6,19 @@ from game_stats import GameStats
 from dragon import Dragon
 from arsenal import DragonArsenal
 from white_walker_army import WhiteWalkerArmy
-from time import sleep
+from time import sleep, perf_counter
 from button import Button
 from hud import HUD
+from tracing import Tracer, NullTracer
+from profiling import FrameProfiler, SamplingProfiler
+from memory_tracker import MemoryTracker, NullMemoryTracker
+from state_sync import StateSyncServer, NullSyncServer
+from video_capture import VideoCapture
+from render_backends import BACKENDS
+from quality_governor import QualityGovernor, NullQualityGovernor
+from particles import Particles
+from score_writer import write_atomic
+import save_state
 
 class WhiteWalkerInvasion:
     """Overall class to manage game assets and behavior.
@@ -19,7 +30,9 @@ class WhiteWalkerInvasion:
     
     Attributes:
         settings (Settings): Game configuration object with all settings.
-        screen (pygame.Surface): Main display surface for the game.
+        backend (SurfaceBackend | TextureBackend): Draws frames onto the window.
+        screen (pygame.Surface): Main surface the game is laid out on (the
+            display surface with the 'surface' backend).
         bg (pygame.Surface): Scaled background image surface.
         game_stats (GameStats): Tracks score, level, lives, and high score.
         HUD (HUD): Heads-up display for scores, level, and lives.
@@ -27,33 +40,110 @@ class WhiteWalkerInvasion:
         clock (pygame.time.Clock): Used to regulate the frame rate.
         element_sound (pygame.mixer.Sound): Sound effect when the dragon shoots.
         impact_sound (pygame.mixer.Sound): Sound effect when a White Walker is hit.
+        impact_voices (int | None): Most impact sounds played at once (None for
+            no limit).
         dragon (Dragon): Player-controlled dragon instance.
+        game_mode (str): 'levels' or 'endless' (walkers stream in from the
+            right edge in waves, see waves.py).
+        collision_mode (str): How elements hit walkers, 'discrete' (overlap
+            at the end of a tick) or 'swept' (anywhere along their paths, see
+            `WhiteWalkerArmy.check_collisions`).
+        frame_number (int): Frames simulated so far, the clock the paths of
+            swept collisions are timed by.
         white_walker_army (WhiteWalkerArmy): Manager for all White Walker enemies.
         play_button (Button): Button used to start or restart the game.
+        particles (Particles): Ice-shatter and fire-burst effects of walker deaths.
         game_active (bool): Whether the game is currently active (playing) or not.
+        headless (bool): Whether the game runs without a visible window or sound.
+        tracer (Tracer | NullTracer): Records per-frame timing spans and events.
+        frame_profiler (FrameProfiler): cProfile session over a number of frames.
+        sampling_profiler (SamplingProfiler): Low-overhead stack sampler.
+        memory_tracker (MemoryTracker | NullMemoryTracker): Per-level memory reports.
+        sync_server (StateSyncServer | NullSyncServer): Publishes the game state
+            to local clients every frame.
+        video_capture (VideoCapture): Records rendered frames to disk.
+        quality_governor (QualityGovernor | NullQualityGovernor): Lowers the
+            quality when frames run over budget.
+        pause_time (float): Seconds the current frame spent in the pause after
+            a lost life, which is left out of the frame time the governor sees.
     """
 
-    def __init__(self):
+    def __init__(self, headless: bool = False):
         """Initialize the game, and create game resources.
 
         This method initializes pygame, loads settings, creates the main
         display surface, loads the background image, sets up game statistics,
         the HUD, clock, mixer, sounds, player dragon, enemy army, and the
         Play button. It also sets the initial game state flags.
+
+        Args:
+            headless (bool): If True, use SDL's dummy video and audio drivers,
+                skip loading sounds and skip the pause after a lost life, so
+                the game can be driven programmatically (e.g. by the batch
+                runner) without a display.
         """
         
+        self.headless = headless
+        if self.headless:
+            # The dummy drivers must be selected before pygame is initialized.
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ['SDL_AUDIODRIVER'] = 'dummy'
+            # Leave SIGINT/SIGTERM alone so worker processes can be stopped.
+            os.environ['SDL_NO_SIGNAL_HANDLERS'] = '1'
+
         pygame.init() # Initialize all imported pygame modules.
         
         # Load game settings and initialize game statistics.
         self.settings = Settings()
         self.settings.initialize_dynamic_settings()
-        # Set up the main game screen (display surface).
-        self.screen = pygame.display.set_mode(
-            (self.settings.screen_width, self.settings.screen_height))
-        
-        pygame.display.set_caption(self.settings.name) # Set the window title.
+
+        # Record a Chrome trace when a trace file is given (WW_TRACE overrides settings).
+        trace_file = os.environ.get('WW_TRACE', self.settings.trace_file)
+        if trace_file:
+            self.tracer = Tracer(trace_file, self.settings.trace_capacity)
+        else:
+            self.tracer = NullTracer()
+
+        # Profilers, started with F9 (cProfile) / F10 (sampling) or by WW_PROFILE.
+        self.frame_profiler = FrameProfiler(self.settings.profile_dir,
+                                            self.settings.profile_frames)
+        self.sampling_profiler = SamplingProfiler(self.settings.profile_dir,
+                                                  self.settings.sample_interval)
+        self._start_profiling_from_env()
+
+        # Report memory per level when a report file is given (WW_MEMTRACK overrides settings).
+        memory_report = os.environ.get('WW_MEMTRACK', self.settings.memory_report_file)
+        if memory_report:
+            self.memory_tracker = MemoryTracker(memory_report,
+                                                self.settings.memory_trace_frames)
+        else:
+            self.memory_tracker = NullMemoryTracker()
+
+        # Publish the game state when a sync address is given (WW_SYNC overrides settings).
+        sync_address = os.environ.get('WW_SYNC', self.settings.sync_address)
+        if sync_address:
+            self.sync_server = StateSyncServer(sync_address, self.settings.sync_quantum)
+        else:
+            self.sync_server = NullSyncServer()
+
+        # Open the window with the rendering backend, drawing at the internal
+        # resolution scale (WW_RENDERER and WW_RENDER_SCALE override settings).
+        backend = os.environ.get('WW_RENDERER', self.settings.render_backend)
+        render_scale = os.environ.get('WW_RENDER_SCALE', self.settings.render_scale)
+        self.backend = BACKENDS[backend](self, render_scale)
+        self.screen = self.backend.screen # Surface the sprites and HUD are laid out on.
+
+        # Gameplay capture, toggled with F11 or started by WW_CAPTURE=<mode>.
+        capture_mode = os.environ.get('WW_CAPTURE')
+        self.video_capture = VideoCapture(self.settings.capture_dir,
+                                          capture_mode or self.settings.capture_mode,
+                                          self.settings.capture_pool_size,
+                                          self.settings.FPS)
+        if capture_mode:
+            self.video_capture.start(self.backend.read_frame())
 
         # Load and scale the background image.
+        self.tracer.instant('asset_load', {'file': self.settings.bg_file.name})
         self.bg: pygame.Surface = pygame.image.load(self.settings.bg_file)
         self.bg = pygame.transform.scale(self.bg,
              (self.settings.screen_width, self.settings.screen_height))
@@ -63,22 +153,37 @@ class WhiteWalkerInvasion:
         self.running = True # variable to control the main game loop.
         self.clock = pygame.time.Clock() # Object to manage timing and frame rate.
 
-        # Initialize the mixer for sound effects.
-        pygame.mixer.init()
-        
-        # Load and set volume for the dragon's element sound.
-        self.element_sound = pygame.mixer.Sound(self.settings.element_sound)
-        self.element_sound.set_volume(0.7)
-        
-        # Load and set volume for the impact sound (White Walker dies).
-        self.impact_sound = pygame.mixer.Sound(self.settings.impact_sound)
-        self.impact_sound.set_volume(0.7)
+
+        # Headless games are silent, so the sounds are never loaded.
+        self.element_sound = None
+        self.impact_sound = None
+        if not self.headless:
+            # Initialize the mixer for sound effects.
+            pygame.mixer.init()
+            
+            self.tracer.instant('asset_load', {'file': self.settings.element_sound.name})
+            self.tracer.instant('asset_load', {'file': self.settings.impact_sound.name})
+
+            # Load and set volume for the dragon's element sound.
+            self.element_sound = pygame.mixer.Sound(self.settings.element_sound)
+            self.element_sound.set_volume(0.7)
+            
+            # Load and set volume for the impact sound (White Walker dies).
+            self.impact_sound = pygame.mixer.Sound(self.settings.impact_sound)
+            self.impact_sound.set_volume(0.7)
+        self.impact_voices = None
         
         
+        # How elements hit walkers (WW_COLLISIONS overrides settings).
+        self.collision_mode = os.environ.get('WW_COLLISIONS', self.settings.collision_mode)
+        self.frame_number = 0
+
         # Create the Dragon instance, passing the game and a new DragonArsenal for its projectiles.
         self.dragon = Dragon(self, DragonArsenal(self))
         
-        # Create the WhiteWalkerArmy instance to manage all enemies.
+        # Create the WhiteWalkerArmy instance to manage all enemies, in levels or
+        # endless mode (WW_GAME_MODE overrides settings).
+        self.game_mode = os.environ.get('WW_GAME_MODE', self.settings.game_mode)
         self.white_walker_army = WhiteWalkerArmy(self)
         
         # Populate the screen with White Walkers.
@@ -86,9 +191,24 @@ class WhiteWalkerInvasion:
         
         # Create the Play button.
         self.play_button = Button(self, "Play") 
+
+        # Particle effects shown when walkers are destroyed.
+        self.particles = Particles(self)
         
         # Flag to indicate if the game is currently running (not paused or game over).
         self.game_active = False 
+
+        # Adapt the quality to the frame time if enabled (WW_ADAPTIVE_QUALITY overrides settings).
+        adaptive_quality = os.environ.get('WW_ADAPTIVE_QUALITY')
+        if adaptive_quality is None:
+            adaptive_quality = self.settings.adaptive_quality
+        else:
+            adaptive_quality = adaptive_quality not in ('', '0')
+        if adaptive_quality:
+            self.quality_governor = QualityGovernor(self)
+        else:
+            self.quality_governor = NullQualityGovernor()
+        self.pause_time = 0.0
     
     def run_game(self):
         """Start and manage the main loop for the game.
@@ -96,95 +216,190 @@ class WhiteWalkerInvasion:
         This loop runs while `self.running` is True. It repeatedly:
         - Processes user input events.
         - Updates the dragon, army, and collision logic when the game is active.
+        - Publishes the game state to state sync clients (if enabled).
         - Redraws the screen.
+        - Reports the frame's work time (without any pause after a lost
+          life) to the quality governor.
         - Regulates the frame rate using the settings FPS value.
+
+        Each phase is recorded as a span by the tracer (if tracing is on).
         """
         
+        tracer = self.tracer
         while self.running:
+            tracer.begin('frame')
+            start = perf_counter()
             
             # Checking for user input
-            self._check_events() 
+            with tracer.span('_check_events'):
+                self._check_events() 
             if self.game_active:
-                self.dragon.update() # Update the dragon's position and arsenal.
-                self.white_walker_army.update_army() # Update the White Walker army's position.
-                self._check_collisions() # Check for all in-game collisions.
+                self.step() # Advance the game simulation by one frame.
+            with tracer.span('sync.publish'):
+                self.sync_server.publish(self) # Send the state to spectators.
                 
-            self._update_screen() # Redraw the screen elements.
-            self.clock.tick(self.settings.FPS) # Limit the frame rate to the defined FPS.
+            with tracer.span('_update_screen'):
+                self._update_screen() # Redraw the screen elements.
+            self.quality_governor.frame(perf_counter() - start - self.pause_time)
+            self.pause_time = 0.0
+            with tracer.span('clock.tick'):
+                self.clock.tick(self.settings.FPS) # Limit the frame rate to the defined FPS.
+            tracer.end('frame')
+            self.frame_profiler.frame() # Count the frame for a cProfile session.
+
+    def _start_profiling_from_env(self):
+        """Start profiling at launch if the WW_PROFILE variable asks for it.
+
+        WW_PROFILE=sample starts the sampling profiler for the whole
+        session. WW_PROFILE=<frames> runs cProfile for that many frames.
+        """
+        
+        mode = os.environ.get('WW_PROFILE')
+        if not mode:
+            return
+        if mode == 'sample':
+            self.sampling_profiler.start()
+        else:
+            self.frame_profiler.frames = int(mode)
+            self.frame_profiler.start()
+
+    def step(self, frames: int = 1):
+        """Advance the game simulation by one tick of `frames` frames.
+
+        Every frame updates the dragon (and its projectiles) and moves the
+        White Walker army; all collisions are resolved once, at the end of
+        the tick. It does not poll events, draw or wait on the clock, so it
+        can also be called directly by headless drivers such as the batch
+        runner, which can step several frames per tick to save time (--tick).
+
+        Swept collisions test straight paths, so elements are also resolved
+        around every frame in which the army drops: they then hit the same
+        walkers at the same moments whatever the tick length.
+
+        Args:
+            frames (int): Number of frames in the tick.
+        """
+        
+        tracer = self.tracer
+        army = self.white_walker_army
+        for frame in range(frames):
+            self.frame_number += 1
+            with tracer.span('Dragon.update'):
+                self.dragon.update() # Update the dragon's position and arsenal.
+            with tracer.span('WhiteWalkerArmy.update_army'):
+                army.update_army() # Update the White Walker army's position.
+            # A drop bends the walkers' paths: resolve elements before it (when the
+            # army is at an edge) and after it.
+            if (frame < frames - 1 and self.collision_mode == 'swept'
+                    and (army.dropped or army.at_edge())):
+                with tracer.span('_check_element_hits'):
+                    self._check_element_hits()
+        with tracer.span('_check_collisions'):
+            self._check_collisions() # Check for all in-game collisions.
 
     def _check_collisions(self):
         """Handle all collision checks and their consequences.
 
         This method checks:
-        - Collisions between the dragon and any White Walker, updating game
-          status and lives as needed.
-        - Whether any White Walker has reached the left edge, which triggers
-          a life loss or game over.
+        - Collisions between the dragon and any White Walker or ice shot, and
+          whether any White Walker has reached the left edge. Any of them
+          costs one life (or ends the game), however many happen in a tick.
         - Collisions between dragon projectiles and White Walkers, updating
           score, playing sound effects, and updating the HUD.
-        - Whether the entire army has been destroyed, in which case a new
-          level starts and difficulty is increased.
+        - Whether the entire army has been destroyed (in endless mode, whether
+          a level's waves have all been sent), in which case a new level
+          starts and difficulty is increased.
         """
         
-        # Check for collision between the Dragon and any White Walker.
-        if self.dragon.check_collision(self.white_walker_army.army):
+        # A life is lost (at most once per tick) if a White Walker collides with
+        # the Dragon (which resets the Dragon), if any White Walker has reached
+        # the left edge of the screen, or if an ice shot has hit the Dragon.
+        army = self.white_walker_army
+        if (self.dragon.check_collision(army.army)
+                or army.check_left_edge()
+                or army.ice_shots.check_hit(self.dragon.rect)):
             # Handle loss of a life/game over.
-            # If a collision occurred, the Dragon is reset
-            self._check_game_status() 
-
-        # Check if any White Walker has reached the left edge of the screen
-        # (game-resetting condition).
-        if self.white_walker_army.check_left_edge():
             self._check_game_status()
 
-        # This function handles the destruction of both element and walker upon collision
-        collisions = self.white_walker_army.check_collisions(self.dragon.arsenal.arsenal)
-        
-        if collisions:
-            # If any collision occurred, play the impact sound.
-            self.impact_sound.play()
-            self.impact_sound.fadeout(1250) 
-            self.game_stats.update(collisions) # Update score and max score.
-            self.HUD.update_scores()
+        self._check_element_hits()
 
         # Check if the entire White Walker army has been destroyed.
         if self.white_walker_army.check_destroyed_status():
-            #resets and recreates the army
-            self._reset_level()
-            self.settings.increase_difficulty() # Increase game difficulty. 
+            # Increase game difficulty first: the new army's formation depends on the level.
+            self.settings.increase_difficulty()
+            if self.white_walker_army.spawner is None:
+                #resets and recreates the army (endless mode keeps the walkers streaming in)
+                self._reset_level()
             
             # update level in game stats
             self.game_stats.update_level()
+            self.tracer.instant('level_up', {'level': self.game_stats.level})
+            self.memory_tracker.snapshot('level_up', self.game_stats.level)
+            self.game_stats.checkpoint() # Save progress in the background.
             
             # update HUD view
             self.HUD.update_level()
         
+    def _check_element_hits(self):
+        """Resolve the dragon's elements and beam against the walkers.
+
+        Walkers destroyed by a hit shatter into particles (unless the game is
+        headless), and the score and HUD are updated.
+        """
+
+        # This function handles the destruction of both element and walker upon collision
+        collisions = self.white_walker_army.check_collisions(self.dragon.arsenal.arsenal)
+        # A beam fired since the last check destroys the first walker in its way.
+        collisions.update(self.white_walker_army.check_beam(self.dragon.arsenal))
+        
+        if collisions:
+            # If any collision occurred, play the impact sound.
+            self._play_sound(self.impact_sound, self.impact_voices)
+            # Particles only move when frames are drawn, which headless games never do.
+            if not self.headless:
+                for walker in collisions:
+                    # The walker shatters into ice where the fire hit it.
+                    self.particles.emit('ice_shatter', walker.rect.center)
+                    self.particles.emit('fire_burst', walker.rect.midleft)
+            self.game_stats.update(collisions) # Update score and max score.
+            self.HUD.update_scores()
+
     def _check_game_status(self):
         """Handle the consequence of the dragon or army reaching a critical state.
 
         If the dragon still has remaining lives, this method decrements the
         lives counter, resets the level (army and projectiles), and briefly
         pauses the game. If there are no lives left, it marks the game as
-        inactive, which stops updates and shows the Play button.
+        inactive, which stops updates and shows the Play button. A game
+        that is already over is left alone, so a run is only recorded once.
 
         Returns:
             None
         """
         
+        if not self.game_active:
+            return # The game already ended in this frame.
+        self.tracer.instant('life_lost', {'dragons_left': self.game_stats.dragons_left})
         # If the dragon has lives remaining.
         if self.game_stats.dragons_left > 0:
             self.game_stats.dragons_left -= 1 
             self._reset_level() # Clear the screen and create a new army.
-            sleep(0.75) # Pause the game briefly to give the player time to react.
+            if not self.headless:
+                pause_start = perf_counter()
+                sleep(0.75) # Pause the game briefly to give the player time to react.
+                self.pause_time += perf_counter() - pause_start # Not work: keep it out of the frame time.
         else:
-            # No lives left, end the game.
+            # No lives left, end the game and store the finished run.
             self.game_active = False
+            self.game_stats.record_run()
+            self.game_stats.checkpoint()
 
     def _reset_level(self):
         """Reset game elements (projectiles and army) for a new life or level.
 
         This method:
         - Clears all active dragon projectiles.
+        - Clears the walkers' ice shots and the particle effects.
         - Clears the existing White Walker army.
         - Recreates a fresh army formation.
 
@@ -192,7 +407,9 @@ class WhiteWalkerInvasion:
         """
         
         self.dragon.arsenal.arsenal.empty() # Clear all existing projectiles.
-        self.white_walker_army.army.empty() # Clear all existing White Walkers.
+        self.white_walker_army.ice_shots.clear() # Clear all ice shots.
+        self.particles.clear() # Clear the particle effects.
+        self.white_walker_army.empty() # Clear all existing White Walkers.
         self.white_walker_army.create_army() # Reset formation of White Walkers.
 
     def restart_game(self):
@@ -211,41 +428,37 @@ class WhiteWalkerInvasion:
         self.settings.initialize_dynamic_settings() # set up dynamic settings
         self.game_stats.reset_stats() # restart game statistics
         self.HUD.update_scores()# update scoreboard images (HUD)
+        if self.white_walker_army.spawner is not None:
+            self.white_walker_army.spawner.restart(1) # start the endless waves over
         self._reset_level() # reset the level
         self.dragon._center_dragon() # recenter the dragon
+        self.memory_tracker.snapshot('restart', self.game_stats.level)
         
         self.game_active = True
         pygame.mouse.set_visible(False) # Hide the mouse cursor.
 
     def _update_screen(self):
-        """Update images on the screen, and flip to the new screen.
-
-        Draws, in order:
-        - The background image.
-        - The dragon and its projectiles.
-        - All White Walkers.
-        - The HUD (score, lives, level).
-        - The Play button, if the game is inactive.
+        """Draw the frame with the rendering backend and show it.
 
-        Finally, it flips the display to show the newly drawn frame.
+        The backend draws the HUD's static layer, the dragon and its
+        projectiles, the army, the rest of the HUD and, if the game is
+        inactive, the Play button and leaderboard (see render_backends.py).
         """
         
-        self.screen.blit(self.bg, (0, 0)) # Draw the background image.
-        self.dragon.draw() # Draw the dragon and its projectiles.
-        self.white_walker_army.draw() # Draw all White Walkers.
-        self.HUD.draw() # Draw the HUD (score, lives, level).
-
+        self.HUD.refresh_scores() # Render score texts whose update was held back.
+        self.particles.update() # Move the particles drawn in this frame.
+        self.backend.draw_frame()
         if not self.game_active:
-            self.play_button.draw() # Draw the Play button if the game is inactive.
             pygame.mouse.set_visible(True) # Show the mouse cursor.
-        
-        pygame.display.flip() # Make the most recently drawn screen visible.
+        if self.video_capture.active:
+            self.video_capture.capture(self.backend.read_frame()) # Record the frame.
 
     def _check_events(self):
         """Respond to keypresses and mouse/window events.
 
         This method polls pygame's event queue and:
         - Handles window quit events by stopping the game and saving scores.
+        - Resumes the saved game when F6 is pressed.
         - Delegates keydown events to `_check_keydown_events` when the game is active.
         - Delegates keyup events to `_check_keyup_events`.
         - Handles mouse button clicks by checking if the Play button was pressed.
@@ -253,10 +466,9 @@ class WhiteWalkerInvasion:
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                self.running = False # Stop the main game loop.
-                self.game_stats.save_scores()
-                pygame.quit() # Uninitialize pygame modules.
-                sys.exit() # Exit the program.
+                self._quit_game()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F6:
+                self._load_game() # Resume the saved game, also from the menu.
             elif event.type == pygame.KEYDOWN and self.game_active == True:
                 self._check_keydown_events(event) # Handle key press (down) events.
             elif event.type == pygame.KEYUP:
@@ -305,7 +517,11 @@ class WhiteWalkerInvasion:
         is active. It:
         - Starts upward or downward movement of the dragon when arrow keys
           are pressed.
-        - Attempts to fire a projectile when the space bar is pressed.
+        - Attempts to fire the current weapon when the space bar is pressed.
+        - Switches between the element and beam weapons when 'b' is pressed.
+        - Starts a cProfile session (F9) or toggles the sampling profiler (F10).
+        - Starts or stops gameplay capture (F11).
+        - Saves the game (F5), so it can be resumed with F6.
         - Quits the game when 'q' is pressed.
 
         Args:
@@ -323,14 +539,92 @@ class WhiteWalkerInvasion:
            
             # Attempt to shoot a projectile. The shoot() method handles rate limiting.
             if self.dragon.shoot():
-                self.element_sound.play() # Play the shooting sound.
-                self.element_sound.fadeout(1250) 
+                self._play_sound(self.element_sound) # Play the shooting sound.
+        elif event.key == pygame.K_b:
+            self.dragon.arsenal.toggle_weapon() # Switch between elements and the beam.
+        elif event.key == pygame.K_F9:
+            # Profile the next `profile_frames` frames with cProfile.
+            self.frame_profiler.start()
+        elif event.key == pygame.K_F10:
+            # Start, or stop and save, the sampling profiler.
+            self.sampling_profiler.toggle()
+        elif event.key == pygame.K_F5:
+            self._save_game() # Quick save.
+        elif event.key == pygame.K_F11:
+            # Start, or stop and finish writing, a gameplay capture.
+            self.video_capture.toggle(self.backend.read_frame())
         elif event.key == pygame.K_q:
             # 'q' is a shortcut to quit the game.
-            self.running = False
-            self.game_stats.save_scores()
-            pygame.quit()
-            sys.exit()
+            self._quit_game()
+
+    def _save_game(self):
+        """Write a save state of the game to `settings.save_state_file`.
+
+        Returns:
+            bool: True if the game was saved.
+        """
+        
+        if self.headless:
+            return False # Headless games never touch the player's files.
+        write_atomic(self.settings.save_state_file, save_state.snapshot(self))
+        self.tracer.instant('save_state')
+        return True
+
+    def _load_game(self):
+        """Resume the game saved in `settings.save_state_file`, if there is one.
+
+        The save is deleted once loaded, so the run it holds is only resumed
+        (and eventually recorded) once.
+        """
+        
+        path = self.settings.save_state_file
+        if self.headless or not path.exists():
+            return
+        try:
+            save_state.restore(self, path.read_bytes())
+        except ValueError as e:
+            print(f"Could not load {path}: {e}")
+            return
+        path.unlink(missing_ok=True)
+        self.tracer.instant('load_state')
+        pygame.mouse.set_visible(not self.game_active)
+
+    def _quit_game(self):
+        """Save the game (if playing) and scores, write the trace (if tracing), and exit.
+
+        A game in progress that was saved is not recorded as a finished run:
+        it is recorded when it ends after being resumed.
+        """
+        
+        self.running = False # Stop the main game loop.
+        # Keep the game in progress, to resume with F6.
+        saved = self.game_active and self._save_game()
+        self.game_stats.save_scores(record=not saved)
+        self.tracer.dump() # Write the recorded trace, if tracing is on.
+        self.sync_server.close() # Disconnect spectators.
+        # Save any profiling still in progress.
+        self.frame_profiler.stop()
+        self.sampling_profiler.stop()
+        self.video_capture.stop() # Finish writing any capture in progress.
+        pygame.quit() # Uninitialize pygame modules.
+        sys.exit() # Exit the program.
+
+    def _play_sound(self, sound, voices=None):
+        """Play a sound effect and fade it out, if sounds are loaded.
+
+        Args:
+            sound (pygame.mixer.Sound | None): The sound to play. None is
+                ignored, which is the case for headless games.
+            voices (int | None): If given, the sound is skipped while this
+                many copies of it are already playing.
+        """
+        
+        if sound is None:
+            return
+        if voices is not None and sound.get_num_channels() >= voices:
+            return
+        sound.play()
+        sound.fadeout(1250)
 
 if __name__ == '__main__':
     # Create a game instance and run the game.
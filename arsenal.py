@@ -3,9 +3,14 @@
 This module defines the DragonArsenal class, which maintains a pygame sprite
 group of Element instances, updates their positions, removes offscreen
 projectiles, and provides the interface used by the dragon to shoot.
+
+The dragon has two weapons, switched with `toggle_weapon`: 'element'
+fireballs, and a lightning 'beam' that instantly hits the first walker in
+front of the dragon (resolved by `WhiteWalkerArmy.check_beam`).
 """
 
 from element import Element
+from assets import load_image
 import pygame
 
 from typing import TYPE_CHECKING
@@ -26,6 +31,10 @@ class DragonArsenal:
         game (WhiteWalkerInvasion): Reference to the main game instance.
         settings (Settings): Game settings used for projectile configuration.
         arsenal (pygame.sprite.Group): Group containing all active element sprites.
+        weapon (str): Weapon fired by `shoot`, 'element' or 'beam'.
+        beam_pending (bool): Whether a beam was fired and has not been resolved yet.
+        beam_image (pygame.Surface | None): Image of the beam being shown.
+        beam_rect (pygame.Rect | None): Position of the beam being shown.
     """
     
     def __init__(self, game: 'WhiteWalkerInvasion'):
@@ -40,6 +49,12 @@ class DragonArsenal:
         # A Sprite Group to hold all active Element projectiles.
         self.arsenal = pygame.sprite.Group()
 
+        self.weapon = 'element'
+        self.beam_pending = False
+        self.beam_image = self.beam_rect = None
+        self._beam_frames = 0 # Frames the beam is still shown for.
+        self._beam_cooldown = 0 # Frames until the beam can be fired again.
+
     def update_arsenal(self):
         """Update the position of elements and remove any that are offscreen.
 
@@ -53,28 +68,61 @@ class DragonArsenal:
         # Clean up elements that have left the screen.
         self._remove_elements_offscreen() 
 
+        # Count down the beam's cooldown and how long it stays visible.
+        if self._beam_cooldown:
+            self._beam_cooldown -= 1
+        if self._beam_frames:
+            self._beam_frames -= 1
+            if not self._beam_frames:
+                self.beam_image = self.beam_rect = None
+
     def _remove_elements_offscreen(self):
         """Remove elements that have traveled off the right edge of the screen.
 
         Iterates over a copy of the arsenal group and removes any Element
-        whose rect exceeds the screen's right boundary.
+        whose rect exceeds the screen's right boundary. With swept collisions,
+        the element only stops and is removed at the next collision check,
+        which still tests its path up to the edge.
         """
         
+        swept = self.game.collision_mode == 'swept'
         # Iterate over a copy to allow safe removal from the original group.
         for element in self.arsenal.copy():
             # Check if the element's right edge is past the screen's right edge.
             if element.rect.right >= self.game.screen.get_rect().right:
-                self.arsenal.remove(element)
+                if not swept:
+                    self.arsenal.remove(element)
+                elif element.end_frame is None:
+                    element.end_frame = self.game.frame_number
 
     def draw(self):
         """Draw all elements to the screen.
 
         This method calls `draw_element()` on each Element in the arsenal
-        group so they are rendered onto the game's display surface.
+        group so they are rendered onto the game's display surface, then
+        draws the beam if one is being shown.
         """
         
         for element in self.arsenal: 
             element.draw_element()
+        if self.beam_image is not None:
+            self.game.screen.blit(self.beam_image, self.beam_rect)
+
+    def shoot(self):
+        """Fire the current weapon.
+
+        Returns:
+            bool: True if a shot was fired, False otherwise.
+        """
+
+        if self.weapon == 'beam':
+            return self.fire_beam()
+        return self.shoot_element()
+
+    def toggle_weapon(self):
+        """Switch between the element and beam weapons."""
+
+        self.weapon = 'beam' if self.weapon == 'element' else 'element'
 
     def shoot_element(self):
         """Create a new element and add it to the arsenal if the limit allows.
@@ -96,4 +144,40 @@ class DragonArsenal:
             
             return True # Indicate that a shot was successfully fired.
         
-        return False # Indicate that no shot was fired (rate limit hit).
\ No newline at end of file
+        return False # Indicate that no shot was fired (rate limit hit).
+
+    def fire_beam(self):
+        """Fire the beam if its cooldown has passed.
+
+        The hit is resolved during the next collision check, from the
+        dragon's position at that time.
+
+        Returns:
+            bool: True if the beam was fired, False otherwise.
+        """
+
+        if self._beam_cooldown or self.beam_pending:
+            return False
+        self.beam_pending = True
+        self._beam_cooldown = self.settings.beam_cooldown
+        return True
+
+    def show_beam(self, origin: tuple, end_x: int):
+        """Show a resolved beam from `origin` to `end_x` for a few frames.
+
+        Args:
+            origin (tuple[int, int]): Point the beam starts from.
+            end_x (int): X coordinate the beam stops at.
+        """
+
+        self.beam_pending = False
+        length = max(1, end_x - origin[0])
+        height = self.settings.beam_height
+        # The source image is scaled once; each beam only scales it to its length.
+        # The bolt fills the middle half of the image, so that band is used.
+        source = load_image(self.settings.beam_file,
+                            (self.settings.screen_width, 2 * height), self.game.tracer)
+        band = source.subsurface((0, height // 2, self.settings.screen_width, height))
+        self.beam_image = pygame.transform.scale(band, (length, height))
+        self.beam_rect = self.beam_image.get_rect(midleft=origin)
+        self._beam_frames = self.settings.beam_duration
@@ -0,0 +1,47 @@
+"""Loading and caching of scaled sprite images.
+
+Every walker and element used to load and scale its image from disk when
+it was created, which took far longer than everything else in creating a
+sprite. `load_image` keeps one scaled Surface per file and size, and all
+sprites of a kind share it (sprites only ever read their image).
+"""
+
+from pathlib import Path
+
+import pygame
+
+# Scaled images by (file, (width, height)).
+_images = {}
+
+def load_image(path: Path, size: tuple, tracer=None):
+    """Return the image in `path` scaled to `size`, loading it only once.
+
+    Args:
+        path (Path): Image file.
+        size (tuple[int, int]): Width and height to scale the image to.
+        tracer (Tracer | NullTracer): If given, records an 'asset_load'
+            event when the file is actually read.
+
+    Returns:
+        pygame.Surface: The shared scaled image.
+    """
+
+    key = (path, tuple(size))
+    image = _images.get(key)
+    if image is None:
+        if tracer is not None:
+            tracer.instant('asset_load', {'file': path.name})
+        image = pygame.transform.scale(pygame.image.load(path), size)
+        _images[key] = image
+    return image
+
+def replace_image(path: Path, size: tuple, image: pygame.Surface):
+    """Replace a cached image, e.g. after the file changed on disk.
+
+    Args:
+        path (Path): Image file.
+        size (tuple[int, int]): Size the image is scaled to.
+        image (pygame.Surface): The new scaled image.
+    """
+
+    _images[(path, tuple(size))] = image
@@ -0,0 +1,353 @@
+"""An asyncio version of the game loop, with cooperative background tasks.
+
+`WhiteWalkerInvasion.run_game` blocks in `clock.tick` between frames, so
+that idle time cannot be used for anything else without threads.
+AsyncGameLoop runs the same frame phases (events, update, render) as
+coroutines and then awaits the next frame deadline, which gives other
+coroutines the rest of the frame. The background tasks provided here are:
+
+- autosave: checkpoints the run in progress at a fixed interval.
+- telemetry: a local TCP server streaming one JSON line of game and frame
+  budget statistics per second to every connected client.
+- asset reloading: watches the sprite and background images and swaps in
+  any that change on disk, without restarting the game.
+
+Background tasks must keep their work short and wrap it in
+`budget.background()`, so FrameBudget can report how much of the idle
+time was reused and whether any frame deadline was missed because of it.
+
+Usage:
+    python async_loop.py [--telemetry-port 8765]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+import pygame
+
+from assets import replace_image
+
+# Type checking is used to avoid circular imports.
+if TYPE_CHECKING:
+    from alien_invasion import WhiteWalkerInvasion
+
+class FrameBudget:
+    """Account for how each frame's time budget is spent.
+
+    Attributes:
+        frame_time (float): Length of a frame at the target FPS, in seconds.
+        frames (int): Number of frames counted.
+        work_time (float): Time spent in the frame phases.
+        idle_time (float): Time between the end of the frame phases and the
+            next deadline (the time available to background tasks).
+        background_time (float): Time background tasks spent working.
+        late_time (float): Time by which frames started after their deadline.
+        late_frames (int): Number of frames that started late.
+    """
+
+    def __init__(self, fps: int):
+        """Initialize the counters.
+
+        Args:
+            fps (int): Target frame rate.
+        """
+
+        self.frame_time = 1 / fps
+        self.frames = 0
+        self.work_time = self.idle_time = 0.0
+        self.background_time = self.late_time = 0.0
+        self.late_frames = 0
+
+    def frame(self, work: float, idle: float, late: float):
+        """Record one finished frame.
+
+        Args:
+            work (float): Time spent in the frame phases.
+            idle (float): Time left until the next deadline.
+            late (float): Time by which the next frame started after its deadline.
+        """
+
+        self.frames += 1
+        self.work_time += work
+        self.idle_time += max(0.0, idle)
+        # Wake-ups within a millisecond are timer jitter, not missed deadlines.
+        if late > 0.001:
+            self.late_frames += 1
+            self.late_time += late
+
+    @contextmanager
+    def background(self):
+        """Context manager charging its block to background work."""
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.background_time += time.perf_counter() - start
+
+    def summary(self):
+        """Return the average frame budget use.
+
+        Returns:
+            dict: Per-frame averages in milliseconds, the fraction of idle
+            time reused by background tasks, and the number of late frames.
+        """
+
+        frames = max(1, self.frames)
+        return {
+            'frames': self.frames,
+            'budget_ms': round(self.frame_time * 1000, 3),
+            'work_ms': round(self.work_time / frames * 1000, 3),
+            'idle_ms': round(self.idle_time / frames * 1000, 3),
+            'background_ms': round(self.background_time / frames * 1000, 3),
+            'idle_reused': round(self.background_time / self.idle_time, 4)
+                           if self.idle_time else 0.0,
+            'late_frames': self.late_frames,
+        }
+
+    def report(self):
+        """Return a one-line summary of the frame budget use."""
+
+        s = self.summary()
+        return (f"Frame budget over {s['frames']} frames: {s['budget_ms']:.2f} ms, "
+                f"work {s['work_ms']:.2f} ms, idle {s['idle_ms']:.2f} ms, "
+                f"background {s['background_ms']:.2f} ms "
+                f"({s['idle_reused']:.1%} of idle time reused), "
+                f"{s['late_frames']} late frames")
+
+class AsyncGameLoop:
+    """Run a game's main loop on asyncio, next to background coroutines.
+
+    Attributes:
+        game (WhiteWalkerInvasion): The game being run.
+        budget (FrameBudget): Frame budget accounting.
+        tasks (list[asyncio.Task]): Running background tasks.
+    """
+
+    def __init__(self, game: 'WhiteWalkerInvasion'):
+        """Prepare the loop for a game.
+
+        Args:
+            game (WhiteWalkerInvasion): The game to run.
+        """
+
+        self.game = game
+        self.budget = FrameBudget(game.settings.FPS)
+        self.tasks = []
+
+    def run(self, background=()):
+        """Run the game until it quits.
+
+        Args:
+            background (Iterable[Callable]): Background task factories, each
+                called with this loop and returning a coroutine.
+        """
+
+        try:
+            asyncio.run(self._main(background))
+        finally:
+            print(self.budget.report())
+
+    async def _main(self, background):
+        """Start the background tasks, then run frames until the game stops."""
+
+        self.tasks = [asyncio.create_task(factory(self)) for factory in background]
+        try:
+            await self._frames()
+        finally:
+            for task in self.tasks:
+                task.cancel()
+
+    async def _frames(self):
+        """The frame loop: run the phases, then await the next deadline.
+
+        If a frame overruns by more than a whole frame, the deadlines are
+        reset instead of running several frames back to back to catch up.
+        """
+
+        game = self.game
+        tracer = game.tracer
+        frame_time = self.budget.frame_time
+        deadline = time.perf_counter()
+        while game.running:
+            start = time.perf_counter()
+            tracer.begin('frame')
+            with tracer.span('_check_events'):
+                await self._check_events()
+            if game.game_active:
+                await self._update()
+            with tracer.span('_update_screen'):
+                await self._render()
+
+            deadline += frame_time
+            now = time.perf_counter()
+            game.quality_governor.frame(now - start - game.pause_time)
+            game.pause_time = 0.0
+            if now - deadline > frame_time:
+                deadline = now
+            with tracer.span('idle'):
+                # Background tasks run while this coroutine waits.
+                await asyncio.sleep(deadline - now)
+            self.budget.frame(now - start, deadline - now, time.perf_counter() - deadline)
+            game.clock.tick() # Only measures the frame rate; the deadline paces the loop.
+            tracer.end('frame')
+            game.frame_profiler.frame()
+
+    async def _check_events(self):
+        """Process pending input events."""
+
+        self.game._check_events()
+
+    async def _update(self):
+        """Advance the simulation by one frame."""
+
+        self.game.step()
+
+    async def _render(self):
+        """Draw and flip the screen."""
+
+        self.game._update_screen()
+
+async def autosave(loop: AsyncGameLoop):
+    """Checkpoint the run in progress every `settings.autosave_interval` seconds.
+
+    Args:
+        loop (AsyncGameLoop): The loop running the game.
+    """
+
+    game = loop.game
+    while True:
+        await asyncio.sleep(game.settings.autosave_interval)
+        if game.game_active:
+            with loop.budget.background():
+                game.game_stats.checkpoint()
+
+async def telemetry_server(loop: AsyncGameLoop):
+    """Serve one JSON line of statistics per second to local TCP clients.
+
+    Listens on localhost at `settings.telemetry_port`.
+
+    Args:
+        loop (AsyncGameLoop): The loop running the game.
+    """
+
+    game = loop.game
+
+    async def stream(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                with loop.budget.background():
+                    stats = game.game_stats
+                    line = json.dumps({
+                        'time': time.time(),
+                        'active': game.game_active,
+                        'score': stats.score,
+                        'level': stats.level,
+                        'dragons_left': stats.dragons_left,
+                        'fps': round(game.clock.get_fps(), 1),
+                        'budget': loop.budget.summary(),
+                    })
+                    writer.write(line.encode() + b'\n')
+                await writer.drain()
+                await asyncio.sleep(1)
+        except ConnectionError:
+            pass # The client went away.
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(stream, '127.0.0.1', game.settings.telemetry_port)
+    async with server:
+        await server.serve_forever()
+
+async def reload_assets(loop: AsyncGameLoop):
+    """Reload sprite and background images when their files change.
+
+    The files are polled every `settings.asset_poll_interval` seconds.
+    Changed images are loaded, scaled and swapped into the existing
+    sprites and the image cache, which sprites created later use.
+
+    Args:
+        loop (AsyncGameLoop): The loop running the game.
+    """
+
+    game = loop.game
+    s = game.settings
+    sizes = {
+        s.bg_file: (s.screen_width, s.screen_height),
+        s.dragon_file: (s.dragon_width, s.dragon_height),
+        s.element_file: (s.element_width, s.element_height),
+    }
+    for kind in game.white_walker_army.enemy_types.values():
+        sizes[kind.sprite_file] = (s.walker_width, s.walker_height)
+    mtimes = {path: path.stat().st_mtime for path in sizes}
+
+    while True:
+        await asyncio.sleep(s.asset_poll_interval)
+        for path, size in sizes.items():
+            with loop.budget.background():
+                try:
+                    mtime = path.stat().st_mtime
+                    if mtime == mtimes[path]:
+                        continue
+                    image = pygame.transform.scale(pygame.image.load(path), size)
+                except (OSError, pygame.error) as e:
+                    # Possibly caught halfway through being saved; retried next poll.
+                    print(f"Could not reload {path.name}: {e}")
+                    continue
+                mtimes[path] = mtime
+                replace_image(path, size, image)
+                _swap_image(game, path, image)
+                game.tracer.instant('asset_reload', {'file': path.name})
+            await asyncio.sleep(0) # Let the next frame run between files.
+
+def _swap_image(game: 'WhiteWalkerInvasion', path, image: pygame.Surface):
+    """Replace the image loaded from `path` everywhere it is in use.
+
+    Args:
+        game (WhiteWalkerInvasion): The running game.
+        path (Path): File the image was loaded from.
+        image (pygame.Surface): The reloaded, scaled image.
+    """
+
+    s = game.settings
+    if path == s.bg_file:
+        game.bg = image
+        game.HUD.invalidate()
+    elif path == s.dragon_file:
+        game.dragon.image = image
+        game.HUD.life_image = image
+        game.HUD.invalidate()
+    elif path == s.element_file:
+        for element in game.dragon.arsenal.arsenal:
+            element.image = image
+    else:
+        army = game.white_walker_army
+        for kind in army.enemy_types.values():
+            if kind.sprite_file == path:
+                kind.set_image(image)
+                for walker in army.batches[kind.name]:
+                    walker.image = kind.image
+
+def main():
+    """Parse command line arguments and run the game on the asyncio loop."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--telemetry-port', type=int, default=None,
+                        help='serve telemetry on this localhost port')
+    args = parser.parse_args()
+
+    from alien_invasion import WhiteWalkerInvasion
+    game = WhiteWalkerInvasion()
+    background = [autosave, reload_assets]
+    if args.telemetry_port is not None:
+        game.settings.telemetry_port = args.telemetry_port
+    if game.settings.telemetry_port is not None:
+        background.append(telemetry_server)
+    AsyncGameLoop(game).run(background)
+
+if __name__ == '__main__':
+    main()
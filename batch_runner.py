@@ -0,0 +1,138 @@
+"""Run many headless games in parallel and collect their results.
+
+Each worker process owns a single headless WhiteWalkerInvasion instance that
+is restarted for every game it is given, so pygame and the game assets are
+only loaded once per process. Every game is driven by a seeded policy (see
+policies.py), and results are written to a CSV file as soon as each game
+finishes, so memory use does not grow with the number of games.
+
+With --tick, each call to `step` simulates several frames and the policy
+acts once per tick, which saves time. Use swept collisions
+(WW_COLLISIONS=swept) so that elements hit the same walkers as with a
+tick of one frame.
+
+Usage:
+    python batch_runner.py --games 1000 --policy random --output results.csv
+"""
+
+import argparse
+import csv
+import multiprocessing
+import os
+import time
+
+from policies import POLICIES
+
+# Columns written to the results file, in order.
+RESULT_FIELDS = ('game', 'seed', 'policy', 'score', 'level', 'frames')
+
+# The headless game owned by the current worker process.
+_worker_game = None
+
+def _init_worker():
+    """Create the headless game used by this worker process."""
+
+    global _worker_game
+    # Imported here so the parent process never initializes pygame.
+    from alien_invasion import WhiteWalkerInvasion
+    _worker_game = WhiteWalkerInvasion(headless=True)
+
+def play_game(job: tuple):
+    """Play one headless game to completion and report its results.
+
+    Args:
+        job (tuple): (game number, seed, policy name, max frames, frames per tick).
+
+    Returns:
+        dict: The game's results, keyed by the names in RESULT_FIELDS.
+    """
+
+    game_number, seed, policy_name, max_frames, tick = job
+    game = _worker_game
+    policy = POLICIES[policy_name](seed)
+
+    game.restart_game()
+    frames = 0
+    # The game ends when all lives are lost, or when the frame cap is hit.
+    while game.game_active and frames < max_frames:
+        policy.act(game)
+        tick_frames = min(tick, max_frames - frames)
+        game.step(tick_frames)
+        frames += tick_frames
+
+    return {
+        'game': game_number,
+        'seed': seed,
+        'policy': policy_name,
+        'score': game.game_stats.score,
+        'level': game.game_stats.level,
+        'frames': frames,
+    }
+
+def run_batch(games: int, policy: str, output: str, workers: int = None,
+              base_seed: int = 0, max_frames: int = 60 * 60 * 10, tick: int = 1):
+    """Play a batch of headless games across a process pool.
+
+    Args:
+        games (int): Number of games to play.
+        policy (str): Name of the policy in POLICIES used to drive each game.
+        output (str): Path of the CSV file the results are streamed to.
+        workers (int): Number of worker processes. Defaults to the CPU count.
+        base_seed (int): Seed of the first game; game n uses base_seed + n.
+        max_frames (int): Frame cap per game, so a strong policy cannot
+            play forever. The default is ten minutes at 60 FPS.
+        tick (int): Frames simulated per step of each game (see
+            `WhiteWalkerInvasion.step`); the policy acts once per tick.
+
+    Returns:
+        int: The number of games written to the results file.
+    """
+
+    workers = workers or os.cpu_count()
+    jobs = ((n, base_seed + n, policy, max_frames, tick) for n in range(games))
+    # Small chunks keep workers busy while still streaming results promptly.
+    chunksize = max(1, games // (workers * 16))
+
+    written = 0
+    with open(output, 'w', newline='') as results_file:
+        writer = csv.DictWriter(results_file, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+            # Results arrive in completion order and are written immediately.
+            for result in pool.imap_unordered(play_game, jobs, chunksize):
+                writer.writerow(result)
+                results_file.flush()
+                written += 1
+            pool.close()
+            pool.join()
+    return written
+
+def main():
+    """Parse command line arguments and run the batch."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--games', type=int, default=100,
+                        help='number of games to play')
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='random',
+                        help='policy used to drive the dragon')
+    parser.add_argument('--output', default='batch_results.csv',
+                        help='CSV file the results are written to')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (defaults to the CPU count)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the first game')
+    parser.add_argument('--max-frames', type=int, default=60 * 60 * 10,
+                        help='frame cap per game')
+    parser.add_argument('--tick', type=int, default=1,
+                        help='frames simulated per step (use with WW_COLLISIONS=swept)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = run_batch(args.games, args.policy, args.output, args.workers,
+                        args.seed, args.max_frames, args.tick)
+    elapsed = time.perf_counter() - start
+    print(f"Played {written} games in {elapsed:.1f}s "
+          f"({written / elapsed:.1f} games/s), results in {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,393 @@
+"""Micro-benchmarks for the game's performance-sensitive paths.
+
+Each benchmark is a function registered in BENCHMARKS that prints its own
+results. Run all of them, or only the ones named on the command line:
+
+    python benchmarks.py
+    python benchmarks.py vector_env
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+def bench_vector_env(batch_sizes=(1, 64, 1024), steps: int = 2000):
+    """Measure VectorWhiteWalkerEnv throughput in environment-steps per second.
+
+    Every game is driven by random actions. One call to `step()` with K
+    games counts as K environment-steps.
+
+    Args:
+        batch_sizes (tuple[int, ...]): Values of K to measure.
+        steps (int): Number of `step()` calls per measurement.
+    """
+
+    from vector_env import VectorWhiteWalkerEnv, NUM_ACTIONS
+
+    rng = np.random.default_rng(0)
+    for k in batch_sizes:
+        env = VectorWhiteWalkerEnv(k)
+        env.reset()
+        actions = rng.integers(0, NUM_ACTIONS, size=(steps, k))
+
+        start = time.perf_counter()
+        for frame_actions in actions:
+            env.step(frame_actions)
+        elapsed = time.perf_counter() - start
+        print(f"vector_env K={k:<5} {k * steps / elapsed:>12,.0f} env-steps/s "
+              f"({elapsed / steps * 1000:.3f} ms per step)")
+
+def bench_leaderboard(runs: int = 1_000_000, queries: int = 1000):
+    """Measure ScoreStore inserts and top-N queries with many stored runs.
+
+    A temporary database is filled with `runs` random runs, then the time
+    of a single recorded run and of uncached top-N queries is reported.
+
+    Args:
+        runs (int): Number of runs stored before measuring.
+        queries (int): Number of top-N queries to time.
+    """
+
+    import tempfile
+    from pathlib import Path
+    from leaderboard import ScoreStore
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        store = ScoreStore(Path(directory) / 'scores.db')
+        rows = zip(rng.integers(0, 10**6, runs).tolist(),
+                   rng.integers(1, 30, runs).tolist(),
+                   rng.random(runs).tolist(), rng.random(runs).tolist())
+        start = time.perf_counter()
+        with store.connection:
+            store.connection.executemany(
+                'INSERT INTO runs (score, level, duration, timestamp, settings_hash) '
+                "VALUES (?, ?, ?, ?, 'bench')", rows)
+        print(f"leaderboard fill {runs:,} runs: {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        for _ in range(100):
+            store.record_run(500, 3, 60.0, 'bench')
+        print(f"leaderboard record_run: {(time.perf_counter() - start) * 10:.3f} ms")
+
+        start = time.perf_counter()
+        for _ in range(queries):
+            store._top_cache.clear() # Measure the query, not the cache.
+            store.top_scores(10)
+        print(f"leaderboard top 10 (uncached): "
+              f"{(time.perf_counter() - start) / queries * 1e6:.1f} us")
+
+        start = time.perf_counter()
+        for _ in range(queries):
+            store.top_scores(10)
+        print(f"leaderboard top 10 (cached): "
+              f"{(time.perf_counter() - start) / queries * 1e6:.2f} us")
+        store.close()
+
+def bench_state_sync(quanta=(1, 2, 4), ticks: int = 1200):
+    """Measure state sync bandwidth and publish time over loopback TCP.
+
+    A headless game with a full army is published to a StateSyncClient
+    receiving on another thread. Nobody shoots, so the army stays full.
+    Reported per quantization step: bytes per tick, the size of a full
+    snapshot, and the time `publish()` takes on the game's thread.
+
+    Args:
+        quanta (tuple[int, ...]): Position quantization steps to measure.
+        ticks (int): Number of frames published per measurement.
+    """
+
+    import threading
+    from alien_invasion import WhiteWalkerInvasion
+    from state_sync import StateSyncServer, StateSyncClient, encode
+
+    game = WhiteWalkerInvasion(headless=True)
+    for quantum in quanta:
+        server = StateSyncServer('127.0.0.1:0', quantum)
+        client = StateSyncClient(server.address)
+        receiver = threading.Thread(target=lambda: [client.receive() for _ in range(ticks)])
+        receiver.start()
+        game.restart_game()
+
+        publish_time = 0.0
+        for _ in range(ticks):
+            if not game.game_active:
+                game.restart_game()
+            game.step()
+            start = time.perf_counter()
+            server.publish(game)
+            publish_time += time.perf_counter() - start
+        receiver.join()
+
+        stats = (game.game_active, 0, 0, 1, 3)
+        full_size = len(encode(server.tick, stats, server._history[server.tick]))
+        print(f"state_sync quantum={quantum} {len(game.white_walker_army.army)} walkers: "
+              f"{client.bytes_received / client.messages:,.0f} bytes/tick, "
+              f"full snapshot {full_size:,} bytes, "
+              f"publish {publish_time / ticks * 1e6:.0f} us")
+        client.close()
+        server.close()
+
+def bench_save_state(repeats: int = 1000):
+    """Measure taking and restoring a save state of a full army.
+
+    Args:
+        repeats (int): Number of snapshots and restores timed.
+    """
+
+    from alien_invasion import WhiteWalkerInvasion
+    import save_state
+
+    game = WhiteWalkerInvasion(headless=True)
+    game.restart_game()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        data = save_state.snapshot(game)
+    snapshot_time = (time.perf_counter() - start) / repeats
+    start = time.perf_counter()
+    for _ in range(repeats):
+        save_state.restore(game, data)
+    restore_time = (time.perf_counter() - start) / repeats
+    print(f"save_state {len(game.white_walker_army.army)} walkers, {len(data)} bytes: "
+          f"snapshot {snapshot_time * 1e6:.0f} us, restore {restore_time * 1e6:.0f} us")
+
+def bench_render_backends(frames: int = 600, scales=(1.0, 0.5)):
+    """Compare the frame cost of the rendering backends and render scales.
+
+    Under SDL's dummy video driver the texture backend uses the software
+    renderer, so this measures the CPU cost of both ways of drawing.
+
+    Args:
+        frames (int): Number of frames drawn per backend and scale.
+        scales (tuple): Internal render resolution scales to measure.
+    """
+
+    from alien_invasion import WhiteWalkerInvasion
+    from render_backends import BACKENDS
+
+    for backend in BACKENDS:
+        os.environ['WW_RENDERER'] = backend
+        for scale in scales:
+            os.environ['WW_RENDER_SCALE'] = str(scale)
+            game = WhiteWalkerInvasion(headless=True)
+            game.restart_game()
+            for active in (True, False):
+                game.game_active = active
+                game._update_screen() # Upload textures and build the HUD layer first.
+                start = time.perf_counter()
+                for _ in range(frames):
+                    game._update_screen()
+                frame_time = (time.perf_counter() - start) / frames
+                print(f"render {game.backend.name} at scale {scale:g} "
+                      f"({'playing' if active else 'menu'}, "
+                      f"{len(game.white_walker_army.army)} walkers): {frame_time * 1e3:.2f} ms/frame")
+    del os.environ['WW_RENDERER'], os.environ['WW_RENDER_SCALE']
+
+def bench_ice_shots(live: int = 5000, frames: int = 600):
+    """Stress the ice shots: keep `live` shots in flight and time each frame.
+
+    Shots are spawned all over the screen with random velocities, and
+    topped up every frame to replace the ones that left it. A frame moves
+    and culls them, tests them against the dragon and draws them.
+
+    Args:
+        live (int): Number of shots kept in flight.
+        frames (int): Number of frames timed.
+    """
+
+    from alien_invasion import WhiteWalkerInvasion
+
+    game = WhiteWalkerInvasion(headless=True)
+    game.restart_game()
+    shots = game.white_walker_army.ice_shots
+    settings = game.settings
+    rng = np.random.default_rng(0)
+    # The hit test must not remove shots, so test against a rect off screen.
+    target = game.dragon.rect.move(-10 * settings.screen_width, 0)
+
+    def top_up():
+        missing = live - shots.count
+        shots.spawn(rng.uniform(0, settings.screen_width, missing),
+                    rng.uniform(0, settings.screen_height, missing),
+                    rng.uniform(-4, 4, missing), rng.uniform(-4, 4, missing))
+
+    update_time = hit_time = draw_time = 0.0
+    for _ in range(frames):
+        top_up()
+        start = time.perf_counter()
+        shots.update()
+        update_time += time.perf_counter() - start
+        start = time.perf_counter()
+        shots.check_hit(target)
+        hit_time += time.perf_counter() - start
+        start = time.perf_counter()
+        shots.draw(game.screen)
+        draw_time += time.perf_counter() - start
+    total = (update_time + hit_time + draw_time) / frames
+    print(f"ice_shots {live} live: update {update_time / frames * 1e3:.2f} ms, "
+          f"hit test {hit_time / frames * 1e3:.2f} ms, draw {draw_time / frames * 1e3:.2f} ms, "
+          f"total {total * 1e3:.2f} ms of a {1e3 / settings.FPS:.2f} ms frame")
+
+def bench_particles(live: int = 10_000, frames: int = 600):
+    """Measure updating and drawing `live` particles every frame.
+
+    Particles are spawned all over the screen and topped up every frame
+    to replace the expired ones.
+
+    Args:
+        live (int): Number of particles kept alive.
+        frames (int): Number of frames timed.
+    """
+
+    from alien_invasion import WhiteWalkerInvasion
+
+    game = WhiteWalkerInvasion(headless=True)
+    particles = game.particles
+    settings = game.settings
+    rng = np.random.default_rng(0)
+    colors = len(particles.palette)
+
+    update_time = draw_time = 0.0
+    for _ in range(frames):
+        missing = live - particles.count
+        particles.spawn(rng.uniform(0, settings.screen_width, missing),
+                        rng.uniform(0, settings.screen_height, missing),
+                        rng.uniform(-3, 3, missing), rng.uniform(-3, 3, missing),
+                        rng.integers(20, 60, missing), rng.integers(0, colors, missing), 0.1)
+        start = time.perf_counter()
+        particles.update()
+        update_time += time.perf_counter() - start
+        start = time.perf_counter()
+        particles.draw(game.screen)
+        draw_time += time.perf_counter() - start
+    total = (update_time + draw_time) / frames
+    print(f"particles {live} live: update {update_time / frames * 1e3:.2f} ms, "
+          f"draw {draw_time / frames * 1e3:.2f} ms, total {total * 1e3:.2f} ms; "
+          f"{particles.max_live} fit in the {settings.particle_budget:.0%} frame budget")
+
+def bench_endless(frames: int = 36_000):
+    """Run endless mode for a long time and check its cost stays flat.
+
+    The autoplay bot plays endless mode (restarting on game over). Frames
+    are timed, split by whether walkers entered in them, and the live
+    walkers and traced memory are compared between the first and the last
+    quarter of the run.
+
+    Args:
+        frames (int): Number of frames simulated.
+    """
+
+    import gc
+    import tracemalloc
+    from alien_invasion import WhiteWalkerInvasion
+    from policies import AutoplayBot
+
+    os.environ['WW_GAME_MODE'] = 'endless'
+    game = WhiteWalkerInvasion(headless=True)
+    del os.environ['WW_GAME_MODE']
+    game.restart_game()
+    bot = AutoplayBot()
+    army = game.white_walker_army
+    # Preallocated, so the timings themselves do not add to the traced memory.
+    times = np.zeros(frames)
+    spawned = np.zeros(frames, bool)
+    peak_walkers = max_level = 0
+    memory = []
+    tracemalloc.start()
+    for frame in range(frames):
+        bot.act(game)
+        start = time.perf_counter()
+        game.step()
+        times[frame] = time.perf_counter() - start
+        spawned[frame] = army.spawner.spawned > 0
+        peak_walkers = max(peak_walkers, len(army.army))
+        max_level = max(max_level, game.game_stats.level)
+        if frame in (frames // 4, frames - 1):
+            gc.collect() # Sprite groups form reference cycles; count only live memory.
+            memory.append(tracemalloc.get_traced_memory()[0])
+        if not game.game_active:
+            game.restart_game()
+    tracemalloc.stop()
+    for name, selected in (('with spawns', times[spawned]), ('without', times[~spawned])):
+        p50, p99 = np.percentile(selected, (50, 99)) * 1e3
+        print(f"endless frames {name}: {len(selected)}, p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+    print(f"endless {frames} frames: level {max_level} reached, at most {peak_walkers} walkers, "
+          f"traced memory {memory[0] / 1024:.0f} KiB after a quarter, {memory[1] / 1024:.0f} KiB at the end")
+
+def bench_swept_collisions(speeds=(7.0, 60.0, 400.0), ticks=(1, 2, 4, 8)):
+    """Compare discrete and swept collisions of fast elements at several tick lengths.
+
+    For each element speed, a scripted dragon fires at the first level's
+    formation (every 8 frames, the longest tick) until the level is
+    cleared or a life is lost. The score every 8 frames tells whether the
+    same walkers were hit at the same time at every tick length, and the
+    mean step time, per frame, shows the cost of each mode.
+
+    Args:
+        speeds (tuple[float, ...]): Element speeds in pixels per frame.
+        ticks (tuple[int, ...]): Tick lengths in frames.
+    """
+
+    import random
+    from alien_invasion import WhiteWalkerInvasion
+
+    def play(mode: str, tick: int, speed: float, frames: int = 6000):
+        os.environ['WW_COLLISIONS'] = mode
+        game = WhiteWalkerInvasion(headless=True)
+        del os.environ['WW_COLLISIONS']
+        game.settings.ice_shot_interval = 0
+        game.restart_game()
+        game.settings.element_speed = speed
+        stats, dragon = game.game_stats, game.dragon
+        rng = random.Random(0)
+        scores, elapsed, frame = [], 0.0, 0
+        while frame < frames and stats.level == 1 and stats.dragons_left == game.settings.starting_dragon_count:
+            if frame % 8 == 0:
+                scores.append(stats.score)
+                move = rng.random()
+                dragon.moving_up, dragon.moving_down = move < 0.3, move > 0.7
+                dragon.shoot()
+            start = time.perf_counter()
+            game.step(tick)
+            elapsed += time.perf_counter() - start
+            frame += tick
+        return scores, elapsed / frame
+
+    for speed in speeds:
+        results = {(mode, tick): play(mode, tick, speed)
+                   for mode in ('discrete', 'swept') for tick in ticks}
+        for mode in ('discrete', 'swept'):
+            # The last score is taken after the level ended, at a tick boundary.
+            reference = results[mode, 1][0][:-1]
+            summary = ', '.join(
+                f"tick {tick}: {'same hits' if scores[:len(reference)] == reference else 'different hits'}"
+                f" {scores[-1]} points, {frame_time * 1e3:.3f} ms/frame"
+                for tick in ticks for scores, frame_time in [results[mode, tick]])
+            print(f"collisions {mode} at {speed:g} px/frame: {summary}")
+
+# Benchmarks that can be selected by name on the command line.
+BENCHMARKS = {
+    'vector_env': bench_vector_env,
+    'leaderboard': bench_leaderboard,
+    'state_sync': bench_state_sync,
+    'save_state': bench_save_state,
+    'render_backends': bench_render_backends,
+    'ice_shots': bench_ice_shots,
+    'particles': bench_particles,
+    'endless': bench_endless,
+    'swept_collisions': bench_swept_collisions,
+}
+
+def main():
+    """Run the benchmarks named on the command line, or all of them."""
+
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            sys.exit(f"Unknown benchmark '{name}'. Choose from: {', '.join(BENCHMARKS)}")
+        BENCHMARKS[name]()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Precomputed per-level difficulty parameters.
+
+Clearing a level multiplies the dragon, element and army speeds (and the
+walker point value) by `difficulty_scale`. Rather than compounding those
+floats at runtime, a DifficultyTable holds the value of every parameter for
+each level, built once per scale and base values and looked up by level.
+The table is built by repeating exactly the multiplications
+`Settings.increase_difficulty` used to do, so every value is identical to
+the one the game reached by compounding.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+class DifficultyTable:
+    """Per-level values of the parameters scaled by `difficulty_scale`.
+
+    Level 1 holds the base values. Index `level - 1` of every list holds
+    the value for that level; the table grows on demand when a level past
+    its end is requested.
+
+    Attributes:
+        scale (float): Multiplier applied on every level-up.
+        dragon_speed (list[float]): Dragon speed for each level.
+        element_speed (list[float]): Element speed for each level.
+        army_speed (list[float]): Army speed for each level.
+        walker_points (list[int]): Points per walker for each level.
+    """
+
+    def __init__(self, scale: float, dragon_speed: float, element_speed: float,
+                 army_speed: float, walker_points: int, levels: int = 50):
+        """Build the table for the given scale and level-1 values.
+
+        Args:
+            scale (float): Multiplier applied on every level-up.
+            dragon_speed (float): Dragon speed on level 1.
+            element_speed (float): Element speed on level 1.
+            army_speed (float): Army speed on level 1.
+            walker_points (int): Points per walker on level 1.
+            levels (int): Number of levels to precompute.
+        """
+
+        self.scale = scale
+        self.dragon_speed = [dragon_speed]
+        self.element_speed = [element_speed]
+        self.army_speed = [army_speed]
+        self.walker_points = [walker_points]
+        self._extend(levels)
+
+    def _extend(self, levels: int):
+        """Make sure the table covers at least `levels` levels.
+
+        Args:
+            levels (int): Number of levels the table must cover.
+        """
+
+        while len(self.walker_points) < levels:
+            self.dragon_speed.append(self.dragon_speed[-1] * self.scale)
+            self.element_speed.append(self.element_speed[-1] * self.scale)
+            self.army_speed.append(self.army_speed[-1] * self.scale)
+            # Point values are rounded down on every level, as before.
+            self.walker_points.append(int(self.walker_points[-1] * self.scale))
+
+    def lookup(self, level: int):
+        """Return the parameters for a level.
+
+        Args:
+            level (int): The level, starting at 1.
+
+        Returns:
+            tuple[float, float, float, int]: (dragon_speed, element_speed,
+            army_speed, walker_points) for that level.
+        """
+
+        self._extend(level)
+        index = level - 1
+        return (self.dragon_speed[index], self.element_speed[index],
+                self.army_speed[index], self.walker_points[index])
+
+    def as_arrays(self, levels: int):
+        """Return the first `levels` levels as NumPy arrays.
+
+        Index `level` of each array holds the value for that level, so the
+        arrays can be indexed directly with an array of levels. Index 0
+        repeats level 1.
+
+        Args:
+            levels (int): Highest level that must be present.
+
+        Returns:
+            tuple[np.ndarray, ...]: (dragon_speed, element_speed, army_speed,
+            walker_points) arrays of length `levels + 1`.
+        """
+
+        self._extend(levels)
+        return tuple(np.array(values[:1] + values[:levels])
+                     for values in (self.dragon_speed, self.element_speed,
+                                    self.army_speed, self.walker_points))
+
+@lru_cache(maxsize=None)
+def difficulty_table(scale: float, dragon_speed: float, element_speed: float,
+                     army_speed: float, walker_points: int):
+    """Return the shared DifficultyTable for a scale and set of base values.
+
+    Tables are cached, so every game (and every restart) using the same
+    settings shares a single table.
+
+    Args:
+        scale (float): Multiplier applied on every level-up.
+        dragon_speed (float): Dragon speed on level 1.
+        element_speed (float): Element speed on level 1.
+        army_speed (float): Army speed on level 1.
+        walker_points (int): Points per walker on level 1.
+
+    Returns:
+        DifficultyTable: The cached table.
+    """
+
+    return DifficultyTable(scale, dragon_speed, element_speed, army_speed,
+                           walker_points)
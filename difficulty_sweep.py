@@ -0,0 +1,154 @@
+"""Sweep difficulty settings with batched headless games.
+
+For every combination of `difficulty_scale` and `starting_dragon_count` in
+the grid, a VectorWhiteWalkerEnv plays a batch of games driven by the
+scripted patrol policy (with random jitter), and the survival time, score
+and level reached are summarized into one row of a CSV table. This lets
+the difficulty curve be tuned without manual play sessions. The games are
+played with the settings' enemy fire (`ice_shot_interval`), which the
+vector env mirrors, so the table describes the game players get.
+
+Usage:
+    python difficulty_sweep.py --scales 1.05 1.1 1.2 --lives 1 3 5 --games 256
+"""
+
+import argparse
+import csv
+import itertools
+import time
+
+import numpy as np
+
+from policies import VectorScriptedPolicy
+from settings import Settings
+from vector_env import VectorWhiteWalkerEnv
+
+# Columns of the summary table, in order.
+SUMMARY_FIELDS = ('difficulty_scale', 'starting_dragon_count', 'games',
+                  'mean_frames', 'median_frames', 'mean_score', 'median_score',
+                  'max_score', 'mean_level', 'max_level', 'capped')
+
+def simulate(scale: float, lives: int, games: int, max_frames: int, seed: int):
+    """Play one batch of games with the given difficulty settings.
+
+    Every game is played until its first game over, or until `max_frames`.
+
+    Args:
+        scale (float): Value of `difficulty_scale` for every game.
+        lives (int): Value of `starting_dragon_count` for every game.
+        games (int): Number of games in the batch.
+        max_frames (int): Frame cap for each game.
+        seed (int): Seed for the policy's jitter.
+
+    Returns:
+        dict: One row of the summary table, keyed by SUMMARY_FIELDS.
+    """
+
+    settings = Settings()
+    # The scale must be set before the dynamic settings (and their
+    # difficulty table) are initialized.
+    settings.difficulty_scale = scale
+    settings.initialize_dynamic_settings()
+    settings.starting_dragon_count = lives
+
+    env = VectorWhiteWalkerEnv(games, settings)
+    policy = VectorScriptedPolicy(games, seed)
+    env.reset()
+
+    frames = np.zeros(games, dtype=np.int64)
+    scores = np.zeros(games, dtype=np.int64)
+    levels = np.zeros(games, dtype=np.int64)
+    finished = np.zeros(games, dtype=bool)
+
+    for _ in range(max_frames):
+        _, _, dones, info = env.step(policy.act(env))
+        # Only the first game over of every game is recorded.
+        first = dones & ~finished
+        frames[first] = info['frames'][first]
+        scores[first] = info['score'][first]
+        levels[first] = info['level'][first]
+        finished |= dones
+        if finished.all():
+            break
+
+    # Games still alive at the cap are recorded with their running totals.
+    capped = ~finished
+    frames[capped] = env.frames[capped]
+    scores[capped] = env.score[capped]
+    levels[capped] = env.level[capped]
+
+    return {
+        'difficulty_scale': scale,
+        'starting_dragon_count': lives,
+        'games': games,
+        'mean_frames': round(float(frames.mean()), 1),
+        'median_frames': float(np.median(frames)),
+        'mean_score': round(float(scores.mean()), 1),
+        'median_score': float(np.median(scores)),
+        'max_score': int(scores.max()),
+        'mean_level': round(float(levels.mean()), 2),
+        'max_level': int(levels.max()),
+        'capped': int(capped.sum()),
+    }
+
+def run_sweep(scales, lives, games: int, max_frames: int, output: str, seed: int = 0):
+    """Simulate every grid point and write the summary table.
+
+    Rows are written as soon as each grid point finishes.
+
+    Args:
+        scales (list[float]): Values of `difficulty_scale` to sweep.
+        lives (list[int]): Values of `starting_dragon_count` to sweep.
+        games (int): Number of games per grid point.
+        max_frames (int): Frame cap for each game.
+        output (str): Path of the CSV summary table.
+        seed (int): Seed for the policy's jitter.
+
+    Returns:
+        list[dict]: The summary rows.
+    """
+
+    rows = []
+    with open(output, 'w', newline='') as summary_file:
+        writer = csv.DictWriter(summary_file, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        for scale, count in itertools.product(scales, lives):
+            row = simulate(scale, count, games, max_frames, seed)
+            writer.writerow(row)
+            summary_file.flush()
+            rows.append(row)
+    return rows
+
+def main():
+    """Parse command line arguments, run the sweep and print the table."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=float, nargs='+',
+                        default=[1.05, 1.1, 1.15, 1.2],
+                        help='difficulty_scale values to sweep')
+    parser.add_argument('--lives', type=int, nargs='+', default=[1, 3, 5],
+                        help='starting_dragon_count values to sweep')
+    parser.add_argument('--games', type=int, default=256,
+                        help='games per grid point')
+    parser.add_argument('--max-frames', type=int, default=60 * 60 * 10,
+                        help='frame cap per game')
+    parser.add_argument('--output', default='difficulty_sweep.csv',
+                        help='CSV file the summary table is written to')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed for the policy jitter')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = run_sweep(args.scales, args.lives, args.games, args.max_frames,
+                     args.output, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'scale':>6} {'lives':>5} {'frames':>9} {'score':>9} {'level':>6} {'capped':>6}")
+    for row in rows:
+        print(f"{row['difficulty_scale']:>6} {row['starting_dragon_count']:>5} "
+              f"{row['mean_frames']:>9} {row['mean_score']:>9} "
+              f"{row['mean_level']:>6} {row['capped']:>6}")
+    print(f"Swept {len(rows)} grid points in {elapsed:.1f}s, table in {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -41,6 +41,7 @@ class Dragon:
         self.boundaries = self.screen.get_rect() 
 
         # Load the dragon image and scale it to the specified size.
+        game.tracer.instant('asset_load', {'file': self.settings.dragon_file.name})
         self.image = pygame.image.load(self.settings.dragon_file)
         self.image = pygame.transform.scale(self.image,
             (self.settings.dragon_width, self.settings.dragon_height))
@@ -111,16 +112,16 @@ class Dragon:
         self.screen.blit(self.image, self.rect) 
     
     def shoot(self):
-        """Ask the arsenal to fire a projectile.
+        """Ask the arsenal to fire the current weapon.
 
-        Delegates to `self.arsenal.shoot_element()` to create a new Element
-        if possible.
+        Delegates to `self.arsenal.shoot()`, which creates a new Element or
+        fires the beam if possible.
 
         Returns:
             bool: True if a shot was fired, False otherwise.
         """
         
-        return self.arsenal.shoot_element() # Returns True if a shot was fired, False otherwise.
+        return self.arsenal.shoot() # Returns True if a shot was fired, False otherwise.
 
     def check_collision(self, other_group):
         """Check for collision with any sprite in the given group.
@@ -1,5 +1,5 @@
-import pygame
 from pygame.sprite import Sprite
+from assets import load_image
 from typing import TYPE_CHECKING
 
 # Type checking is used to avoid circular imports.
@@ -20,6 +20,11 @@ class Element(Sprite):
         image (pygame.Surface): Loaded and scaled element sprite image.
         rect (pygame.Rect): Rectangular area representing the element's position.
         x (float): Horizontal position stored as a float for smooth movement.
+        start_x (float): `x` at the start of the path since the last
+            collision check (used by swept collisions).
+        start_frame (int): Frame number the path starts at.
+        end_frame (int | None): Frame number the element left the screen at,
+            in swept collision mode; it stops there until the next check.
     """
     
     def __init__(self, game: 'WhiteWalkerInvasion'):
@@ -34,10 +39,9 @@ class Element(Sprite):
         self.screen = game.screen
         self.settings = game.settings
 
-        # Load and scale the element image.
-        self.image = pygame.image.load(self.settings.element_file)
-        self.image = pygame.transform.scale(self.image,
-            (self.settings.element_width, self.settings.element_height))
+        # The scaled element image, shared by all elements.
+        self.image = load_image(self.settings.element_file,
+            (self.settings.element_width, self.settings.element_height), game.tracer)
         
         self.rect = self.image.get_rect() # Get the rectangular area of the image.
         
@@ -46,17 +50,28 @@ class Element(Sprite):
 
         # Store the element's x-coordinate as a float for smooth movement.
         self.x = float(self.rect.x)
+        self.end_frame = None
+        self.reset_path(game.frame_number)
 
     def update(self):
         """Move the element across the screen horizontally.
 
         The element's x-coordinate is incremented by the configured element
         speed each frame, and the rect is updated to match the new float value.
+        An element that left the screen stays put.
         """
         
+        if self.end_frame is not None:
+            return
         self.x += self.settings.element_speed # Increase x-coordinate by the speed.
         self.rect.x = self.x # Update the rectangle's position.
 
+    def reset_path(self, frame: int):
+        """Start the element's path for swept collisions where it is now."""
+
+        self.start_x = self.x
+        self.start_frame = frame
+
     def draw_element(self):
         """Draw the element sprite to the screen.
 
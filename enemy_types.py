@@ -0,0 +1,88 @@
+"""Enemy types: the archetypes the army's walkers are made from.
+
+The types are data in the settings: `settings.enemy_types` gives each
+one a sprite, hit points, a speed (how far it moves toward the dragon on
+each drop, relative to `army_drop_speed`) and a point value (a multiple
+of the level's `walker_points`). `settings.enemy_formations` lists the
+types of the formation's columns for each level, so later levels field
+mixed formations.
+
+Each EnemyType loads its scaled image once, and every walker of the type
+shares it. The army keeps a sprite group per type, so each type is drawn
+with a single `blits` call and moved by one loop. Collisions are tested
+on the walkers' rects (as in vector_env.py), so the types have no masks.
+"""
+
+import pygame
+
+from assets import load_image
+
+from typing import TYPE_CHECKING
+
+# Type checking is used to avoid circular imports.
+if TYPE_CHECKING:
+    from settings import Settings
+
+class EnemyType:
+    """One kind of enemy, shared by all walkers of that kind.
+
+    Attributes:
+        name (str): Name of the type in `settings.enemy_types`.
+        index (int): Position of the type in `settings.enemy_types`, used
+            to store types in arrays and save states.
+        sprite_file (Path): Image file of the type's sprite.
+        image (pygame.Surface): Sprite scaled to the walker size.
+        hit_points (int): Hits a walker of this type takes to destroy.
+        speed (float): Multiplier of the army's drop toward the dragon.
+        points (int): Points for destroying one, as a multiple of `walker_points`.
+    """
+
+    def __init__(self, name: str, index: int, settings: 'Settings', tracer=None):
+        """Load the type's sprite.
+
+        Args:
+            name (str): Name of the type in `settings.enemy_types`.
+            index (int): Position of the type in `settings.enemy_types`.
+            settings (Settings): Game settings holding the type and walker size.
+            tracer (Tracer | NullTracer): Records the sprite's 'asset_load'.
+        """
+
+        self.name = name
+        self.index = index
+        self.sprite_file, self.hit_points, self.speed, self.points = settings.enemy_types[name]
+        self.set_image(load_image(self.sprite_file,
+                                  (settings.walker_width, settings.walker_height), tracer))
+
+    def set_image(self, image: pygame.Surface):
+        """Use a new sprite image, e.g. after the file changed on disk."""
+
+        self.image = image
+
+def load_enemy_types(settings: 'Settings', tracer=None):
+    """Create every enemy type in the settings.
+
+    Args:
+        settings (Settings): Game settings holding `enemy_types`.
+        tracer (Tracer | NullTracer): Records the sprites' 'asset_load' events.
+
+    Returns:
+        dict[str, EnemyType]: The types by name, in the settings' order.
+    """
+
+    return {name: EnemyType(name, index, settings, tracer)
+            for index, name in enumerate(settings.enemy_types)}
+
+def formation_types(settings: 'Settings', level: int):
+    """Return the column pattern of a level's formation.
+
+    Args:
+        settings (Settings): Game settings holding `enemy_formations`.
+        level (int): Level, starting at 1.
+
+    Returns:
+        tuple[str, ...]: Type names of the columns from the front back,
+        repeated over all columns.
+    """
+
+    formations = settings.enemy_formations
+    return formations[min(level, len(formations)) - 1]
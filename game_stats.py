@@ -1,8 +1,9 @@
-# from pathlib import Path
-import json
+import time
 
 from typing import TYPE_CHECKING
 from pathlib import Path # Import Path for type hinting in docstring
+from leaderboard import ScoreStore, settings_hash
+from score_writer import ScoreWriter, load_checkpoint
 
 if TYPE_CHECKING:
     from alien_invasion import WhiteWalkerInvasion
@@ -11,18 +12,25 @@ class GameStats:
     """
     Track statistics for the game, including score, high score, and remaining lives.
 
-    This class also handles loading and saving the all-time high score from
-    a JSON file on disk.
+    This class also records every finished run in a ScoreStore (an SQLite
+    database on disk) and loads the all-time high score from it. All writes
+    go through a ScoreWriter, so they happen off the main loop, and the
+    statistics are checkpointed on level-up and game over so a crash does
+    not lose the run in progress.
 
     Attributes:
         game (WhiteWalkerInvasion): Reference to the main game instance.
         settings (Settings): Game settings used to configure scoring and lives.
         max_score (int): Highest score achieved during the current session.
         high_score (int): All-time high score loaded from / saved to disk.
-        path (Path): Filesystem path of the JSON file used to store scores.
+        path (Path): Filesystem path of the SQLite database used to store runs.
+        store (ScoreStore): Persistent store of finished runs.
+        writer (ScoreWriter): Background thread performing all score writes.
         dragons_left (int): Remaining lives for the current game run.
         score (int): Current score for the ongoing game.
         level (int): Current game level.
+        run_start (float): Monotonic time at which the current run started.
+        run_settings_hash (str): Hash of the settings the current run uses.
     """
 
     def __init__(self, game: 'WhiteWalkerInvasion'):
@@ -41,54 +49,104 @@ class GameStats:
         self.settings = game.settings
         self.max_score: int = 0 # Initialize the maximum score reached in the current game session.
         self.high_score: int = 0 # Initialize the all-time high score.
-        self.path: Path = self.settings.scores_file # File path for high scores.
+        self.path: Path = self.settings.scores_db_file # Database of finished runs.
 
-        self.init_saved_scores() # Load the high score from file.
+        self.init_saved_scores() # Load the high score from the store.
         self.reset_stats() # Initialize in-game statistics (lives, current score, level).
     
     def init_saved_scores(self):
         """
-        Load the all-time high score from a JSON file.
+        Open the score store and load the all-time high score from it.
 
-        If the file exists and has some content, this method attempts to
-        read a JSON object from it and load the 'high_score' value. If the
-        file is missing or considered empty, the high score is set to 0
-        and a fresh file is created via save_scores().
+        The store is an SQLite database of every finished run. The first
+        time it is opened, the high score kept in the old JSON scores file
+        is migrated into it. Headless games (e.g. batch runs) use a
+        throwaway in-memory store and never touch the player's scores.
         """
-        # Check if the file exists and has content.
-        # NOTE: This uses self.path.stat.__sizeof__() as a crude check;
-        # the intention is to not treat an obviously empty file as valid data.
-        self.path = self.settings.scores_file
-        if self.path.exists() and self.path.stat.__sizeof__() > 20:
-            contents = self.path.read_text()
-            scores = json.loads(contents)
-            # Load the high score, defualting to zero if key is missing.
-            self.high_score = scores.get('high_score', 0)
+        
+        if self.game.headless:
+            self.store = ScoreStore(':memory:')
+            checkpoint_file = None
         else:
-            # If the file does not exist or is effectively empty,
-            # default the high score to 0 and create the file.
-            self.high_score = 0
-            # Save the file with an initial high_score entry.
-            self.save_scores()
+            self.store = ScoreStore(self.path, legacy_file=self.settings.scores_file)
+            checkpoint_file = self.settings.checkpoint_file
+            self._recover_checkpoint(checkpoint_file)
+
+        self.high_score = self.store.high_score()
+        self.writer = ScoreWriter(self.store, checkpoint_file)
+
+    def _recover_checkpoint(self, checkpoint_file: Path):
+        """Record a run that was still in progress when the game last crashed.
+
+        A checkpoint marked as in progress means the game exited without
+        finishing the run, so the checkpointed score is recorded now and
+        the checkpoint removed.
+
+        Args:
+            checkpoint_file (Path): File the checkpoints are written to.
+        """
+        
+        checkpoint = load_checkpoint(checkpoint_file)
+        if checkpoint and checkpoint.get('in_progress'):
+            self.store.record_run(checkpoint['score'], checkpoint['level'],
+                                  checkpoint['duration'], checkpoint['settings_hash'],
+                                  checkpoint['timestamp'])
+            checkpoint_file.unlink()
+
+    def checkpoint(self):
+        """Queue a checkpoint of the current statistics for the writer thread.
+
+        Called on level-up and game over. The checkpoint records whether
+        a game is still in progress, for crash recovery.
+        """
+        
+        self.writer.checkpoint({
+            'in_progress': self.game.game_active,
+            'score': self.score,
+            'max_score': self.max_score,
+            'high_score': self.high_score,
+            'level': self.level,
+            'dragons_left': self.dragons_left,
+            'duration': time.monotonic() - self.run_start,
+            'settings_hash': self.run_settings_hash,
+            'timestamp': time.time(),
+        })
+
+    def record_run(self):
+        """Queue the current run (score, level, duration, settings) to be stored.
+
+        This is called when a game ends, either by losing the last life or
+        by quitting in the middle of a game without saving it.
+        """
+        
+        duration = time.monotonic() - self.run_start
+        self.writer.record_run(self.score, self.level, duration, self.run_settings_hash)
+
+    def save_scores(self, record: bool = True):
+        """Persist scores before the game exits.
 
-    def save_scores(self):
-        """Save the current high score to the JSON file.
+        If a game is still in progress, it is recorded as a finished run so
+        its score counts towards the high score, unless `record` is False
+        (the game was saved to be resumed later). Pending writes are then
+        flushed, waiting at most `settings.score_flush_timeout` seconds,
+        and the store is closed.
 
-        This writes a small JSON object containing the `high_score` value
-        to the path specified in settings (self.path).
+        Args:
+            record (bool): Whether to record a game still in progress.
         """
         
-        scores = {
-            'high_score': self.high_score
-        }
-        # Dump the dictionary to a formatted JSON string.
-        contents = json.dumps(scores, indent=4)
-        try:
-            # Write the content to the scores file.
-            self.path.write_text(contents)
-        except FileNotFoundError as e:
-            # Fallback error handling if the directory structure is missing.
-            print(f"File Not Found: {e}")
+        if self.game.game_active:
+            if record:
+                self.record_run()
+            self.game.game_active = False
+            # Clear the in-progress flag, so the run is not recovered as crashed either.
+            self.checkpoint()
+
+        flushed = self.writer.close(self.settings.score_flush_timeout)
+        print(self.writer.report())
+        # A writer that timed out may still be using the store.
+        if flushed:
+            self.store.close()
     
     def reset_stats(self):
         """Initialize statistics that can change during the game (lives, score, level).
@@ -103,6 +161,9 @@ class GameStats:
         self.score = 0
         # Level starts at 1 for a new game.
         self.level = 1
+        # Remember when this run started and which settings it is played with.
+        self.run_start = time.monotonic()
+        self.run_settings_hash = settings_hash(self.settings)
 
     def update(self, collisions: dict):
         """
@@ -125,20 +186,18 @@ class GameStats:
 
     def _update_score(self, collisions: dict):
         """
-        Calculate and update the current score based on the number of
-        white walkers destroyed in collisions.
+        Calculate and update the current score based on the white walkers
+        destroyed in collisions.
         
         Args:
             collisions (dict): A dictionary of detected collisions.
-                Keys are enemy sprites, values are lists of projectiles
-                that collided with that enemy.
+                Keys are destroyed enemy sprites, values are lists of
+                projectiles that collided with that enemy.
         """
-        # Count the number of walkers destroyed (the keys or values in the collisions dict).
-        # NOTE: The loop below assumes that each entry represents at least one walker.
-        for Walker in collisions.values():
-            # Add points for each destroyed walker.
-            # Each collision yields points defined in settings.walker_points.
-            self.score += self.settings.walker_points
+        for walker in collisions:
+            # Add points for each destroyed walker: settings.walker_points
+            # times the points of its enemy type.
+            self.score += self.settings.walker_points * walker.kind.points
     
     def _update_max_score(self):
         """Check if the current score is the highest for this session and update max_score.
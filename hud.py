@@ -16,6 +16,11 @@ class HUD:
     - current level
     - remaining lives (as dragon icons)
 
+    The background, lives, level and high score change rarely, so they are
+    pre-composited into a static layer that each frame starts from with a
+    single blit. Each of these fields has a dirty flag, and only the dirty
+    fields are redrawn into the layer, when their values actually change.
+
     Attributes:
         game: Reference to the main game instance.
         settings: Game settings used for fonts, colors, and image paths.
@@ -30,6 +35,16 @@ class HUD:
             Rendered text surfaces for different HUD elements.
         score_rect, max_score_rect, high_score_rect, level_rect (pygame.Rect):
             Rectangles defining positions of the respective text surfaces.
+        leaderboard_images (list[tuple[pygame.Surface, pygame.Rect]]):
+            Rendered lines of the leaderboard and their positions.
+        leaderboard_version (int): Score store version the lines were rendered from.
+        static_layer (pygame.Surface | None): Display-format surface holding the
+            background and the static fields (None until first drawn).
+        dirty (set[str]): Static fields ('background', 'lives', 'level',
+            'high_score') that must be redrawn into the static layer.
+        layer_version (int): Incremented whenever the static layer changes.
+        score_refresh_frames (int): Minimum number of frames between renders of
+            the score texts; updates in between are drawn by `refresh_scores`.
     """
 
     def __init__(self, game):
@@ -50,12 +65,30 @@ class HUD:
         # Padding used for margins from screen edges and between HUD lines.
         self.padding = 20
 
+        # The static layer is built on first draw; everything starts out dirty.
+        self.static_layer = None
+        self.dirty = {'background', 'lives', 'level', 'high_score'}
+        # Areas of the layer whose old contents must be covered with background.
+        self._stale_rects = []
+        self._lives_shown = None
+        self._high_score_str = None
+        self.level_rect = self.high_score_rect = None
+        self.layer_version = 0
+
+        # Score texts are rendered on every update unless the quality governor
+        # spaces the renders out.
+        self.score_refresh_frames = 1
+        self._scores_stale = False
+        self._frames_since_scores = 0
+
         # Prepare the initial score, max score, and high score images.
         self.update_scores()
         # Prepare the small life icon image used to draw remaining lives.
         self._setup_life_image()
         # Prepare the initial level text.
         self.update_level()
+        # Prepare the leaderboard shown between games.
+        self.update_leaderboard()
 
 
     def _setup_life_image(self):
@@ -64,6 +97,7 @@ class HUD:
         This uses the same dragon image as the player's sprite, scaled to
         the same configured width and height for consistency.
         """
+        self.game.tracer.instant('asset_load', {'file': self.settings.dragon_file.name})
         self.life_image = pygame.image.load(self.settings.dragon_file)
         self.life_image = pygame.transform.scale(self.life_image, (
             self.settings.dragon_width, self.settings.dragon_height))
@@ -77,12 +111,31 @@ class HUD:
         - max score (session)
         - high score (all-time)
 
-        It should be called whenever the underlying stats change.
+        It should be called whenever the underlying stats change. If the
+        texts were rendered less than `score_refresh_frames` frames ago, they
+        are only marked stale, and `refresh_scores` renders them later.
         """
         
+        if self._frames_since_scores < self.score_refresh_frames - 1:
+            self._scores_stale = True
+            return
+        self._render_scores()
+
+    def refresh_scores(self):
+        """Count a frame, rendering stale score texts once they are due."""
+
+        self._frames_since_scores += 1
+        if self._scores_stale and self._frames_since_scores >= self.score_refresh_frames - 1:
+            self._render_scores()
+
+    def _render_scores(self):
+        """Render the score, max score and high score texts."""
+
         self._update_score()
         self._update_max_score()
         self._update_high_score()
+        self._scores_stale = False
+        self._frames_since_scores = 0
 
     def _update_score(self):
         """Render the current score text and position it on the bottom right."""
@@ -111,6 +164,10 @@ class HUD:
         """Render the all-time high score and position it at the bottom center."""
         
         high_score_str = f"High-Score: {self.game_stats.high_score: ,.0f}"
+        if high_score_str == self._high_score_str:
+            return # Unchanged, so the static layer stays as it is.
+        self._high_score_str = high_score_str
+        self._mark_dirty('high_score', self.high_score_rect)
         self.high_score_image = self.font.render(high_score_str, True,
                                             self.settings.text_color, None)
         self.high_score_rect = self.high_score_image.get_rect()
@@ -122,6 +179,7 @@ class HUD:
         """Render the current level text and position it on the bottom left."""
         
         level_str = f"Level: {self.game_stats.level: ,.0f}"
+        self._mark_dirty('level', self.level_rect)
         self.level_image = self.font.render(level_str, True,
                                             self.settings.text_color, None)
         self.level_rect = self.level_image.get_rect()
@@ -129,34 +187,141 @@ class HUD:
         self.level_rect.left = self.padding
         self.level_rect.bottom = self.boundaries.bottom - self.padding
 
-    def _draw_lives(self):
+    def update_leaderboard(self):
+        """Render the best stored runs as lines below the Play button.
+
+        The top runs come from the score store's cached query, so this is
+        cheap to call whenever a run is recorded.
+        """
+        
+        store = self.game_stats.store
+        # Remember which version of the store these lines are rendered from. It is
+        # read first: a run recorded during the query then only costs a re-render.
+        self.leaderboard_version = store.version
+        top_runs = store.top_scores(self.settings.leaderboard_size)
+        self.leaderboard_images = []
+        # Start below the Play button, which sits at the screen center.
+        current_y = self.boundaries.centery + self.settings.button_height
+        for rank, (score, level, _) in enumerate(top_runs, start=1):
+            line_str = f"{rank}. {score: ,.0f}  (Level {level})"
+            line_image = self.font.render(line_str, True,
+                                          self.settings.text_color, None)
+            line_rect = line_image.get_rect()
+            line_rect.midtop = (self.boundaries.centerx, current_y)
+            self.leaderboard_images.append((line_image, line_rect))
+            current_y = line_rect.bottom + self.padding // 2
+
+    def draw_leaderboard(self):
+        """Draw the leaderboard lines, re-rendering them if a run was recorded.
+
+        Runs are recorded by a background thread, so the store's version
+        is compared with the rendered one instead of being told directly.
+        """
+        
+        if self.leaderboard_version != self.game_stats.store.version:
+            self.update_leaderboard()
+        for line_image, line_rect in self.leaderboard_images:
+            self.screen.blit(line_image, line_rect)
+
+    def _lives_rect(self, lives: int):
+        """Return the area covered by `lives` life icons."""
+        
+        step = self.life_rect.width - self.padding
+        width = self.life_rect.width + step * (lives - 1) if lives > 0 else 0
+        return pygame.Rect(self.padding, self.padding, width, self.life_rect.height)
+
+    def _draw_lives(self, surface: pygame.Surface):
         """Draw a row of life icons representing remaining lives.
 
         Each remaining life is represented by a dragon icon. Icons are drawn
         starting from the top-left corner and laid out horizontally.
+
+        Args:
+            surface (pygame.Surface): Surface to draw on (the static layer).
         """
         
         current_x = self.padding
         current_y = self.padding
         # Draw one icon for each remaining dragon (life).
         for _ in range(self.game_stats.dragons_left):
-            self.screen.blit(self.life_image, (current_x, current_y))
+            surface.blit(self.life_image, (current_x, current_y))
             # Move to the right for the next life icon, with some overlap/padding.
             current_x += self.life_rect.width - self.padding
+        self._lives_shown = self.game_stats.dragons_left
+
+    def _mark_dirty(self, field: str, old_rect: pygame.Rect = None):
+        """Flag a static field for redrawing.
+
+        Args:
+            field (str): Name of the field.
+            old_rect (pygame.Rect): Where the field was last drawn, which
+                is covered with background before the field is redrawn.
+        """
+        
+        self.dirty.add(field)
+        if old_rect is not None:
+            self._stale_rects.append(old_rect.copy())
+
+    def invalidate(self):
+        """Rebuild the whole static layer on the next frame.
+
+        Needed when the background or the life icon image is replaced.
+        """
+        
+        self.dirty.add('background')
+
+    def _update_static_layer(self):
+        """Redraw the dirty fields of the static layer.
+
+        If the background is dirty, the layer is rebuilt from scratch.
+        Otherwise the old area of each dirty field is covered with the
+        background and the field is drawn again.
+        """
+        
+        if self._lives_shown != self.game_stats.dragons_left:
+            self._mark_dirty('lives', self._lives_rect(self._lives_shown or 0))
+        if not self.dirty:
+            return
+
+        if self.static_layer is None or 'background' in self.dirty:
+            # convert() stores the layer in the display's pixel format. The
+            # texture backend has no display surface; it uploads the layer instead.
+            if pygame.display.get_surface() is not None:
+                self.static_layer = self.game.bg.convert()
+            else:
+                self.static_layer = self.game.bg.copy()
+            self.dirty = {'lives', 'level', 'high_score'}
+        else:
+            for rect in self._stale_rects:
+                self.static_layer.blit(self.game.bg, rect, rect)
+        self._stale_rects.clear()
+
+        layer = self.static_layer
+        if 'lives' in self.dirty:
+            self._draw_lives(layer)
+        if 'level' in self.dirty:
+            layer.blit(self.level_image, self.level_rect)
+        if 'high_score' in self.dirty:
+            layer.blit(self.high_score_image, self.high_score_rect)
+        self.dirty.clear()
+        self.layer_version += 1
+
+    def draw_background(self):
+        """Start a frame by drawing the static layer over the whole screen.
+
+        The background, lives, level and high score are all part of it.
+        """
+        
+        self._update_static_layer()
+        self.screen.blit(self.static_layer, (0, 0))
 
     def draw(self):
-        """Draw all HUD elements onto the screen.
+        """Draw the HUD elements that are not part of the static layer.
 
         This method blits:
-        - high score text
         - max score text
         - current score text
-        - level text
-        - remaining lives icons
         """
         
-        self.screen.blit(self.high_score_image, self.high_score_rect)
         self.screen.blit(self.max_score_image, self.max_score_rect)
         self.screen.blit(self.score_image, self.score_rect)
-        self.screen.blit(self.level_image, self.level_rect)
-        self._draw_lives()
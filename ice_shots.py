@@ -0,0 +1,207 @@
+"""Ice shots fired by the White Walkers, stored in arrays instead of sprites.
+
+Every few seconds, the walker at the front of each row (the one closest to
+the dragon) fires an ice shot aimed at the dragon. There can be thousands
+of shots at once, so they are not Sprites: IceShots keeps their positions
+and velocities in preallocated NumPy arrays, with the live shots packed
+at the front. Each frame all shots are moved and the ones that left the
+screen are dropped in a few array operations, the hit test against the
+dragon is one vectorized comparison, and drawing is a single
+`Surface.blits` call.
+"""
+
+import itertools
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pygame
+
+from assets import load_image
+
+# Type checking is used to avoid circular imports.
+if TYPE_CHECKING:
+    from alien_invasion import WhiteWalkerInvasion
+    from white_walker_army import WhiteWalkerArmy
+
+class IceShots:
+    """The walkers' ice shots, as arrays of positions and velocities.
+
+    Attributes:
+        game (WhiteWalkerInvasion): Reference to the main game instance.
+        settings (Settings): Game settings for the shots' size, speed and rate.
+        capacity (int): Most shots that can exist at once; extra shots are not fired.
+        count (int): Number of live shots (the first `count` array entries).
+        x, y (np.ndarray): Top-left corners of the shots.
+        vx, vy (np.ndarray): Velocities of the shots, in pixels per frame.
+        size (int): Width and height of a shot.
+        image (pygame.Surface): Shot image with per-pixel alpha.
+        blit_image (pygame.Surface): Copy of the image with a run-length encoded
+            color key instead of alpha, which the shots are drawn with.
+    """
+
+    def __init__(self, game: 'WhiteWalkerInvasion'):
+        """Allocate the arrays and prepare the image.
+
+        Args:
+            game (WhiteWalkerInvasion): The active game instance.
+        """
+
+        self.game = game
+        self.settings = game.settings
+        self.capacity = self.settings.ice_shot_capacity
+        self.count = 0
+        self.x = np.zeros(self.capacity)
+        self.y = np.zeros(self.capacity)
+        self.vx = np.zeros(self.capacity)
+        self.vy = np.zeros(self.capacity)
+        self.size = self.settings.ice_shot_size
+        self._frames_until_volley = self.settings.ice_shot_interval
+
+        self.image = load_image(self.settings.ice_file, (self.size, self.size), game.tracer)
+        # Blitting thousands of alpha images is slow, so the screen gets a copy
+        # where mostly transparent pixels become a run-length encoded color key,
+        # which blits several times faster.
+        rgb = pygame.surfarray.array3d(self.image)
+        rgb[pygame.surfarray.array_alpha(self.image) < 128] = (255, 0, 255)
+        self.blit_image = pygame.surfarray.make_surface(rgb)
+        self.blit_image.set_colorkey((255, 0, 255), pygame.RLEACCEL)
+
+    def clear(self):
+        """Remove every shot, e.g. when a level is reset."""
+
+        self.count = 0
+        self._frames_until_volley = self.settings.ice_shot_interval
+
+    def spawn(self, x, y, vx, vy):
+        """Add shots, as many as there is room for.
+
+        Args:
+            x, y (array-like): Top-left corners of the new shots.
+            vx, vy (array-like): Velocities of the new shots.
+
+        Returns:
+            int: Number of shots added.
+        """
+
+        start = self.count
+        added = min(len(x), self.capacity - start)
+        end = start + added
+        self.x[start:end] = x[:added]
+        self.y[start:end] = y[:added]
+        self.vx[start:end] = vx[:added]
+        self.vy[start:end] = vy[:added]
+        self.count = end
+        return added
+
+    def fire(self, army: 'WhiteWalkerArmy'):
+        """Let the front walker of every row fire at the dragon, on a fixed cadence.
+
+        Args:
+            army (WhiteWalkerArmy): The army whose walkers fire.
+        """
+
+        interval = self.settings.ice_shot_interval
+        if interval <= 0:
+            return # Enemy fire is disabled.
+        self._frames_until_volley -= 1
+        if self._frames_until_volley > 0:
+            return
+        self._frames_until_volley = interval
+
+        # The front of a row is its leftmost walker; rows share their y.
+        front = {}
+        for walker in army.army:
+            other = front.get(walker.rect.y)
+            if other is None or walker.rect.x < other.rect.x:
+                front[walker.rect.y] = walker
+        if not front:
+            return
+
+        half = self.size / 2
+        starts = np.array([walker.rect.midleft for walker in front.values()], dtype=float)
+        dx = self.game.dragon.rect.centerx - starts[:, 0]
+        dy = self.game.dragon.rect.centery - starts[:, 1]
+        # Aim at the dragon's center at the configured speed.
+        speed = self.settings.ice_shot_speed / np.maximum(np.hypot(dx, dy), 1.0)
+        self.spawn(starts[:, 0] - half, starts[:, 1] - half, dx * speed, dy * speed)
+
+    def update(self):
+        """Move every shot and drop the ones that left the screen."""
+
+        count = self.count
+        if not count:
+            return
+        x, y = self.x[:count], self.y[:count]
+        x += self.vx[:count]
+        y += self.vy[:count]
+        size = self.size
+        inside = ((x > -size) & (x < self.settings.screen_width)
+                  & (y > -size) & (y < self.settings.screen_height))
+        self._keep(inside)
+
+    def check_hit(self, rect: pygame.Rect):
+        """Remove the shots overlapping a rect.
+
+        Args:
+            rect (pygame.Rect): The rect to test, e.g. the dragon's.
+
+        Returns:
+            int: Number of shots that hit.
+        """
+
+        count = self.count
+        if not count:
+            return 0
+        # Shots hit the way pygame.Rect.colliderect would with whole-pixel rects.
+        left = np.floor(self.x[:count] + 0.5)
+        top = np.floor(self.y[:count] + 0.5)
+        size = self.size
+        hit = ((left < rect.right) & (left + size > rect.left)
+               & (top < rect.bottom) & (top + size > rect.top))
+        hits = int(np.count_nonzero(hit))
+        if hits:
+            self._keep(~hit)
+        return hits
+
+    def _keep(self, mask: np.ndarray):
+        """Keep only the live shots selected by `mask`, packed at the front."""
+
+        kept = int(np.count_nonzero(mask))
+        if kept == self.count:
+            return
+        for values in (self.x, self.y, self.vx, self.vy):
+            values[:kept] = values[:self.count][mask]
+        self.count = kept
+
+    def positions(self, scale: float = 1.0):
+        """Return the top-left corners of the live shots in whole pixels.
+
+        Args:
+            scale (float): Internal render resolution scale to convert to.
+
+        Returns:
+            list[list[int]]: One [x, y] pair per shot.
+        """
+
+        count = self.count
+        corners = np.empty((count, 2))
+        corners[:, 0] = self.x[:count]
+        corners[:, 1] = self.y[:count]
+        if scale != 1.0:
+            corners *= scale
+        return np.floor(corners + 0.5).astype(np.int64).tolist()
+
+    def draw(self, surface: pygame.Surface, image: pygame.Surface = None,
+             scale: float = 1.0):
+        """Draw every shot onto a surface with a single `blits` call.
+
+        Args:
+            surface (pygame.Surface): Surface to draw onto.
+            image (pygame.Surface): Image to draw instead of the shot image,
+                e.g. one scaled for a lower render resolution.
+            scale (float): Internal render resolution scale of `surface`.
+        """
+
+        if self.count:
+            image = self.blit_image if image is None else image
+            surface.blits(zip(itertools.repeat(image), self.positions(scale)), doreturn=False)
@@ -0,0 +1,199 @@
+"""Persistent SQLite store of every finished run.
+
+ScoreStore keeps one row per run (score, level reached, duration, time it
+was recorded and a hash of the settings it was played with) in an indexed
+SQLite table, so the all-time high score and the top-N leaderboard are
+simple index lookups no matter how many runs are stored. The database runs
+in WAL mode and every write is its own transaction, so a crash never leaves
+a half-written score behind.
+
+The first time a store is opened, the single `high_score` kept in the old
+scores.json file is migrated into it as a run.
+
+A store may be shared between threads (see score_writer.py): every use of
+the connection is serialized by a lock.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from typing import TYPE_CHECKING
+
+# Type checking is used to avoid circular imports.
+if TYPE_CHECKING:
+    from settings import Settings
+
+# Settings that change how a run plays out, and so go into its settings hash.
+HASHED_SETTINGS = (
+    'screen_width', 'screen_height', 'FPS', 'difficulty_scale',
+    'dragon_width', 'dragon_height', 'walker_width', 'walker_height',
+    'dragon_speed', 'starting_dragon_count', 'element_speed', 'element_amount',
+    'element_width', 'element_height', 'army_speed', 'army_drop_speed',
+    'walker_points',
+)
+
+def settings_hash(settings: 'Settings'):
+    """Return a short hash identifying the gameplay settings of a run.
+
+    Runs with the same hash were played under the same rules, so their
+    scores can be compared directly.
+
+    Args:
+        settings (Settings): Settings at the start of the run.
+
+    Returns:
+        str: The first 16 hex digits of a SHA-1 over the hashed settings.
+    """
+
+    values = [f"{name}={getattr(settings, name, None)!r}" for name in HASHED_SETTINGS]
+    return hashlib.sha1(';'.join(values).encode()).hexdigest()[:16]
+
+class ScoreStore:
+    """An indexed SQLite table of runs, with a cached top-N query.
+
+    Attributes:
+        path (Path | str): Database file, or ':memory:' for a throwaway store.
+        connection (sqlite3.Connection): Open connection to the database.
+        version (int): Incremented whenever a run is recorded, so readers
+            can tell when their copy of the leaderboard is out of date.
+    """
+
+    def __init__(self, path, legacy_file: Path = None):
+        """Open (and if needed create and migrate) the score database.
+
+        Args:
+            path (Path | str): Database file, or ':memory:'.
+            legacy_file (Path): Old scores.json file whose `high_score` is
+                imported the first time the database is opened.
+        """
+
+        self.path = path
+        self.connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self.version = 0
+        # WAL keeps readers and the writer from blocking each other, and
+        # synchronous=NORMAL is still crash-safe (atomic) in WAL mode.
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self._create_tables()
+        # Cached results of top_scores(), keyed by the number of runs asked for.
+        self._top_cache = {}
+
+        if legacy_file is not None:
+            self._migrate_legacy_file(legacy_file)
+
+    def _create_tables(self):
+        """Create the runs table, its score index and the metadata table."""
+
+        with self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY,
+                    score INTEGER NOT NULL,
+                    level INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    timestamp REAL NOT NULL,
+                    settings_hash TEXT NOT NULL
+                )""")
+            # Serves both the high score and the leaderboard.
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS runs_by_score ON runs (score DESC)')
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )""")
+
+    def _migrate_legacy_file(self, legacy_file: Path):
+        """Import the high score from the old scores.json, once.
+
+        The high score becomes a single run with an unknown level and
+        duration, stamped with the file's modification time. The migration
+        is recorded in the metadata table so it never runs twice.
+
+        Args:
+            legacy_file (Path): The old scores.json file.
+        """
+
+        done = self.connection.execute(
+            "SELECT 1 FROM meta WHERE key = 'legacy_scores_migrated'").fetchone()
+        if done:
+            return
+
+        high_score = 0
+        if legacy_file.exists() and legacy_file.stat().st_size > 0:
+            try:
+                high_score = json.loads(legacy_file.read_text()).get('high_score', 0)
+            except json.JSONDecodeError as e:
+                print(f"Could not migrate {legacy_file}: {e}")
+
+        with self.connection:
+            if high_score > 0:
+                self.connection.execute(
+                    'INSERT INTO runs (score, level, duration, timestamp, settings_hash) '
+                    "VALUES (?, 0, 0, ?, 'legacy')",
+                    (high_score, legacy_file.stat().st_mtime))
+            self.connection.execute(
+                "INSERT INTO meta (key, value) VALUES ('legacy_scores_migrated', ?)",
+                (str(time.time()),))
+        self._top_cache.clear()
+
+    def record_run(self, score: int, level: int, duration: float,
+                   settings_hash: str, timestamp: float = None):
+        """Store a finished run in its own transaction.
+
+        Args:
+            score (int): Final score of the run.
+            level (int): Level reached.
+            duration (float): Length of the run in seconds.
+            settings_hash (str): Hash of the settings the run was played with.
+            timestamp (float): When the run finished. Defaults to now.
+        """
+
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock, self.connection:
+            self.connection.execute(
+                'INSERT INTO runs (score, level, duration, timestamp, settings_hash) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (score, level, duration, timestamp, settings_hash))
+            self._top_cache.clear()
+            self.version += 1
+
+    def top_scores(self, count: int = 5):
+        """Return the best runs, highest score first.
+
+        Results are cached until the next run is recorded, so the HUD can
+        ask for them every time it redraws.
+
+        Args:
+            count (int): Number of runs to return.
+
+        Returns:
+            list[tuple[int, int, float]]: (score, level, timestamp) of each run.
+        """
+
+        top = self._top_cache.get(count)
+        if top is None:
+            with self._lock:
+                top = self.connection.execute(
+                    'SELECT score, level, timestamp FROM runs '
+                    'ORDER BY score DESC LIMIT ?', (count,)).fetchall()
+                self._top_cache[count] = top
+        return top
+
+    def high_score(self):
+        """Return the all-time high score, or 0 if no run is stored."""
+
+        top = self.top_scores(1)
+        return top[0][0] if top else 0
+
+    def close(self):
+        """Close the database connection."""
+
+        with self._lock:
+            self.connection.close()
@@ -0,0 +1,127 @@
+"""Per-level memory instrumentation based on tracemalloc.
+
+MemoryTracker takes a tracemalloc snapshot at every level transition and
+game restart, compares it with the previous one grouped by file and line,
+counts the live Walker, Element and Surface objects, and appends a section
+to a plain-text report. Steadily growing allocations or object counts from
+one level to the next point to a leak.
+
+Tracking is enabled with `settings.memory_report_file` or the WW_MEMTRACK
+environment variable. Otherwise a NullMemoryTracker is used, which does
+nothing, so tracemalloc's overhead is only paid when asked for.
+"""
+
+import gc
+import time
+import tracemalloc
+from collections import Counter
+
+import pygame
+
+from element import Element
+from white_walker import Walker
+
+# Object types counted in every report section.
+COUNTED_TYPES = (Walker, Element, pygame.Surface)
+
+def count_live_objects():
+    """Count the live Walker, Element and Surface objects.
+
+    Surfaces are not tracked by the garbage collector, so they are counted
+    through the containers (sprite attributes, lists, ...) that refer to them.
+
+    Returns:
+        Counter: Number of live objects per type name.
+    """
+
+    counts = Counter()
+    surfaces = set()
+    for obj in gc.get_objects():
+        if isinstance(obj, (Walker, Element)):
+            counts[type(obj).__name__] += 1
+        for referent in gc.get_referents(obj):
+            if isinstance(referent, pygame.Surface):
+                surfaces.add(id(referent))
+    counts['Surface'] = len(surfaces)
+    return counts
+
+class MemoryTracker:
+    """Snapshot and diff memory use at level transitions.
+
+    Attributes:
+        path (str): Report file that sections are appended to.
+        top (int): Number of allocation sites listed per section.
+        snapshots (int): Number of snapshots taken so far.
+    """
+
+    def __init__(self, path: str, frames: int = 1, top: int = 15):
+        """Start tracemalloc and take the baseline snapshot.
+
+        Args:
+            path (str): Report file that sections are appended to.
+            frames (int): Stack frames stored per allocation by tracemalloc.
+            top (int): Number of allocation sites listed per section.
+        """
+
+        self.path = path
+        self.top = top
+        self.snapshots = 0
+        tracemalloc.start(frames)
+
+        # Ignore tracemalloc's own bookkeeping and import machinery.
+        self._filters = (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        )
+        self._previous = self._take_snapshot()
+        self._previous_counts = count_live_objects()
+
+        with open(self.path, 'w') as report:
+            report.write(f"Memory report started {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+    def _take_snapshot(self):
+        """Return a filtered tracemalloc snapshot."""
+
+        return tracemalloc.take_snapshot().filter_traces(self._filters)
+
+    def snapshot(self, label: str, level: int):
+        """Diff memory against the previous snapshot and append a report section.
+
+        Args:
+            label (str): What triggered the snapshot (e.g. 'level_up').
+            level (int): Game level at the time of the snapshot.
+        """
+
+        gc.collect() # Only count what is actually still reachable.
+        current = self._take_snapshot()
+        counts = count_live_objects()
+        diffs = current.compare_to(self._previous, 'lineno')
+        traced, peak = tracemalloc.get_traced_memory()
+        self.snapshots += 1
+
+        lines = [
+            '',
+            f"=== #{self.snapshots} {label} (level {level}) ===",
+            f"traced: {traced / 1024:,.1f} KiB, peak: {peak / 1024:,.1f} KiB",
+        ]
+        for name in (t.__name__ for t in COUNTED_TYPES):
+            change = counts[name] - self._previous_counts[name]
+            lines.append(f"live {name}: {counts[name]} ({change:+d})")
+        lines.append(f"top {self.top} allocation changes by file and line:")
+        for diff in diffs[:self.top]:
+            frame = diff.traceback[0]
+            lines.append(f"  {diff.size_diff / 1024:+10,.1f} KiB "
+                         f"{diff.count_diff:+7d} blocks  {frame.filename}:{frame.lineno}")
+
+        with open(self.path, 'a') as report:
+            report.write('\n'.join(lines) + '\n')
+
+        self._previous = current
+        self._previous_counts = counts
+
+class NullMemoryTracker:
+    """A memory tracker with MemoryTracker's interface that does nothing."""
+
+    def snapshot(self, label: str, level: int):
+        pass
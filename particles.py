@@ -0,0 +1,258 @@
+"""Particle effects for impacts and walker deaths, stored in NumPy arrays.
+
+When an element or the beam destroys a walker, the walker shatters into
+ice particles and the element bursts into fire. Particles live in
+fixed-size arrays (position, velocity, remaining lifetime and palette
+color), with the live ones packed at the front. Each drawn frame moves
+them, applies gravity and drops the expired ones with a few array
+operations, then writes them into the frame's pixels through
+`pygame.surfarray` in one batch instead of blitting them one by one.
+
+Particles are purely visual, so they are only updated when a frame is
+drawn, headless games never emit them, and they are cleared whenever the
+level is reset. Their cost is kept within `settings.particle_budget` (a share of
+the frame time): the measured cost per particle gives the most particles
+that fit, and emissions beyond that, or beyond an effect's own per-frame
+cap, are dropped.
+"""
+
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pygame
+
+# Type checking is used to avoid circular imports.
+if TYPE_CHECKING:
+    from alien_invasion import WhiteWalkerInvasion
+
+# Effects by name: (particles per emission, most particles emitted per frame,
+# (min, max) speed in pixels per frame, (min, max) lifetime in frames,
+# gravity in pixels per frame squared, colors).
+EFFECTS = {
+    'ice_shatter': (40, 400, (1.0, 4.0), (20, 45), 0.15,
+                    ((255, 255, 255), (200, 235, 255), (150, 210, 255), (90, 170, 230))),
+    'fire_burst': (30, 300, (1.5, 5.0), (10, 30), -0.05,
+                   ((255, 240, 180), (255, 200, 60), (255, 140, 20), (255, 80, 0))),
+}
+
+class Particles:
+    """All live particles, as arrays.
+
+    Attributes:
+        game (WhiteWalkerInvasion): Reference to the main game instance.
+        settings (Settings): Game settings for the capacity, size and budget.
+        capacity (int): Most particles that can be alive at once.
+        count (int): Number of live particles (the first `count` array entries).
+        x, y (np.ndarray): Particle positions.
+        vx, vy (np.ndarray): Particle velocities, in pixels per frame.
+        gravity (np.ndarray): Vertical acceleration of each particle.
+        life (np.ndarray): Frames each particle has left.
+        color (np.ndarray): Index of each particle's color in `palette`.
+        palette (list[tuple]): Colors of all effects.
+        max_live (int): Most particles that fit in the budget, from the
+            measured cost per particle.
+        dropped (int): Particles not emitted because of a cap.
+    """
+
+    def __init__(self, game: 'WhiteWalkerInvasion', seed: int = 0):
+        """Allocate the arrays.
+
+        Args:
+            game (WhiteWalkerInvasion): The active game instance.
+            seed (int): Seed for the random directions, speeds and colors.
+        """
+
+        self.game = game
+        self.settings = game.settings
+        self.capacity = self.settings.particle_capacity
+        self.count = 0
+        self.x = np.zeros(self.capacity, np.float32)
+        self.y = np.zeros(self.capacity, np.float32)
+        self.vx = np.zeros(self.capacity, np.float32)
+        self.vy = np.zeros(self.capacity, np.float32)
+        self.gravity = np.zeros(self.capacity, np.float32)
+        self.life = np.zeros(self.capacity, np.int32)
+        self.color = np.zeros(self.capacity, np.uint8)
+        self._rng = np.random.default_rng(seed)
+
+        # Each effect's colors are a range of the shared palette.
+        self.palette = []
+        self._color_ranges = {}
+        for name, (*_, colors) in EFFECTS.items():
+            self._color_ranges[name] = (len(self.palette), len(self.palette) + len(colors))
+            self.palette.extend(colors)
+        self._mapped_palettes = {} # Palette in the pixel format of a surface.
+
+        self._emitted = dict.fromkeys(EFFECTS, 0) # Particles emitted this frame.
+        self.dropped = 0
+        self.max_live = self.capacity
+        self._cost_per_particle = None
+        self._frame_cost = 0.0 # Time spent on the particles this frame.
+        self._frame_count = 0 # Live particles that time was spent on.
+
+    def emit(self, effect: str, position: tuple):
+        """Emit one burst of an effect.
+
+        Args:
+            effect (str): Name of the effect in EFFECTS.
+            position (tuple[float, float]): Point the particles start from.
+
+        Returns:
+            int: Number of particles emitted.
+        """
+
+        count, cap, (min_speed, max_speed), (min_life, max_life), gravity, _ = EFFECTS[effect]
+        count = min(count, cap - self._emitted[effect], self.max_live - self.count)
+        if count <= 0:
+            self.dropped += EFFECTS[effect][0]
+            return 0
+        self.dropped += EFFECTS[effect][0] - count
+
+        rng = self._rng
+        angle = rng.uniform(0, 2 * np.pi, count)
+        speed = rng.uniform(min_speed, max_speed, count)
+        first_color, last_color = self._color_ranges[effect]
+        added = self.spawn(np.full(count, position[0]), np.full(count, position[1]),
+                           np.cos(angle) * speed, np.sin(angle) * speed,
+                           rng.integers(min_life, max_life + 1, count),
+                           rng.integers(first_color, last_color, count), gravity)
+        self._emitted[effect] += added
+        return added
+
+    def spawn(self, x, y, vx, vy, life, color, gravity: float = 0.0):
+        """Add particles, as many as there is room for.
+
+        Args:
+            x, y (array-like): Starting positions.
+            vx, vy (array-like): Velocities.
+            life (array-like): Lifetimes in frames.
+            color (array-like): Palette indices.
+            gravity (float): Vertical acceleration of the new particles.
+
+        Returns:
+            int: Number of particles added.
+        """
+
+        start = self.count
+        added = min(len(x), self.capacity - start)
+        end = start + added
+        self.x[start:end] = x[:added]
+        self.y[start:end] = y[:added]
+        self.vx[start:end] = vx[:added]
+        self.vy[start:end] = vy[:added]
+        self.life[start:end] = life[:added]
+        self.color[start:end] = color[:added]
+        self.gravity[start:end] = gravity
+        self.count = end
+        return added
+
+    def clear(self):
+        """Remove every particle."""
+
+        self.count = 0
+
+    def update(self):
+        """Advance the particles by one frame and drop the expired ones.
+
+        Also ends the previous frame's budget accounting and resets the
+        per-effect emission caps.
+        """
+
+        self._update_budget()
+        self._emitted = dict.fromkeys(EFFECTS, 0)
+        count = self.count
+        if not count:
+            return
+        start = time.perf_counter()
+        self.x[:count] += self.vx[:count]
+        self.y[:count] += self.vy[:count]
+        self.vy[:count] += self.gravity[:count]
+        life = self.life[:count]
+        life -= 1
+        alive = life > 0
+        kept = int(np.count_nonzero(alive))
+        if kept != count:
+            for values in (self.x, self.y, self.vx, self.vy, self.gravity, self.life, self.color):
+                values[:kept] = values[:count][alive]
+            self.count = kept
+        self._frame_cost += time.perf_counter() - start
+        self._frame_count = count
+
+    def _update_budget(self):
+        """Update the cost per particle, and from it the most particles that fit."""
+
+        if self._frame_count >= 100: # Too few particles give noisy timings.
+            cost = self._frame_cost / self._frame_count
+            if self._cost_per_particle is None:
+                self._cost_per_particle = cost
+            else:
+                self._cost_per_particle += 0.1 * (cost - self._cost_per_particle)
+            budget = self.settings.particle_budget / self.settings.FPS
+            self.max_live = min(self.capacity, int(budget / self._cost_per_particle))
+        self._frame_cost = 0.0
+        self._frame_count = 0
+
+    def bounds(self, scale: float = 1.0):
+        """Return the rect covering every live particle at a render scale.
+
+        Args:
+            scale (float): Internal render resolution scale.
+
+        Returns:
+            pygame.Rect | None: The bounding rect, or None without particles.
+        """
+
+        count = self.count
+        if not count:
+            return None
+        size = self._size(scale)
+        left = int(self.x[:count].min() * scale)
+        top = int(self.y[:count].min() * scale)
+        return pygame.Rect(left, top, int(self.x[:count].max() * scale) - left + size,
+                           int(self.y[:count].max() * scale) - top + size)
+
+    def _size(self, scale: float):
+        """Return the side of a particle's square in pixels at a render scale."""
+
+        return max(1, round(self.settings.particle_size * scale))
+
+    def _mapped_palette(self, surface: pygame.Surface):
+        """Return the palette as pixel values in the format of a surface."""
+
+        key = (surface.get_bitsize(), surface.get_shifts(), surface.get_flags() & pygame.SRCALPHA)
+        palette = self._mapped_palettes.get(key)
+        if palette is None:
+            # map_rgb returns a signed int; the pixel arrays are unsigned.
+            palette = np.array([surface.map_rgb(color) & 0xFFFFFFFF for color in self.palette],
+                               np.uint32)
+            self._mapped_palettes[key] = palette
+        return palette
+
+    def draw(self, surface: pygame.Surface, scale: float = 1.0):
+        """Write every particle into the pixels of a 32-bit surface.
+
+        Args:
+            surface (pygame.Surface): Surface to draw onto.
+            scale (float): Internal render resolution scale of `surface`.
+        """
+
+        count = self.count
+        if not count:
+            return
+        start = time.perf_counter()
+        size = self._size(scale)
+        width, height = surface.get_size()
+        x = (self.x[:count] * scale).astype(np.intp)
+        y = (self.y[:count] * scale).astype(np.intp)
+        inside = (x >= 0) & (x <= width - size) & (y >= 0) & (y <= height - size)
+        x, y = x[inside], y[inside]
+        colors = self._mapped_palette(surface)[self.color[:count][inside]]
+
+        pixels = pygame.surfarray.pixels2d(surface)
+        for dx in range(size):
+            for dy in range(size):
+                pixels[x + dx, y + dy] = colors
+        del pixels # Unlock the surface.
+        self._frame_cost += time.perf_counter() - start
+        self._frame_count = count
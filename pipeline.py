@@ -0,0 +1,479 @@
+"""Two-process mode: simulation and rendering in separate processes.
+
+In the normal game, `run_game` handles events, steps the simulation and
+draws the screen on one thread, so a slow frame delays input and game
+logic alike. In this mode:
+
+- A simulation process owns the WhiteWalkerInvasion instance (with SDL's
+  dummy video driver). Every frame it applies the inputs received over a
+  pipe, calls `step()`, and publishes a compact snapshot of the entities
+  and statistics into a SnapshotBuffer in shared memory.
+- The main process (PipelineGame) owns the window. It only polls events,
+  forwards them to the simulation, and draws the latest snapshot.
+
+Each forwarded input carries a sequence number, and every snapshot records
+the last input applied, so the main process can measure the end-to-end
+latency from an event being polled to the first frame showing its effect.
+Both processes report their CPU time, and a summary is printed on exit.
+
+Usage:
+    python pipeline.py
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import pygame
+
+from settings import Settings
+from hud import HUD
+from button import Button
+from tracing import NullTracer
+
+# Largest number of entities a snapshot holds. The formation fills the
+# screen once (twice before the first restart), and the arsenal is small.
+MAX_WALKERS = 256
+MAX_ELEMENTS = 64
+MAX_ICE_SHOTS = 1024
+
+# Index of each value in a snapshot's header.
+FRAME = 0 # Simulation frame number (0 until the first snapshot).
+ACTIVE = 1 # 1 while a game is being played.
+SCORE = 2
+MAX_SCORE = 3
+HIGH_SCORE = 4
+LEVEL = 5
+DRAGONS_LEFT = 6
+INPUT_SEQ = 7 # Sequence number of the last input applied.
+SIM_CPU = 8 # CPU seconds used by the simulation process.
+DRAGON_X = 9
+DRAGON_Y = 10
+NUM_WALKERS = 11
+NUM_ELEMENTS = 12
+NUM_ICE_SHOTS = 13
+HEADER_SIZE = 16
+
+# Kinds of input message sent from the main process to the simulation.
+KEYDOWN = 'keydown'
+KEYUP = 'keyup'
+CLICK = 'click'
+QUIT = 'quit'
+
+class SnapshotBuffer:
+    """A double buffer of entity snapshots in shared memory.
+
+    A snapshot is a float64 array: HEADER_SIZE header values, followed by
+    the (x, y, enemy type index) of every walker, then the (x, y) of every
+    element, then of every ice shot. The writer fills
+    the slot that is not the latest one, then publishes it. Each slot has a
+    sequence counter that is odd while the slot is being written (a
+    seqlock), so a reader that raced with the writer notices and retries
+    instead of drawing a torn snapshot.
+
+    Attributes:
+        shm (SharedMemory): The shared memory block.
+        name (str): Name of the block, used by other processes to attach.
+        control (np.ndarray): [latest slot, slot 0 sequence, slot 1 sequence].
+        slots (np.ndarray): (2, snapshot size) snapshot storage.
+    """
+
+    def __init__(self, name: str = None):
+        """Create a new buffer, or attach to an existing one.
+
+        Args:
+            name (str): Name of an existing buffer to attach to. If None, a
+                new block is created (and must be unlinked by its creator).
+        """
+
+        self.snapshot_size = HEADER_SIZE + 3 * MAX_WALKERS + 2 * (MAX_ELEMENTS + MAX_ICE_SHOTS)
+        control_bytes = 3 * 8
+        if name is None:
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=control_bytes + 2 * self.snapshot_size * 8)
+            self.shm.buf[:] = bytes(self.shm.size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.control = np.ndarray((3,), np.int64, self.shm.buf)
+        self.slots = np.ndarray((2, self.snapshot_size), np.float64,
+                                self.shm.buf, offset=control_bytes)
+
+    def write(self, game, input_seq: int, frame: int):
+        """Publish a snapshot of the game (simulation process).
+
+        Args:
+            game (WhiteWalkerInvasion): The game being simulated.
+            input_seq (int): Sequence number of the last input applied.
+            frame (int): Simulation frame number.
+        """
+
+        slot = 1 - self.control[0]
+        self.control[1 + slot] += 1 # Odd: the slot is being written.
+        snapshot = self.slots[slot]
+
+        stats = game.game_stats
+        walkers = game.white_walker_army.army.sprites()[:MAX_WALKERS]
+        elements = game.dragon.arsenal.arsenal.sprites()[:MAX_ELEMENTS]
+        ice_shots = game.white_walker_army.ice_shots
+        num_ice_shots = min(ice_shots.count, MAX_ICE_SHOTS)
+        snapshot[:NUM_ICE_SHOTS + 1] = (
+            frame, game.game_active, stats.score, stats.max_score,
+            stats.high_score, stats.level, stats.dragons_left, input_seq,
+            time.process_time(), game.dragon.rect.x, game.dragon.rect.y,
+            len(walkers), len(elements), num_ice_shots)
+        start = HEADER_SIZE
+        for walker in walkers:
+            snapshot[start:start + 3] = walker.rect.x, walker.rect.y, walker.kind.index
+            start += 3
+        for element in elements:
+            snapshot[start] = element.rect.x
+            snapshot[start + 1] = element.rect.y
+            start += 2
+        # Ice shots are already arrays: copy them interleaved as (x, y) pairs.
+        snapshot[start:start + 2 * num_ice_shots:2] = ice_shots.x[:num_ice_shots]
+        snapshot[start + 1:start + 2 * num_ice_shots:2] = ice_shots.y[:num_ice_shots]
+
+        self.control[1 + slot] += 1 # Even: the slot is complete.
+        self.control[0] = slot
+
+    def read(self, retries: int = 10):
+        """Copy the latest complete snapshot (main process).
+
+        Args:
+            retries (int): Attempts before giving up on a slot that keeps
+                being overwritten.
+
+        Returns:
+            np.ndarray | None: A private copy of the snapshot, or None if
+            no consistent snapshot could be read.
+        """
+
+        for _ in range(retries):
+            slot = self.control[0]
+            sequence = self.control[1 + slot]
+            if sequence % 2:
+                continue # Being written; the other slot is now the latest.
+            snapshot = self.slots[slot].copy()
+            if self.control[1 + slot] == sequence:
+                return snapshot
+        return None
+
+    def close(self):
+        """Detach from the shared memory block."""
+
+        # The numpy views must go before the memory they point into.
+        del self.control, self.slots
+        self.shm.close()
+
+def simulate(buffer_name: str, connection, headless: bool = False):
+    """Run the game simulation and publish snapshots (simulation process).
+
+    Args:
+        buffer_name (str): Name of the SnapshotBuffer to publish into.
+        connection (multiprocessing.connection.Connection): Receives input
+            messages, and sends leaderboard updates back.
+        headless (bool): Run the simulation game headless (silent, with an
+            in-memory score store), e.g. for automated runs.
+    """
+
+    # The window belongs to the main process.
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    from alien_invasion import WhiteWalkerInvasion
+    game = WhiteWalkerInvasion(headless=headless)
+    buffer = SnapshotBuffer(buffer_name)
+    store = game.game_stats.store
+    leaderboard_version = None
+    input_seq = frame = 0
+
+    try:
+        while True:
+            while connection.poll():
+                try:
+                    input_seq, kind, value = connection.recv()
+                except EOFError:
+                    kind, value = QUIT, None # The main process is gone.
+                _apply_input(game, kind, value)
+            if game.game_active:
+                game.step()
+            frame += 1
+            buffer.write(game, input_seq, frame)
+
+            # Runs are recorded here, so the leaderboard is sent to the renderer.
+            if store.version != leaderboard_version:
+                leaderboard_version = store.version
+                connection.send(store.top_scores(game.settings.leaderboard_size))
+            game.clock.tick(game.settings.FPS)
+    finally:
+        buffer.close()
+
+def _apply_input(game, kind: str, value):
+    """Apply one forwarded input to the simulated game.
+
+    Key events reuse the game's own handlers, so F9/F10 profile the
+    simulation process and 'q' quits it.
+
+    Args:
+        game (WhiteWalkerInvasion): The game being simulated.
+        kind (str): KEYDOWN, KEYUP, CLICK or QUIT.
+        value: The key for key events, the mouse position for clicks.
+    """
+
+    if kind == QUIT:
+        game._quit_game()
+    elif kind == KEYDOWN and game.game_active:
+        game._check_keydown_events(pygame.event.Event(pygame.KEYDOWN, key=value))
+    elif kind == KEYUP:
+        game._check_keyup_events(pygame.event.Event(pygame.KEYUP, key=value))
+    elif kind == CLICK and not game.game_active:
+        if game.play_button.check_click(value):
+            game.restart_game()
+
+class _LeaderboardMirror:
+    """Stands in for the score store: holds the top runs sent by the simulation.
+
+    Attributes:
+        runs (list[tuple[int, int, float]]): The best runs, highest first.
+        version (int): Incremented whenever new runs arrive.
+    """
+
+    def __init__(self):
+        self.runs = []
+        self.version = 0
+
+    def top_scores(self, count: int = 5):
+        return self.runs[:count]
+
+class _SnapshotStats:
+    """Stands in for GameStats: the statistics of the latest snapshot.
+
+    Attributes:
+        score, max_score, high_score, level, dragons_left (int): As in GameStats.
+        store (_LeaderboardMirror): The leaderboard sent by the simulation.
+    """
+
+    def __init__(self):
+        self.score = self.max_score = self.high_score = 0
+        self.level = 1
+        self.dragons_left = 0
+        self.store = _LeaderboardMirror()
+
+class PipelineGame:
+    """The main process of two-process mode: events and drawing only.
+
+    The HUD and Play button are reused as-is: this class provides the
+    `settings`, `screen`, `game_stats` and `tracer` attributes they read.
+
+    Attributes:
+        settings (Settings): Game settings.
+        screen (pygame.Surface): Main display surface.
+        game_stats (_SnapshotStats): Statistics of the latest snapshot.
+        tracer (NullTracer): Required by the HUD; nothing is traced here.
+        HUD (HUD): Heads-up display drawn from the snapshot statistics.
+        play_button (Button): The Play button shown between games.
+        buffer (SnapshotBuffer): Snapshots published by the simulation.
+        connection (Connection): Pipe to the simulation process.
+        process (multiprocessing.Process): The simulation process.
+        latencies (list[float]): Input-to-display latency of each input, in seconds.
+    """
+
+    def __init__(self, headless_simulation: bool = False):
+        """Open the window, load the images and start the simulation process.
+
+        Args:
+            headless_simulation (bool): Run the simulation game headless.
+        """
+
+        pygame.init()
+        self.settings = Settings()
+        self.settings.initialize_dynamic_settings()
+        self.screen = pygame.display.set_mode(
+            (self.settings.screen_width, self.settings.screen_height))
+        pygame.display.set_caption(self.settings.name)
+        self.clock = pygame.time.Clock()
+        self.tracer = NullTracer()
+
+        s = self.settings
+        self.bg = self._load_image(s.bg_file, s.screen_width, s.screen_height)
+        self.dragon_image = self._load_image(s.dragon_file, s.dragon_width, s.dragon_height)
+        # Walker images by enemy type index.
+        self.walker_images = [self._load_image(sprite_file, s.walker_width, s.walker_height)
+                              for sprite_file, *_ in s.enemy_types.values()]
+        self.element_image = self._load_image(s.element_file, s.element_width,
+                                              s.element_height)
+        self.ice_image = self._load_image(s.ice_file, s.ice_shot_size, s.ice_shot_size)
+
+        self.game_stats = _SnapshotStats()
+        self.HUD = HUD(self)
+        self.play_button = Button(self, "Play")
+
+        self.buffer = SnapshotBuffer()
+        self.connection, child_connection = multiprocessing.Pipe()
+        # Spawn, so the simulation starts with a clean pygame/SDL state.
+        context = multiprocessing.get_context('spawn')
+        self.process = context.Process(
+            target=simulate, name='simulation', daemon=True,
+            args=(self.buffer.name, child_connection, headless_simulation))
+        self.process.start()
+
+        self.input_seq = 0
+        self._pending_inputs = {} # Sequence number -> time the input was polled.
+        self.latencies = []
+        self.sim_cpu = 0.0
+        self._last_frame = 0
+
+    @staticmethod
+    def _load_image(path, width: int, height: int):
+        """Load an image and scale it to the given size."""
+
+        return pygame.transform.scale(pygame.image.load(path), (width, height))
+
+    def run(self):
+        """Forward events and draw snapshots until the simulation exits."""
+
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        try:
+            while self.process.is_alive():
+                self._check_events()
+                self._receive_leaderboard()
+                snapshot = self.buffer.read()
+                if snapshot is not None and snapshot[FRAME] != self._last_frame:
+                    self._last_frame = snapshot[FRAME]
+                    self._draw(snapshot)
+                    self._record_latencies(int(snapshot[INPUT_SEQ]))
+                    self.sim_cpu = snapshot[SIM_CPU]
+                self.clock.tick(self.settings.FPS)
+        finally:
+            self.report()
+            self.buffer.close()
+            self.buffer.shm.unlink()
+            pygame.quit()
+
+    def _send(self, kind: str, value=None):
+        """Forward an input to the simulation and remember when it was polled."""
+
+        self.input_seq += 1
+        self._pending_inputs[self.input_seq] = time.perf_counter()
+        try:
+            self.connection.send((self.input_seq, kind, value))
+        except OSError:
+            pass # The simulation has exited; `run` stops on its next check.
+
+    def _check_events(self):
+        """Forward window, key and mouse events to the simulation."""
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self._send(QUIT)
+            elif event.type == pygame.KEYDOWN:
+                self._send(KEYDOWN, event.key)
+            elif event.type == pygame.KEYUP:
+                self._send(KEYUP, event.key)
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                self._send(CLICK, event.pos)
+
+    def _receive_leaderboard(self):
+        """Take in leaderboard updates sent by the simulation."""
+
+        store = self.game_stats.store
+        try:
+            while self.connection.poll():
+                store.runs = self.connection.recv()
+                store.version += 1
+        except (EOFError, OSError):
+            pass # The simulation has exited; `run` stops on its next check.
+
+    def _draw(self, snapshot: np.ndarray):
+        """Draw a snapshot: background, sprites, HUD and (between games) the menu.
+
+        Args:
+            snapshot (np.ndarray): A snapshot read from the buffer.
+        """
+
+        self._update_hud(snapshot)
+        self.HUD.draw_background()
+
+        num_walkers = int(snapshot[NUM_WALKERS])
+        start = HEADER_SIZE + 3 * num_walkers
+        walkers = snapshot[HEADER_SIZE:start].reshape(-1, 3).astype(int).tolist()
+        num_elements = int(snapshot[NUM_ELEMENTS])
+        positions = snapshot[start:start + 2 * (num_elements + int(snapshot[NUM_ICE_SHOTS]))]
+        positions = positions.reshape(-1, 2).astype(int).tolist()
+        # Same order as the game: projectiles, dragon, then the army.
+        self.screen.blits([(self.element_image, p) for p in positions[:num_elements]],
+                          doreturn=False)
+        self.screen.blit(self.dragon_image, (snapshot[DRAGON_X], snapshot[DRAGON_Y]))
+        self.screen.blits([(self.walker_images[kind], (x, y)) for x, y, kind in walkers],
+                          doreturn=False)
+        self.screen.blits([(self.ice_image, p) for p in positions[num_elements:]],
+                          doreturn=False)
+        self.HUD.draw()
+
+        active = bool(snapshot[ACTIVE])
+        if not active:
+            self.play_button.draw()
+            self.HUD.draw_leaderboard()
+        pygame.mouse.set_visible(not active)
+        pygame.display.flip()
+
+    def _update_hud(self, snapshot: np.ndarray):
+        """Copy the snapshot statistics, re-rendering HUD text that changed.
+
+        Args:
+            snapshot (np.ndarray): A snapshot read from the buffer.
+        """
+
+        stats = self.game_stats
+        scores = (int(snapshot[SCORE]), int(snapshot[MAX_SCORE]), int(snapshot[HIGH_SCORE]))
+        if scores != (stats.score, stats.max_score, stats.high_score):
+            stats.score, stats.max_score, stats.high_score = scores
+            self.HUD.update_scores()
+        if int(snapshot[LEVEL]) != stats.level:
+            stats.level = int(snapshot[LEVEL])
+            self.HUD.update_level()
+        stats.dragons_left = int(snapshot[DRAGONS_LEFT])
+
+    def _record_latencies(self, applied_seq: int):
+        """Record the latency of every input the drawn frame is the first to show.
+
+        Args:
+            applied_seq (int): Last input applied by the simulation.
+        """
+
+        now = time.perf_counter()
+        for seq in [seq for seq in self._pending_inputs if seq <= applied_seq]:
+            self.latencies.append(now - self._pending_inputs.pop(seq))
+
+    def report(self):
+        """Print input latency and the CPU use of both processes."""
+
+        wall = time.perf_counter() - self.start_wall
+        render_cpu = time.process_time() - self.start_cpu
+        print(f"Ran for {wall:.1f}s")
+        if self.latencies:
+            latencies = sorted(self.latencies)
+            p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+            print(f"Input latency over {len(latencies)} inputs: "
+                  f"median {statistics.median(latencies) * 1000:.1f} ms, "
+                  f"p95 {p95 * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+        print(f"Render process CPU: {render_cpu:.2f}s ({render_cpu / wall:.0%})")
+        print(f"Simulation process CPU: {self.sim_cpu:.2f}s ({self.sim_cpu / wall:.0%})")
+
+def main():
+    """Parse command line arguments and play in two-process mode."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--headless-simulation', action='store_true',
+                        help='run the simulation silently with an in-memory score store')
+    args = parser.parse_args()
+    PipelineGame(args.headless_simulation).run()
+    sys.exit()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+"""Automated input policies for driving the dragon without a keyboard.
+
+A policy looks at the current game state once per frame and sets the same
+controls a player would: the dragon's `moving_up` / `moving_down` flags, and
+whether to call `shoot()`. Policies are used by headless drivers such as the
+batch runner, where no keyboard events are ever received.
+"""
+
+import random
+import numpy as np
+from typing import TYPE_CHECKING
+
+# Type checking is used to avoid circular imports.
+if TYPE_CHECKING:
+    from alien_invasion import WhiteWalkerInvasion
+
+class RandomPolicy:
+    """A policy that picks a random action every few frames.
+
+    Attributes:
+        rng (random.Random): Random number generator seeded per game.
+        hold_frames (int): How many frames each chosen movement is held.
+        shoot_chance (float): Probability of trying to shoot on any frame.
+        frames_left (int): Frames remaining before a new movement is chosen.
+    """
+
+    def __init__(self, seed: int, hold_frames: int = 10, shoot_chance: float = 0.2):
+        """Initialize the policy.
+
+        Args:
+            seed (int): Seed for this policy's random number generator.
+            hold_frames (int): How many frames each chosen movement is held.
+            shoot_chance (float): Probability of trying to shoot on any frame.
+        """
+
+        self.rng = random.Random(seed)
+        self.hold_frames = hold_frames
+        self.shoot_chance = shoot_chance
+        self.frames_left = 0
+
+    def act(self, game: 'WhiteWalkerInvasion'):
+        """Set the dragon's controls for the next frame.
+
+        Args:
+            game (WhiteWalkerInvasion): The game being driven.
+        """
+
+        dragon = game.dragon
+        if self.frames_left <= 0:
+            # Pick one of: move up, move down, or stay still.
+            direction = self.rng.choice((-1, 0, 1))
+            dragon.moving_up = direction < 0
+            dragon.moving_down = direction > 0
+            self.frames_left = self.hold_frames
+        self.frames_left -= 1
+
+        if self.rng.random() < self.shoot_chance:
+            dragon.shoot()
+
+class ScriptedPolicy:
+    """A deterministic policy that patrols up and down and fires constantly.
+
+    The dragon sweeps from one screen edge to the other and shoots whenever
+    the arsenal has room for another element. The seed picks the starting
+    direction, how long the dragon holds fire at the start (its firing
+    phase) and how far from the edges it turns around, so games with
+    different seeds diverge.
+
+    Attributes:
+        direction (int): Current patrol direction (1 for down, -1 for up).
+        hold_fire (int): Frames left before the dragon starts shooting.
+        margin (int): Distance from the screen edges at which the dragon turns.
+    """
+
+    def __init__(self, seed: int, max_hold_fire: int = 60, max_margin: int = 100):
+        """Initialize the policy.
+
+        Args:
+            seed (int): Seed for the starting direction, firing phase and margin.
+            max_hold_fire (int): Upper bound (exclusive) of the initial hold fire.
+            max_margin (int): Upper bound (exclusive) of the turning margin.
+        """
+
+        rng = random.Random(seed)
+        self.direction = rng.choice((-1, 1))
+        self.hold_fire = rng.randrange(max_hold_fire)
+        self.margin = rng.randrange(max_margin)
+
+    def act(self, game: 'WhiteWalkerInvasion'):
+        """Set the dragon's controls for the next frame.
+
+        Args:
+            game (WhiteWalkerInvasion): The game being driven.
+        """
+
+        dragon = game.dragon
+        # Turn around when the margin from an edge of the screen is reached.
+        if dragon.rect.bottom >= dragon.boundaries.bottom - self.margin:
+            self.direction = -1
+        elif dragon.rect.top <= dragon.boundaries.top + self.margin:
+            self.direction = 1
+
+        dragon.moving_down = self.direction > 0
+        dragon.moving_up = self.direction < 0
+        if self.hold_fire > 0:
+            self.hold_fire -= 1
+        else:
+            dragon.shoot() # The arsenal enforces the projectile limit.
+
+class AutoplayBot:
+    """A policy that lines the dragon up with the nearest walker and fires.
+
+    The nearest walker is the one closest to the dragon horizontally (the
+    biggest threat). The dragon moves toward that walker's row and shoots
+    whenever DragonArsenal has room for another element.
+
+    Attributes:
+        deadband (float): Vertical distance (in pixels) at which the dragon
+            counts as lined up and stops moving.
+    """
+
+    def __init__(self, seed: int = 0, deadband: float = 10.0):
+        """Initialize the bot.
+
+        Args:
+            seed (int): Unused; accepted so the bot fits the POLICIES interface.
+            deadband (float): Vertical distance at which the dragon stops moving.
+        """
+
+        self.deadband = deadband
+
+    def act(self, game: 'WhiteWalkerInvasion'):
+        """Set the dragon's controls for the next frame.
+
+        Args:
+            game (WhiteWalkerInvasion): The game being driven.
+        """
+
+        dragon = game.dragon
+        army = game.white_walker_army.army
+        dragon.moving_up = dragon.moving_down = False
+        if army:
+            target = min(army, key=lambda walker: walker.rect.x)
+            offset = target.rect.centery - dragon.rect.centery
+            dragon.moving_down = offset > self.deadband
+            dragon.moving_up = offset < -self.deadband
+
+        if len(dragon.arsenal.arsenal) < game.settings.element_amount:
+            dragon.shoot()
+
+class VectorScriptedPolicy:
+    """The scripted patrol policy for every game of a VectorWhiteWalkerEnv.
+
+    Each dragon patrols between the screen edges while shooting, like
+    ScriptedPolicy. With probability `jitter` a game takes a random action
+    instead, so games with different seeds play out differently.
+
+    Attributes:
+        rng (np.random.Generator): Random number generator for the jitter.
+        jitter (float): Probability of a random action on any frame.
+        directions (np.ndarray): (K,) patrol direction of each dragon.
+    """
+
+    def __init__(self, num_envs: int, seed: int, jitter: float = 0.1):
+        """Initialize the policy.
+
+        Args:
+            num_envs (int): Number of games in the environment (K).
+            seed (int): Seed for the jitter's random number generator.
+            jitter (float): Probability of a random action on any frame.
+        """
+
+        self.rng = np.random.default_rng(seed)
+        self.jitter = jitter
+        self.directions = self.rng.choice((-1, 1), size=num_envs)
+
+    def act(self, env):
+        """Return the actions for the next frame.
+
+        Args:
+            env (VectorWhiteWalkerEnv): The environment being driven.
+
+        Returns:
+            np.ndarray: (K,) actions for `env.step()`.
+        """
+
+        from vector_env import UP, DOWN, SHOOT, NUM_ACTIONS
+
+        s = env.settings
+        self.directions[env.dragon_top + s.dragon_height >= s.screen_height] = -1
+        self.directions[env.dragon_top <= 0] = 1
+
+        actions = np.where(self.directions > 0, DOWN, UP) + SHOOT
+        random_games = self.rng.random(env.num_envs) < self.jitter
+        actions[random_games] = self.rng.integers(0, NUM_ACTIONS,
+                                                  size=random_games.sum())
+        return actions
+
+# Maps the policy names accepted on the command line to their classes.
+POLICIES = {
+    'random': RandomPolicy,
+    'scripted': ScriptedPolicy,
+    'autoplay': AutoplayBot,
+}
@@ -0,0 +1,226 @@
+"""On-demand profiling of the game loop.
+
+Two profilers are available, both started from a key binding or from the
+WW_PROFILE environment variable:
+
+- FrameProfiler runs cProfile around a fixed number of `run_game` frames,
+  then saves the results as a .pstats file and as a collapsed-stack text
+  file that flame graph tools (flamegraph.pl, speedscope) can read.
+- SamplingProfiler uses a background thread that periodically captures
+  the main thread's stack. Its overhead is low and does not depend on how
+  many functions are called, so it suits long soak sessions where
+  cProfile would distort the timings. It writes collapsed stacks too.
+
+All output goes to `settings.profile_dir`.
+"""
+
+import cProfile
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+def _frame_label(filename: str, lineno: int, name: str):
+    """Return a flame graph frame label for a function.
+
+    Args:
+        filename (str): Source file of the function.
+        lineno (int): Line the function starts on.
+        name (str): Function name.
+
+    Returns:
+        str: 'name (file:line)', without characters that have a meaning in
+        the collapsed-stack format.
+    """
+
+    label = f"{name} ({Path(filename).name}:{lineno})"
+    return label.replace(';', ':')
+
+def _write_collapsed(path: Path, stacks):
+    """Write collapsed stacks, one 'frame;frame;frame count' line each.
+
+    Args:
+        path (Path): File to write.
+        stacks (Iterable[tuple[tuple[str, ...], int]]): Stacks (root first)
+            and their counts.
+    """
+
+    with open(path, 'w') as collapsed_file:
+        for stack, count in stacks:
+            if count > 0:
+                collapsed_file.write(f"{';'.join(stack)} {count}\n")
+
+def collapse_pstats(stats: pstats.Stats, max_depth: int = 64):
+    """Rebuild approximate call stacks from cProfile's caller graph.
+
+    cProfile only records caller/callee pairs, not whole stacks. Starting
+    from functions nobody called, each function's own time is spread over
+    the paths leading to it in proportion to the time each caller spent
+    in it.
+
+    Args:
+        stats (pstats.Stats): Loaded profile statistics.
+        max_depth (int): Deepest stack to rebuild.
+
+    Returns:
+        Counter: Microseconds of own time per stack (tuple of labels).
+    """
+
+    callees = {}
+    for function, (_, _, _, _, callers) in stats.stats.items():
+        for caller, (_, _, _, caller_time) in callers.items():
+            callees.setdefault(caller, []).append((function, caller_time))
+
+    stacks = Counter()
+    roots = [function for function, entry in stats.stats.items() if not entry[4]]
+
+    def visit(function, path, share):
+        _, _, own_time, total_time, _ = stats.stats[function]
+        path = path + (_frame_label(*function),)
+        stacks[path] += int(own_time * share * 1e6)
+        if len(path) >= max_depth:
+            return
+        for callee, edge_time in callees.get(function, ()):
+            callee_total = stats.stats[callee][3]
+            callee_share = share * edge_time / callee_total if callee_total else 0
+            # Skip recursion and paths too small to show up in a flame graph.
+            if callee_share * callee_total >= 1e-6 and _frame_label(*callee) not in path:
+                visit(callee, path, callee_share)
+
+    for root in roots:
+        visit(root, (), 1.0)
+    return stacks
+
+class FrameProfiler:
+    """Run cProfile for a fixed number of game loop frames.
+
+    Attributes:
+        output_dir (Path): Directory the results are saved in.
+        frames (int): Number of frames profiled per session.
+        frames_left (int): Frames remaining in the current session.
+        active (bool): Whether a session is in progress.
+    """
+
+    def __init__(self, output_dir: Path, frames: int):
+        """Prepare the profiler (no session is started).
+
+        Args:
+            output_dir (Path): Directory the results are saved in.
+            frames (int): Number of frames profiled per session.
+        """
+
+        self.output_dir = output_dir
+        self.frames = frames
+        self.frames_left = 0
+        self.active = False
+        self._profile = None
+
+    def start(self):
+        """Start a profiling session, unless one is already running."""
+
+        if self.active:
+            return
+        self._profile = cProfile.Profile()
+        self.frames_left = self.frames
+        self.active = True
+        self._profile.enable()
+
+    def frame(self):
+        """Count a finished frame, and stop the session after the last one."""
+
+        if self.active:
+            self.frames_left -= 1
+            if self.frames_left <= 0:
+                self.stop()
+
+    def stop(self):
+        """Stop the session and save the .pstats and collapsed-stack files."""
+
+        if not self.active:
+            return
+        self._profile.disable()
+        self.active = False
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        base = self.output_dir / f"profile-{time.strftime('%Y%m%d-%H%M%S')}"
+        pstats_path = base.with_suffix('.pstats')
+        self._profile.dump_stats(pstats_path)
+        stats = pstats.Stats(str(pstats_path))
+        _write_collapsed(base.with_suffix('.collapsed.txt'),
+                         collapse_pstats(stats).items())
+        print(f"Saved profile of {self.frames - self.frames_left} frames to {pstats_path}")
+
+class SamplingProfiler:
+    """Sample the main thread's stack from a background thread.
+
+    Attributes:
+        output_dir (Path): Directory the results are saved in.
+        interval (float): Seconds between samples.
+        samples (Counter): Number of samples seen per stack (root first).
+        active (bool): Whether sampling is in progress.
+    """
+
+    def __init__(self, output_dir: Path, interval: float):
+        """Prepare the profiler (sampling is not started).
+
+        Args:
+            output_dir (Path): Directory the results are saved in.
+            interval (float): Seconds between samples.
+        """
+
+        self.output_dir = output_dir
+        self.interval = interval
+        self.samples = Counter()
+        self.active = False
+        self._thread = None
+        self._stop = threading.Event()
+        self._target = threading.main_thread().ident
+
+    def start(self):
+        """Start sampling, unless it is already running."""
+
+        if self.active:
+            return
+        self.samples = Counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name='sampler', daemon=True)
+        self.active = True
+        self._thread.start()
+
+    def _sample(self):
+        """Capture the main thread's stack every interval (sampler thread)."""
+
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(_frame_label(code.co_filename, code.co_firstlineno,
+                                          code.co_name))
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+    def stop(self):
+        """Stop sampling and save the collapsed-stack file."""
+
+        if not self.active:
+            return
+        self._stop.set()
+        self._thread.join()
+        self.active = False
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f"samples-{time.strftime('%Y%m%d-%H%M%S')}.collapsed.txt"
+        _write_collapsed(path, self.samples.items())
+        print(f"Saved {sum(self.samples.values())} stack samples to {path}")
+
+    def toggle(self):
+        """Start sampling if stopped, or stop and save if running."""
+
+        if self.active:
+            self.stop()
+        else:
+            self.start()
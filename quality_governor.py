@@ -0,0 +1,145 @@
+"""Adaptive quality: trade visual quality for frame rate when frames run long.
+
+When frames take longer than the frame budget (large armies, many
+projectiles, late levels), the game simply slows down. QualityGovernor
+watches a rolling window of frame work times and steps through TIERS,
+each cheaper than the one before:
+
+- 'full': everything as configured.
+- 'hud': the score text is re-rendered at most a few times per second
+  instead of on every hit.
+- 'voices': additionally, at most two impact sounds play at once.
+- 'scale-0.75' / 'scale-0.5': additionally, the scene is drawn at a lower
+  internal resolution (see render_backends.py).
+
+Hysteresis keeps it from oscillating: it steps down only when the mean
+frame time is over the high threshold, steps up only when it is under the
+much lower low threshold, and after each change it waits a whole window
+of new frames before deciding again.
+
+Every tier change is printed, added to the trace and appended as a JSON
+line to `settings.quality_log_file`, so it can be seen how often machines
+degrade. The governor is enabled with `settings.adaptive_quality` or the
+WW_ADAPTIVE_QUALITY environment variable.
+"""
+
+import json
+import time
+from collections import deque
+from typing import TYPE_CHECKING
+
+# Type checking is used to avoid circular imports.
+if TYPE_CHECKING:
+    from alien_invasion import WhiteWalkerInvasion
+
+# Quality tiers, from best to cheapest: (name, frames between score text
+# renders, impact sound voices (None for no limit), render scale).
+TIERS = (
+    ('full', 1, None, 1.0),
+    ('hud', 6, None, 1.0),
+    ('voices', 6, 2, 1.0),
+    ('scale-0.75', 6, 2, 0.75),
+    ('scale-0.5', 6, 2, 0.5),
+)
+
+class QualityGovernor:
+    """Step through quality tiers based on the frame work time.
+
+    Attributes:
+        game (WhiteWalkerInvasion): The game whose quality is governed.
+        tier (int): Index of the current tier in TIERS.
+        window (int): Number of frames averaged, and frames waited after a change.
+        high (float): Mean frame time (seconds) above which quality is lowered.
+        low (float): Mean frame time (seconds) below which quality is raised.
+        log_file (Path | None): JSON lines file tier changes are appended to.
+        changes (int): Number of tier changes so far.
+    """
+
+    def __init__(self, game: 'WhiteWalkerInvasion'):
+        """Start at the best tier.
+
+        Args:
+            game (WhiteWalkerInvasion): The game whose quality is governed.
+        """
+
+        settings = game.settings
+        self.game = game
+        self.window = settings.quality_window
+        frame_time = 1 / settings.FPS
+        self.high = settings.quality_high * frame_time
+        self.low = settings.quality_low * frame_time
+        # Headless games never write to the player's files.
+        self.log_file = None if game.headless else settings.quality_log_file
+        self.changes = 0
+
+        # The governor owns the render scale, never raising it above the configured one.
+        game.backend.render_scale.auto = False
+        self._max_scale = game.backend.render_scale.value
+        self._times = deque(maxlen=self.window)
+        self._total = 0.0
+        self.tier = 0
+        self._apply()
+
+    def frame(self, seconds: float):
+        """Record the work time of a frame and change tier if needed.
+
+        Args:
+            seconds (float): Time the frame took, excluding the wait for the
+                next frame.
+        """
+
+        times = self._times
+        if len(times) == times.maxlen:
+            self._total -= times[0]
+        times.append(seconds)
+        self._total += seconds
+        if len(times) < self.window:
+            return # Not enough frames since the start or the last change.
+
+        mean = self._total / len(times)
+        if mean > self.high and self.tier + 1 < len(TIERS):
+            self._change(self.tier + 1, mean)
+        elif mean < self.low and self.tier > 0:
+            self._change(self.tier - 1, mean)
+
+    def _change(self, tier: int, mean: float):
+        """Switch to another tier and log the change."""
+
+        old_name = TIERS[self.tier][0]
+        self.tier = tier
+        self._apply()
+        self.changes += 1
+        self._times.clear()
+        self._total = 0.0
+
+        name = TIERS[tier][0]
+        print(f"Quality {old_name} -> {name} (frames took {mean * 1e3:.1f} ms)")
+        entry = {'time': time.time(), 'from': old_name, 'to': name,
+                 'frame_ms': round(mean * 1e3, 3),
+                 'level': self.game.game_stats.level,
+                 'walkers': len(self.game.white_walker_army.army)}
+        self.game.tracer.instant('quality_tier', entry)
+        if self.log_file is not None:
+            try:
+                self.log_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_file, 'a') as log:
+                    log.write(json.dumps(entry) + '\n')
+            except OSError as e:
+                print(f"Could not log the quality change: {e}")
+
+    def _apply(self):
+        """Configure the game for the current tier."""
+
+        _, score_refresh_frames, impact_voices, scale = TIERS[self.tier]
+        self.game.HUD.score_refresh_frames = score_refresh_frames
+        self.game.impact_voices = impact_voices
+        self.game.backend.set_scale(min(scale, self._max_scale))
+
+class NullQualityGovernor:
+    """A quality governor with QualityGovernor's interface that changes nothing."""
+
+    tier = 0
+    changes = 0
+
+    def frame(self, seconds: float):
+        pass
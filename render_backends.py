@@ -0,0 +1,480 @@
+"""Rendering backends: how a frame of the game gets onto the screen.
+
+`settings.render_backend` (or the WW_RENDERER environment variable)
+selects one of:
+
+- 'surface' (SurfaceBackend): the original renderer. Everything is blitted
+  in software onto the `pygame.display.set_mode` surface, then flipped.
+- 'texture' (TextureBackend): built on `pygame._sdl2.video`. Images are
+  uploaded once as Textures and drawn with `Texture.draw`, so SDL can
+  batch the copies and use the GPU where the machine has an accelerated
+  render driver. Without one, SDL's software renderer is used instead.
+
+Both backends provide `game.screen`, which the sprites, HUD and buttons
+use for their geometry, and expose the same methods to the game. Both
+draw the same ordered list of draw commands, built by `scene`.
+
+Both can also draw the scene at an internal resolution lower than the
+window's (`settings.render_scale`, or the WW_RENDER_SCALE environment
+variable) and scale it up to the window in one pass. Gameplay
+coordinates are unchanged: only the positions sprites are drawn at are
+scaled. With 'auto', RenderScale picks the scale from the measured time
+spent drawing.
+"""
+
+import os
+import time
+import pygame
+from typing import TYPE_CHECKING
+
+# Type checking is used to avoid circular imports.
+if TYPE_CHECKING:
+    from alien_invasion import WhiteWalkerInvasion
+    from settings import Settings
+
+# Internal resolution scales the 'auto' mode steps through, from best to fastest.
+SCALES = (1.0, 0.75, 0.5)
+
+class RenderScale:
+    """Internal render resolution, as a fraction of the window size.
+
+    A fixed scale never changes. In automatic mode, the time spent drawing
+    is averaged over one second of frames: if it is over the budget, the
+    next lower scale in SCALES is used; if the next higher scale would
+    still fit well within the budget (drawing cost grows with the pixel
+    count), that one is used instead.
+
+    Attributes:
+        value (float): Current scale (1.0 draws at the window's resolution).
+        auto (bool): Whether the scale is chosen from measured frame times.
+        budget (float): Seconds per frame drawing may take in automatic mode.
+        window (int): Number of frames averaged before the scale is reconsidered.
+    """
+
+    def __init__(self, scale: float | str, settings: 'Settings'):
+        """Set up a fixed or automatic render scale.
+
+        Args:
+            scale (float | str): A scale in (0, 1], or 'auto'.
+            settings (Settings): Game settings, for the frame rate and budget.
+
+        Raises:
+            ValueError: If `scale` is neither 'auto' nor a number in (0, 1].
+        """
+
+        self.auto = scale == 'auto'
+        self.value = SCALES[0] if self.auto else float(scale)
+        if not 0 < self.value <= 1:
+            raise ValueError(f"Render scale must be in (0, 1] or 'auto', not {scale}")
+        self.budget = settings.render_budget / settings.FPS
+        self.window = settings.FPS
+        self._samples = []
+
+    def record(self, seconds: float):
+        """Add the drawing time of a frame and adjust the scale if needed.
+
+        Args:
+            seconds (float): Time spent drawing the frame.
+
+        Returns:
+            bool: True if the scale changed.
+        """
+
+        if not self.auto:
+            return False
+        self._samples.append(seconds)
+        if len(self._samples) < self.window:
+            return False
+        mean = sum(self._samples) / len(self._samples)
+        self._samples.clear()
+
+        index = SCALES.index(self.value)
+        if mean > self.budget and index + 1 < len(SCALES):
+            self.value = SCALES[index + 1]
+        elif index > 0 and mean * (SCALES[index - 1] / self.value) ** 2 < 0.8 * self.budget:
+            self.value = SCALES[index - 1]
+        else:
+            return False
+        print(f"Render scale set to {self.value:g} "
+              f"(drawing took {mean * 1e3:.1f} ms per frame)")
+        return True
+
+def _scale_rect(rect, scale: float):
+    """Return `rect` (a Rect or (x, y, width, height)) in internal resolution coordinates."""
+
+    if scale == 1.0:
+        return rect
+    x, y, width, height = rect
+    return pygame.Rect(round(x * scale), round(y * scale),
+                       max(1, round(width * scale)), max(1, round(height * scale)))
+
+def scene(game: 'WhiteWalkerInvasion'):
+    """Return the frame to draw as an ordered list of draw commands.
+
+    Every backend and render scale draws this same list, in order, so they
+    cannot drift apart. A command is an (image, rect, area, slot) tuple:
+
+    - image: the Surface to draw, an RGB color to fill `rect` with, or None
+      for the particle effects, which each backend writes its own way.
+    - rect: where to draw, as a Rect or (x, y, width, height), in window
+      coordinates.
+    - area: the part of the image to draw, or None for all of it.
+    - slot: None for images that never change. Images that are re-rendered
+      or redrawn in place are drawn through a (name, version) slot instead
+      (see ImageCache).
+
+    The commands draw, in order:
+    - The HUD's static layer (background, lives, level, high score).
+    - The dragon's projectiles and the dragon.
+    - All White Walkers, one enemy type after the other, and their ice shots.
+    - The particle effects.
+    - The rest of the HUD (score, max score).
+    - The Play button and leaderboard, if the game is inactive.
+
+    Args:
+        game (WhiteWalkerInvasion): The game being drawn.
+
+    Returns:
+        list[tuple]: The draw commands.
+    """
+
+    hud = game.HUD
+    hud._update_static_layer()
+    commands = [(hud.static_layer, hud.static_layer.get_rect(), None,
+                 ('static_layer', hud.layer_version))]
+
+    arsenal = game.dragon.arsenal
+    commands.extend((element.image, element.rect, None, None) for element in arsenal.arsenal)
+    if arsenal.beam_image is not None:
+        commands.append((arsenal.beam_image, arsenal.beam_rect, None, ('beam', 0)))
+    commands.append((game.dragon.image, game.dragon.rect, None, None))
+
+    army = game.white_walker_army
+    for batch_name, batch in army.batches.items():
+        image = army.enemy_types[batch_name].image
+        commands.extend((image, walker.rect, None, None) for walker in batch)
+    ice_shots = army.ice_shots
+    size = ice_shots.size
+    commands.extend((ice_shots.blit_image, (x, y, size, size), None, None)
+                    for x, y in ice_shots.positions())
+    commands.append((None, None, None, None)) # The particle effects.
+
+    commands.append((hud.max_score_image, hud.max_score_rect, None, ('max_score', 0)))
+    commands.append((hud.score_image, hud.score_rect, None, ('score', 0)))
+
+    if not game.game_active:
+        button = game.play_button
+        commands.append((button.settings.button_color, button.rect, None, None))
+        commands.append((button.msg_image, button.msg_image_rect, None, None))
+        if hud.leaderboard_version != hud.game_stats.store.version:
+            hud.update_leaderboard()
+        commands.extend((line_image, line_rect, None, (('leaderboard', rank), 0))
+                        for rank, (line_image, line_rect) in enumerate(hud.leaderboard_images))
+    return commands
+
+class ImageCache:
+    """Copies of images converted for a backend (scaled surfaces or textures).
+
+    Images that never change are cached by the Surface they came from.
+    Images that are re-rendered (text) or redrawn in place (the static
+    layer) are cached by slot: a slot keeps only the copy of its latest
+    image, which is converted again when the image or its version changes.
+
+    Attributes:
+        convert (Callable): Makes the copy of a Surface.
+    """
+
+    def __init__(self, convert):
+        """Create an empty cache.
+
+        Args:
+            convert (Callable): Makes the copy of a Surface.
+        """
+
+        self.convert = convert
+        self._images = {}
+        self._slots = {}
+
+    def clear(self):
+        """Drop every copy, e.g. when the render scale changes."""
+
+        self._images.clear()
+        self._slots.clear()
+
+    def get(self, image: pygame.Surface, slot=None):
+        """Return the copy of `image`, converting it if it is new.
+
+        Args:
+            image (pygame.Surface): The image to draw.
+            slot (tuple | None): The image's (name, version) slot, or None
+                for an image that never changes.
+        """
+
+        if slot is None:
+            entry = self._images.get(id(image))
+            if entry is None or entry[0] is not image:
+                entry = self._images[id(image)] = (image, self.convert(image))
+            return entry[1]
+        name, version = slot
+        entry = self._slots.get(name)
+        if entry is None or entry[0] is not image or entry[1] != version:
+            entry = self._slots[name] = (image, version, self.convert(image))
+        return entry[2]
+
+class SurfaceBackend:
+    """Draw with software blits onto the display surface.
+
+    At a render scale below 1, the scene is drawn onto an internal surface
+    with images scaled once for it (cached like TextureBackend's textures),
+    then scaled up onto the display surface.
+
+    Attributes:
+        game (WhiteWalkerInvasion): The game being drawn.
+        screen (pygame.Surface): The display surface.
+        render_scale (RenderScale): Internal resolution of the scene.
+        name (str): Description of the backend, for reports.
+    """
+
+    def __init__(self, game: 'WhiteWalkerInvasion', render_scale: float | str = 1.0):
+        """Open the window.
+
+        Args:
+            game (WhiteWalkerInvasion): The game being drawn.
+            render_scale (float | str): Internal resolution scale, or 'auto'.
+        """
+
+        self.game = game
+        self.screen = pygame.display.set_mode(
+            (game.settings.screen_width, game.settings.screen_height))
+        pygame.display.set_caption(game.settings.name) # Set the window title.
+        self.name = 'surface'
+        self.render_scale = RenderScale(render_scale, game.settings)
+
+        # Images scaled to the internal resolution.
+        self._images = ImageCache(self._scale)
+        self._resize()
+
+    def _resize(self):
+        """Allocate the internal surface for the current render scale."""
+
+        self._images.clear()
+        scale = self.render_scale.value
+        if scale == 1.0:
+            self._internal = None
+        else:
+            width, height = self.screen.get_size()
+            self._internal = pygame.Surface((round(width * scale), round(height * scale)))
+
+    def set_scale(self, scale: float):
+        """Draw at another internal resolution from the next frame on."""
+
+        if scale != self.render_scale.value:
+            self.render_scale.value = scale
+            self._resize()
+
+    def _scale(self, surface: pygame.Surface):
+        """Return a copy of `surface` scaled to the internal resolution."""
+
+        size = _scale_rect(surface.get_rect(), self.render_scale.value).size
+        # Smoothing would blend color-keyed pixels into their neighbours.
+        if surface.get_bitsize() >= 24 and surface.get_colorkey() is None:
+            return pygame.transform.smoothscale(surface, size)
+        return pygame.transform.scale(surface, size)
+
+    def draw_frame(self):
+        """Draw the game's scene (see `scene`) onto the display surface and flip it.
+
+        At a render scale of 1 the images are blitted as they are, straight
+        onto the display surface; otherwise their scaled copies are blitted
+        onto the internal surface, which is then scaled up.
+        """
+
+        start = time.perf_counter()
+        game = self.game
+        scale = self.render_scale.value
+        target = self.screen if self._internal is None else self._internal
+
+        # Runs of images between fills and particles are drawn with one `blits` call.
+        blits = []
+        for image, rect, area, slot in scene(game):
+            if isinstance(image, pygame.Surface):
+                if scale != 1.0:
+                    image = self._images.get(image, slot)
+                    rect = _scale_rect(rect, scale)
+                    if area is not None:
+                        area = _scale_rect(area, scale)
+                blits.append((image, rect, area))
+                continue
+            target.blits(blits, doreturn=False)
+            blits.clear()
+            if image is None:
+                game.particles.draw(target, scale)
+            else:
+                target.fill(image, _scale_rect(rect, scale))
+        target.blits(blits, doreturn=False)
+
+        if self._internal is not None:
+            # The single upscale pass, straight into the display surface.
+            with game.tracer.span('upscale'):
+                if game.settings.render_smooth:
+                    pygame.transform.smoothscale(self._internal, self.screen.get_size(), self.screen)
+                else:
+                    pygame.transform.scale(self._internal, self.screen.get_size(), self.screen)
+
+        with game.tracer.span('display.flip'):
+            pygame.display.flip() # Make the most recently drawn screen visible.
+        if self.render_scale.record(time.perf_counter() - start):
+            self._resize()
+
+    def read_frame(self):
+        """Return a surface holding the frame that was just drawn."""
+
+        return self.screen
+
+class TextureBackend:
+    """Draw with SDL2 Textures through a `pygame._sdl2.video.Renderer`.
+
+    Sprite images are uploaded once and cached by the Surface they were
+    made from. The HUD's static layer is uploaded again only when it
+    changes, and text is uploaded again only when it is re-rendered.
+
+    At a render scale below 1, the scene is drawn into a target texture of
+    the internal resolution, which is then drawn over the whole window.
+
+    Attributes:
+        game (WhiteWalkerInvasion): The game being drawn.
+        window (Window): The game window.
+        renderer (Renderer): The SDL renderer drawing into the window.
+        screen (pygame.Surface): Off-screen surface with the window's size,
+            used for geometry and to read frames back.
+        render_scale (RenderScale): Internal resolution of the scene.
+        name (str): Description of the backend and render driver, for reports.
+    """
+
+    def __init__(self, game: 'WhiteWalkerInvasion', render_scale: float | str = 1.0):
+        """Open the window and create an accelerated renderer if possible.
+
+        Args:
+            game (WhiteWalkerInvasion): The game being drawn.
+            render_scale (float | str): Internal resolution scale, or 'auto'.
+        """
+
+        from pygame._sdl2 import sdl2
+        from pygame._sdl2.video import Window, Renderer
+
+        if game.settings.render_smooth:
+            # Filter textures drawn at another size (read when textures are created).
+            os.environ.setdefault('SDL_RENDER_SCALE_QUALITY', 'linear')
+
+        self.game = game
+        size = (game.settings.screen_width, game.settings.screen_height)
+        self.window = Window(game.settings.name, size)
+        try:
+            self.renderer = Renderer(self.window, accelerated=1, target_texture=True)
+            self.name = 'texture (accelerated)'
+        except sdl2.error:
+            # No GPU driver (e.g. SDL's dummy video driver): render in software.
+            self.renderer = Renderer(self.window, accelerated=0, target_texture=True)
+            self.name = 'texture (software)'
+        self.screen = pygame.Surface(size)
+        self.render_scale = RenderScale(render_scale, game.settings)
+
+        # Textures of the images, uploaded once (scaling is done when drawing).
+        self._textures = ImageCache(self._upload)
+        self._particle_layer = None
+        self._resize()
+
+    def _resize(self):
+        """Create the target texture for the current render scale."""
+
+        from pygame._sdl2.video import Texture
+
+        scale = self.render_scale.value
+        if scale == 1.0:
+            self._target = None
+        else:
+            width, height = self.screen.get_size()
+            self._target = Texture(self.renderer, (round(width * scale), round(height * scale)),
+                                   target=True)
+
+    def set_scale(self, scale: float):
+        """Draw at another internal resolution from the next frame on."""
+
+        if scale != self.render_scale.value:
+            self.render_scale.value = scale
+            self._resize()
+
+    def _upload(self, surface: pygame.Surface):
+        """Create a texture from a surface."""
+
+        from pygame._sdl2.video import Texture
+        return Texture.from_surface(self.renderer, surface)
+
+    def draw_frame(self):
+        """Draw the game's scene (see `scene`) with textures and present it."""
+
+        start = time.perf_counter()
+        game = self.game
+        renderer = self.renderer
+        scale = self.render_scale.value
+        renderer.target = self._target # None draws straight into the window.
+
+        for image, rect, area, slot in scene(game):
+            if isinstance(image, pygame.Surface):
+                self._textures.get(image, slot).draw(srcrect=area,
+                                                     dstrect=_scale_rect(rect, scale))
+            elif image is None:
+                self._draw_particles(scale)
+            else:
+                renderer.draw_color = (*image, 255) # RGBA.
+                renderer.fill_rect(_scale_rect(rect, scale))
+
+        if self._target is not None:
+            # The single upscale pass: draw the scene over the whole window.
+            renderer.target = None
+            self._target.draw()
+
+        with game.tracer.span('display.flip'):
+            renderer.present()
+        if self.render_scale.record(time.perf_counter() - start):
+            self._resize()
+
+    def _draw_particles(self, scale: float):
+        """Draw the particles through a layer covering only where they are.
+
+        Particles are written into the pixels of a transparent layer
+        surface, and only the area around them is uploaded to a streaming
+        texture and drawn.
+        """
+
+        from pygame._sdl2.video import Texture
+
+        particles = self.game.particles
+        area = particles.bounds(scale)
+        if area is None:
+            return
+        size = _scale_rect(self.screen.get_rect(), scale).size
+        if self._particle_layer is None or self._particle_layer.get_size() != size:
+            self._particle_layer = pygame.Surface(size, pygame.SRCALPHA)
+            self._particle_texture = Texture(self.renderer, size, streaming=True)
+            self._particle_texture.blend_mode = 1 # SDL_BLENDMODE_BLEND.
+        area = area.clip(self._particle_layer.get_rect())
+        if not area:
+            return
+        layer = self._particle_layer
+        layer.fill((0, 0, 0, 0), area)
+        particles.draw(layer, scale)
+        self._particle_texture.update(layer.subsurface(area), area)
+        self._particle_texture.draw(srcrect=area, dstrect=area)
+
+    def read_frame(self):
+        """Copy the frame that was just presented into `screen` and return it."""
+
+        self.renderer.to_surface(self.screen)
+        return self.screen
+
+# Backends selectable by name in the settings.
+BACKENDS = {
+    'surface': SurfaceBackend,
+    'texture': TextureBackend,
+}
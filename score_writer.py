@@ -0,0 +1,206 @@
+"""Background persistence of scores and crash-safe checkpoints.
+
+ScoreWriter moves every disk write off the main loop. The game only puts
+requests on a queue; a daemon thread records finished runs in the
+ScoreStore and writes GameStats checkpoints to a JSON file. Checkpoints
+are written to a temporary file and renamed over the old one, so the file
+on disk is always either the previous or the new checkpoint. Bursts of
+checkpoint requests are merged so only the latest one is written.
+
+If the game crashes mid-run, the last checkpoint still marks the run as in
+progress, and GameStats records it as a finished run on the next start.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+from typing import TYPE_CHECKING
+
+# Type checking is used to avoid circular imports.
+if TYPE_CHECKING:
+    from leaderboard import ScoreStore
+
+# Queue item telling the writer thread to stop.
+_STOP = ('stop', None)
+
+def write_atomic(path: Path, contents):
+    """Replace a file's contents without ever leaving it half-written.
+
+    The contents go to a temporary file next to `path`, are flushed to
+    disk, and the temporary file is renamed over `path`.
+
+    Args:
+        path (Path): File to replace.
+        contents (str | bytes): New text or binary contents.
+    """
+
+    temp_path = path.with_name(path.name + '.tmp')
+    mode = 'wb' if isinstance(contents, bytes) else 'w'
+    with open(temp_path, mode) as temp_file:
+        temp_file.write(contents)
+        temp_file.flush()
+        os.fsync(temp_file.fileno())
+    os.replace(temp_path, path)
+
+def load_checkpoint(path: Path):
+    """Read a checkpoint written by ScoreWriter.
+
+    Args:
+        path (Path): The checkpoint file.
+
+    Returns:
+        dict | None: The checkpoint, or None if the file is missing or
+        cannot be parsed.
+    """
+
+    if path is None or not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text())
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+class ScoreWriter:
+    """Persist runs and checkpoints from a background thread.
+
+    Attributes:
+        store (ScoreStore): Store that finished runs are recorded in.
+        checkpoint_file (Path | None): File checkpoints are written to, or
+            None to skip checkpoints (e.g. for headless games).
+        requests (int): Number of requests submitted.
+        writes (int): Number of writes actually performed.
+        merged (int): Number of checkpoints dropped in favor of a newer one.
+        blocked_seconds (float): Total time submitting requests blocked the
+            calling (main) thread.
+        max_blocked_seconds (float): Longest single block of the caller.
+    """
+
+    def __init__(self, store: 'ScoreStore', checkpoint_file: Path = None):
+        """Start the writer thread.
+
+        Args:
+            store (ScoreStore): Store that finished runs are recorded in.
+            checkpoint_file (Path): File checkpoints are written to, or None.
+        """
+
+        self.store = store
+        self.checkpoint_file = checkpoint_file
+        self.requests = 0
+        self.writes = 0
+        self.merged = 0
+        self.blocked_seconds = 0.0
+        self.max_blocked_seconds = 0.0
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='score-writer',
+                                        daemon=True)
+        self._thread.start()
+
+    def record_run(self, score: int, level: int, duration: float, settings_hash: str):
+        """Queue a finished run to be recorded in the store.
+
+        Args:
+            score (int): Final score of the run.
+            level (int): Level reached.
+            duration (float): Length of the run in seconds.
+            settings_hash (str): Hash of the settings the run was played with.
+        """
+
+        self._submit(('run', (score, level, duration, settings_hash, time.time())))
+
+    def checkpoint(self, snapshot: dict):
+        """Queue a checkpoint of the game statistics.
+
+        Args:
+            snapshot (dict): JSON-serializable statistics to write.
+        """
+
+        if self.checkpoint_file is not None:
+            self._submit(('checkpoint', snapshot))
+
+    def _submit(self, item: tuple):
+        """Put a request on the queue and account for the time it took.
+
+        Args:
+            item (tuple): (kind, payload) request for the writer thread.
+        """
+
+        start = time.perf_counter()
+        self._queue.put(item)
+        blocked = time.perf_counter() - start
+
+        self.requests += 1
+        self.blocked_seconds += blocked
+        self.max_blocked_seconds = max(self.max_blocked_seconds, blocked)
+
+    def _run(self):
+        """Process queued requests until told to stop (writer thread)."""
+
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            # Take everything else already waiting, so bursts can be merged.
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for index, (kind, payload) in enumerate(batch):
+                if kind == 'stop':
+                    running = False
+                elif kind == 'run':
+                    self._write(self.store.record_run, *payload)
+                elif kind == 'checkpoint':
+                    # Only the last of consecutive checkpoints needs writing;
+                    # a run in between keeps the order of the two intact.
+                    next_kind = batch[index + 1][0] if index + 1 < len(batch) else None
+                    if next_kind == 'checkpoint':
+                        self.merged += 1
+                    else:
+                        self._write(write_atomic, self.checkpoint_file,
+                                    json.dumps(payload, indent=4))
+
+    def _write(self, write, *args):
+        """Perform one write, reporting (but surviving) any error.
+
+        Args:
+            write (callable): Function performing the write.
+            *args: Arguments passed to `write`.
+        """
+
+        try:
+            write(*args)
+            self.writes += 1
+        except Exception as e:
+            print(f"Score persistence failed: {e}")
+
+    def close(self, timeout: float):
+        """Flush pending requests and stop the writer thread.
+
+        Args:
+            timeout (float): Longest time in seconds to wait for the flush.
+
+        Returns:
+            bool: True if everything was flushed, False on timeout.
+        """
+
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print(f"Score persistence did not finish within {timeout}s.")
+            return False
+        return True
+
+    def report(self):
+        """Return a one-line summary of the persistence instrumentation."""
+
+        return (f"Score persistence: {self.requests} requests, {self.writes} writes, "
+                f"{self.merged} merged; main loop blocked "
+                f"{self.blocked_seconds * 1000:.3f} ms total, "
+                f"{self.max_blocked_seconds * 1e6:.1f} us max")
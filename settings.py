@@ -1,4 +1,5 @@
 from pathlib import Path
+from difficulty import difficulty_table
 
 class Settings:
     """
@@ -21,14 +22,88 @@ class Settings:
         self.screen_width: int = 1200 # Width of the game window.
         self.screen_height: int = 700 # Height of the game window.
         self.FPS: int = 60 # Target frame rate for the game loop.
+        # Rendering backend: 'surface' (software blits) or 'texture' (SDL2
+        # textures). The WW_RENDERER environment variable overrides it.
+        self.render_backend: str = 'surface'
+        # Internal render resolution as a fraction of the window size, or 'auto'
+        # to choose it from the measured drawing time. Gameplay coordinates do
+        # not change. The WW_RENDER_SCALE environment variable overrides it.
+        self.render_scale: float | str = 1.0
+        # Fraction of a frame (1 / FPS) drawing may take before 'auto' lowers the scale.
+        self.render_budget: float = 0.5
+        # Whether the scaled scene is filtered (smoother, but slower) or not.
+        self.render_smooth: bool = False
+
+        # Whether quality is lowered automatically when frames run over budget
+        # (see quality_governor.py). The WW_ADAPTIVE_QUALITY environment
+        # variable overrides it.
+        self.adaptive_quality: bool = False
+        # Number of frames the quality governor averages frame times over.
+        self.quality_window: int = 120
+        # Mean frame time, as a fraction of a frame (1 / FPS), above which quality
+        # is lowered and below which it is raised again.
+        self.quality_high: float = 0.9
+        self.quality_low: float = 0.5
+        # File tier changes are logged to as JSON lines (None disables the log).
+        self.quality_log_file: Path | None = Path.cwd() / 'Assets' / 'file' / 'quality.log'
         
         # Construct the file path for the background image.
         self.bg_file: Path = Path.cwd() / 'Assets' / 'images' / 'Winterfell1.png'
 
+        # File a Chrome trace of frame timings is written to on exit (None disables
+        # tracing). The WW_TRACE environment variable overrides it.
+        self.trace_file: Path | None = None
+        # Number of trace events kept; older events are overwritten.
+        self.trace_capacity: int = 1 << 18
+
+        # Directory cProfile and sampling profiler results are saved in.
+        self.profile_dir: Path = Path.cwd() / 'profiles'
+        # Number of frames profiled by one cProfile session (F9).
+        self.profile_frames: int = 600
+        # Seconds between stack samples of the sampling profiler (F10).
+        self.sample_interval: float = 0.005
+
+        # Report file for per-level memory snapshots (None disables memory
+        # tracking). The WW_MEMTRACK environment variable overrides it.
+        self.memory_report_file: Path | None = None
+        # Stack frames tracemalloc stores per allocation when tracking memory.
+        self.memory_trace_frames: int = 1
+
+        # Directory gameplay captures (F11) are saved in.
+        self.capture_dir: Path = Path.cwd() / 'captures'
+        # Capture output: 'auto' (ffmpeg if installed, else PNG), 'ffmpeg', 'png' or 'raw'.
+        self.capture_mode: str = 'auto'
+        # Frames that can wait for the capture writer before new ones are dropped.
+        self.capture_pool_size: int = 32
+
+        # --- asyncio Loop Settings (async_loop.py) ---
+        # Seconds between checkpoints of the run in progress.
+        self.autosave_interval: float = 10.0
+        # Seconds between checks of the image files for changes.
+        self.asset_poll_interval: float = 1.0
+        # Localhost port the telemetry server listens on (None disables it).
+        self.telemetry_port: int | None = None
+
+        # Address the state sync server listens on, 'host:port' or a Unix socket
+        # path (None disables it). The WW_SYNC environment variable overrides it.
+        self.sync_address: str | None = None
+        # Step (in pixels) positions are quantized to in state sync snapshots.
+        self.sync_quantum: int = 2
+
         # Multiplier for increasing difficulty (speed and score) after a level is cleared.
         self.difficulty_scale: float = 1.1 
-        # Path to the file for saving high scores.
+        # Path to the old single high score file, migrated into the database.
         self.scores_file: Path = Path.cwd() / 'Assets' / 'file' / 'scores.json'
+        # Path to the SQLite database storing every finished run.
+        self.scores_db_file: Path = Path.cwd() / 'Assets' / 'file' / 'scores.db'
+        # Path to the checkpoint of the run in progress, used to recover from crashes.
+        self.checkpoint_file: Path = Path.cwd() / 'Assets' / 'file' / 'checkpoint.json'
+        # Path to the save state written by F5 and on quit, and resumed with F6.
+        self.save_state_file: Path = Path.cwd() / 'Assets' / 'file' / 'savestate.bin'
+        # Longest time (in seconds) to wait for pending score writes on exit.
+        self.score_flush_timeout: float = 2.0
+        # Number of best runs listed on the leaderboard.
+        self.leaderboard_size: int = 5
 
         # --- Dragon (Player) Settings ---
         
@@ -39,10 +114,21 @@ class Settings:
         self.dragon_height: int = 100 # Height of the dragon.
         
         # --- Element (Projectile) Settings ---
+
+        # How elements hit walkers: 'discrete' (their rects overlap at the end of a
+        # tick) or 'swept' (their paths since the last tick cross, so fast elements
+        # cannot pass through a walker). The WW_COLLISIONS environment variable overrides it.
+        self.collision_mode: str = 'discrete'
         
         # Construct the file path for the element (projectile) image.
         self.element_file: Path = Path.cwd() / 'Assets' / 'images' / 'fire1.png'
         
+        # Construct the file path for the beam weapon image.
+        self.beam_file: Path = Path.cwd() / 'Assets' / 'images' / 'lightning1.png'
+        self.beam_height: int = 60 # Height of the beam.
+        self.beam_cooldown: int = 45 # Frames between two beams.
+        self.beam_duration: int = 12 # Frames a beam stays visible.
+        
         # --- White Walker (Enemy) Settings ---
 
         # Construct the file path for the white walker image.
@@ -50,14 +136,62 @@ class Settings:
         
         self.walker_width: int = 100 # Width of a single white walker.
         self.walker_height: int = 70 # Height of a single white walker.
+
+        # Enemy types by name (see enemy_types.py): (sprite file, hit points,
+        # multiplier of the drop toward the dragon, points as a multiple of
+        # walker_points). Every type is drawn at the walker size.
+        self.enemy_types: dict = {
+            'walker': (self.walker_file, 1, 1.0, 1),
+            'wight': (Path.cwd() / 'Assets' / 'images' / 'enemy_4.png', 1, 1.5, 1),
+            'ship': (Path.cwd() / 'Assets' / 'images' / 'ship.png', 2, 1.0, 2),
+            'asteroid': (Path.cwd() / 'Assets' / 'images' / 'Asteroid Brown.png', 3, 0.5, 3),
+        }
+        # Enemy types of the formation's columns for each level, from the front
+        # (left) column back. A pattern repeats over all columns, and the last
+        # one is used for every later level.
+        self.enemy_formations: list = [
+            ('walker',),
+            ('wight', 'walker'),
+            ('wight', 'walker', 'ship'),
+            ('wight', 'ship', 'walker', 'asteroid'),
+        ]
         
+        # Construct the file path for the ice shot (enemy projectile) image.
+        self.ice_file: Path = Path.cwd() / 'Assets' / 'images' / 'ice.png'
+        self.ice_shot_size: int = 20 # Width and height of an ice shot.
+        self.ice_shot_speed: float = 4.0 # Speed of an ice shot, in pixels per frame.
+        # Frames between volleys of ice shots from the front walkers (0 disables them).
+        self.ice_shot_interval: int = 120
+        # Most ice shots that can be in flight at once.
+        self.ice_shot_capacity: int = 8192
+
         # Number of rows in the initial army formation.
         self.army_rows : int = 3 
         # Number of columns in the initial army formation.
         self.army_cols : int = 6 
         # Initial direction of vertical movement for the army (1 for down).
         self.army_direction : int = 1 
+
+        # Game mode: 'levels' (a new formation every level) or 'endless' (walkers
+        # stream in from the right edge in waves, see waves.py). The WW_GAME_MODE
+        # environment variable overrides it.
+        self.game_mode: str = 'levels'
+        # Endless mode: pixels per frame walkers walk toward the dragon (times their
+        # enemy type's speed).
+        self.stream_speed: float = 1.0
+        self.waves_per_level: int = 4 # Waves sent before the game levels up.
+        self.wave_pause: int = 180 # Frames between two waves, shortened on later levels.
+        # Most walkers entering in one frame; the rest of a wave enters in the next frames.
+        self.spawns_per_frame: int = 3
         
+        # --- Particle Effect Settings (particles.py) ---
+
+        # Most particles alive at once.
+        self.particle_capacity: int = 16384
+        self.particle_size: int = 2 # Side of a particle's square, in pixels.
+        # Share of a frame (1 / FPS) updating and drawing particles may take.
+        self.particle_budget: float = 0.1
+
         # --- HUD and Button Settings ---
 
         # Dimensions of the play button.
@@ -106,6 +240,13 @@ class Settings:
         self.army_drop_speed : int = 50 
         self.walker_points : int = 50 # Points awarded for defeating a white walker.
 
+        # Level the scaled settings above currently correspond to.
+        self.difficulty_level : int = 1
+        # Precomputed per-level values of the settings scaled on level-up.
+        self.difficulty_table = difficulty_table(
+            self.difficulty_scale, self.dragon_speed, self.element_speed,
+            self.army_speed, self.walker_points)
+
     
     def increase_difficulty(self):
         """
@@ -113,12 +254,11 @@ class Settings:
 
         This is typically called when the player clears a level. The speeds
         are multiplied by `difficulty_scale`, and the walker point value is
-        increased and rounded to an integer.
+        increased and rounded to an integer. The values are looked up in the
+        precomputed difficulty table for the next level instead of being
+        compounded here.
         """
-        # Increase speed settings by the difficulty scale multiplier.
-        self.dragon_speed *= self.difficulty_scale
-        self.element_speed *= self.difficulty_scale
-        self.army_speed *= self.difficulty_scale
-
-        # Round point value to the nearest integer.
-        self.walker_points = int(self.walker_points * self.difficulty_scale)
\ No newline at end of file
+        
+        self.difficulty_level += 1
+        (self.dragon_speed, self.element_speed, self.army_speed,
+         self.walker_points) = self.difficulty_table.lookup(self.difficulty_level)
\ No newline at end of file
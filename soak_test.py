@@ -0,0 +1,183 @@
+"""Long-running soak test of the headless game driven by the autoplay bot.
+
+The game is simulated and rendered (to SDL's dummy display) as fast as
+possible for the requested duration, restarting via `restart_game` on
+every game over. At a fixed interval, frame-time percentiles, resident
+memory (RSS), live object counts and the highest level reached are
+recorded to a CSV file. At the end, the first and last quarters of the run
+are compared: the test fails (exit status 1) if frame time or memory has
+drifted upward by more than the allowed amount.
+
+Usage:
+    python soak_test.py --duration 7200 --output soak.csv
+"""
+
+import argparse
+import csv
+import gc
+import os
+import statistics
+import sys
+import time
+
+from alien_invasion import WhiteWalkerInvasion
+from memory_tracker import count_live_objects
+from policies import AutoplayBot
+
+# Columns of the samples file, in order.
+SAMPLE_FIELDS = ('elapsed', 'frames', 'games', 'max_level', 'frame_p50_ms',
+                 'frame_p95_ms', 'frame_p99_ms', 'rss_mb', 'walkers',
+                 'elements', 'surfaces')
+
+def current_rss():
+    """Return the resident memory of this process in megabytes.
+
+    Reads /proc on Linux. Elsewhere it falls back to the peak resident size
+    reported by the resource module, which can only grow.
+    """
+
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+        return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+def percentile(sorted_values: list, fraction: float):
+    """Return the value at `fraction` (0-1) of an already sorted list."""
+
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+def check_drift(samples: list, max_frame_growth: float, max_rss_growth_mb: float):
+    """Compare the start and the end of the run for upward drift.
+
+    The first sample is skipped as warm-up. The median of the first quarter
+    of the remaining samples is compared with the median of the last quarter.
+
+    Args:
+        samples (list[dict]): Recorded samples, oldest first.
+        max_frame_growth (float): Allowed ratio of late to early p95 frame time.
+        max_rss_growth_mb (float): Allowed RSS growth in megabytes.
+
+    Returns:
+        list[str]: Description of each failed check (empty if none failed).
+    """
+
+    samples = samples[1:] if len(samples) > 4 else samples
+    if len(samples) < 2:
+        return []
+    quarter = max(1, len(samples) // 4)
+    early, late = samples[:quarter], samples[-quarter:]
+
+    failures = []
+    early_frame = statistics.median(s['frame_p95_ms'] for s in early)
+    late_frame = statistics.median(s['frame_p95_ms'] for s in late)
+    if late_frame > early_frame * max_frame_growth:
+        failures.append(f"p95 frame time drifted from {early_frame:.2f} ms "
+                        f"to {late_frame:.2f} ms")
+
+    early_rss = statistics.median(s['rss_mb'] for s in early)
+    late_rss = statistics.median(s['rss_mb'] for s in late)
+    if late_rss - early_rss > max_rss_growth_mb:
+        failures.append(f"RSS drifted from {early_rss:.1f} MB to {late_rss:.1f} MB")
+    return failures
+
+def run_soak(duration: float, interval: float, output: str):
+    """Run the soak test and record a sample every `interval` seconds.
+
+    Args:
+        duration (float): Length of the run in seconds.
+        interval (float): Seconds between samples.
+        output (str): Path of the CSV file the samples are streamed to.
+
+    Returns:
+        list[dict]: The recorded samples.
+    """
+
+    game = WhiteWalkerInvasion(headless=True)
+    bot = AutoplayBot()
+    game.restart_game()
+
+    samples = []
+    frame_times = []
+    frames = games = max_level = 0
+    start = next_sample = time.perf_counter()
+    next_sample += interval
+
+    with open(output, 'w', newline='') as samples_file:
+        writer = csv.DictWriter(samples_file, fieldnames=SAMPLE_FIELDS)
+        writer.writeheader()
+        while True:
+            frame_start = time.perf_counter()
+            if not game.game_active:
+                games += 1
+                game.restart_game()
+            bot.act(game)
+            game.step()
+            game._update_screen()
+            now = time.perf_counter()
+            frame_times.append(now - frame_start)
+            frames += 1
+            max_level = max(max_level, game.game_stats.level)
+
+            if now < next_sample:
+                continue
+
+            frame_times.sort()
+            gc.collect() # Count reachable objects, not garbage awaiting collection.
+            counts = count_live_objects()
+            sample = {
+                'elapsed': round(now - start, 1),
+                'frames': frames,
+                'games': games,
+                'max_level': max_level,
+                'frame_p50_ms': round(percentile(frame_times, 0.50) * 1000, 3),
+                'frame_p95_ms': round(percentile(frame_times, 0.95) * 1000, 3),
+                'frame_p99_ms': round(percentile(frame_times, 0.99) * 1000, 3),
+                'rss_mb': round(current_rss(), 1),
+                'walkers': counts['Walker'],
+                'elements': counts['Element'],
+                'surfaces': counts['Surface'],
+            }
+            writer.writerow(sample)
+            samples_file.flush()
+            samples.append(sample)
+            print(', '.join(f"{key}={value}" for key, value in sample.items()))
+
+            frame_times.clear()
+            # Sampling time is not charged to the next window's frames.
+            next_sample = time.perf_counter() + interval
+            if now - start >= duration:
+                break
+    return samples
+
+def main():
+    """Parse command line arguments, run the soak test and check for drift."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=3600,
+                        help='length of the run in seconds')
+    parser.add_argument('--interval', type=float, default=60,
+                        help='seconds between samples')
+    parser.add_argument('--output', default='soak_samples.csv',
+                        help='CSV file the samples are written to')
+    parser.add_argument('--max-frame-growth', type=float, default=1.25,
+                        help='allowed ratio of late to early p95 frame time')
+    parser.add_argument('--max-rss-growth', type=float, default=50.0,
+                        help='allowed RSS growth in megabytes')
+    args = parser.parse_args()
+
+    samples = run_soak(args.duration, args.interval, args.output)
+    failures = check_drift(samples, args.max_frame_growth, args.max_rss_growth)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"PASS: no drift over {len(samples)} samples, results in {args.output}")
+
+if __name__ == '__main__':
+    main()
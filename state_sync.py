@@ -0,0 +1,484 @@
+"""Publish the live game state to spectators and tools over a local socket.
+
+StateSyncServer sends one snapshot per frame to every connected client:
+the statistics from GameStats and the position of the dragon, every
+walker and every element. The server is enabled by `settings.sync_address`
+or the WW_SYNC environment variable, as 'host:port' for TCP or as the
+path of a Unix socket. Otherwise the game uses a NullSyncServer.
+
+Wire format (all little-endian). Every message is a u32 length followed
+by a payload of:
+
+- a header (HEADER): magic b'WW', version, tick, base tick (0 for a full
+  snapshot), game active flag, score, high score, level, dragons left,
+  and the number of spawned, moved and removed records;
+- spawned records (SPAWNED): id, kind, x, y - entities that are new since
+  the base snapshot, or moved further than a moved record can express;
+- moved records (MOVED): id, dx, dy - position change since the base;
+- removed records (REMOVED): id.
+
+Positions are quantized to `settings.sync_quantum` pixels. Each snapshot
+is a delta against the last one the client acknowledged: clients send
+back the tick of every snapshot they have applied, as a u32. A client
+with no acknowledged snapshot still in the server's history gets a full
+snapshot. Entities the quantization leaves in place cost nothing.
+
+StateSyncClient is the reference client. It can be run from the command
+line to print what it receives:
+
+    python state_sync.py --address 127.0.0.1:7777 --ticks 600
+"""
+
+import argparse
+import os
+import selectors
+import socket
+import struct
+import time
+from collections import deque
+from typing import TYPE_CHECKING
+
+# Type checking is used to avoid circular imports.
+if TYPE_CHECKING:
+    from alien_invasion import WhiteWalkerInvasion
+
+MAGIC = b'WW'
+VERSION = 1
+
+LENGTH = struct.Struct('<I')
+HEADER = struct.Struct('<2sBIIBIIHBHHH')
+SPAWNED = struct.Struct('<HBhh')
+MOVED = struct.Struct('<Hbb')
+REMOVED = struct.Struct('<H')
+ACK = struct.Struct('<I')
+
+# Entity kinds.
+DRAGON = 0
+WALKER = 1
+ELEMENT = 2
+
+# Number of past snapshots kept as possible delta bases.
+HISTORY = 64
+# The dragon always has this id.
+DRAGON_ID = 0
+
+def parse_address(address: str):
+    """Return the socket family and address for a sync address string.
+
+    Args:
+        address (str): 'host:port' for TCP, or the path of a Unix socket.
+
+    Returns:
+        tuple: (socket family, address accepted by bind/connect).
+    """
+
+    host, _, port = str(address).rpartition(':')
+    if host and port.isdigit():
+        return socket.AF_INET, (host, int(port))
+    return socket.AF_UNIX, str(address)
+
+class WorldState:
+    """A decoded snapshot.
+
+    Attributes:
+        tick (int): Server tick the snapshot was taken at.
+        active (bool): Whether a game was being played.
+        score, high_score, level, dragons_left (int): As in GameStats.
+        entities (dict[int, tuple[int, int, int]]): id -> (kind, x, y),
+            with x and y in quantized units.
+    """
+
+    def __init__(self, tick: int = 0, entities: dict = None):
+        self.tick = tick
+        self.active = False
+        self.score = self.high_score = self.level = self.dragons_left = 0
+        self.entities = entities if entities is not None else {}
+
+    def count(self, kind: int):
+        """Return the number of entities of a kind."""
+
+        return sum(1 for entity in self.entities.values() if entity[0] == kind)
+
+def encode(tick: int, stats: tuple, entities: dict, base_tick: int = 0, base: dict = None):
+    """Encode a snapshot, as a delta against `base` if one is given.
+
+    Args:
+        tick (int): Tick of the snapshot.
+        stats (tuple): (active, score, high score, level, dragons left).
+        entities (dict[int, tuple[int, int, int]]): id -> (kind, x, y).
+        base_tick (int): Tick of the base snapshot (0 for none).
+        base (dict): Entities of the base snapshot.
+
+    Returns:
+        bytes: The payload (without the length prefix).
+    """
+
+    base = base or {}
+    spawned, moved = [], []
+    for entity_id, entity in entities.items():
+        old = base.get(entity_id)
+        if old == entity:
+            continue
+        if old is not None:
+            dx, dy = entity[1] - old[1], entity[2] - old[2]
+            if -128 <= dx < 128 and -128 <= dy < 128:
+                moved.append(MOVED.pack(entity_id, dx, dy))
+                continue
+        spawned.append(SPAWNED.pack(entity_id, *entity))
+    removed = [REMOVED.pack(entity_id) for entity_id in base.keys() - entities.keys()]
+
+    header = HEADER.pack(MAGIC, VERSION, tick, base_tick, *stats,
+                         len(spawned), len(moved), len(removed))
+    return b''.join([header, *spawned, *moved, *removed])
+
+def decode(payload: bytes, bases: dict):
+    """Decode a payload into a WorldState.
+
+    Args:
+        payload (bytes): A message payload.
+        bases (dict[int, WorldState]): Recently decoded states by tick.
+
+    Returns:
+        WorldState: The decoded state.
+
+    Raises:
+        ValueError: If the payload is malformed or its base is unknown.
+    """
+
+    (magic, version, tick, base_tick, active, score, high_score, level,
+     dragons_left, num_spawned, num_moved, num_removed) = HEADER.unpack_from(payload)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a version {VERSION} snapshot")
+    if base_tick:
+        if base_tick not in bases:
+            raise ValueError(f"unknown base tick {base_tick}")
+        entities = dict(bases[base_tick].entities)
+    else:
+        entities = {}
+
+    offset = HEADER.size
+    for entity_id, kind, x, y in SPAWNED.iter_unpack(
+            payload[offset:offset + num_spawned * SPAWNED.size]):
+        entities[entity_id] = (kind, x, y)
+    offset += num_spawned * SPAWNED.size
+    for entity_id, dx, dy in MOVED.iter_unpack(
+            payload[offset:offset + num_moved * MOVED.size]):
+        kind, x, y = entities[entity_id]
+        entities[entity_id] = (kind, x + dx, y + dy)
+    offset += num_moved * MOVED.size
+    for (entity_id,) in REMOVED.iter_unpack(
+            payload[offset:offset + num_removed * REMOVED.size]):
+        del entities[entity_id]
+
+    state = WorldState(tick, entities)
+    state.active = bool(active)
+    state.score, state.high_score = score, high_score
+    state.level, state.dragons_left = level, dragons_left
+    return state
+
+class _Client:
+    """A connected client: its socket, acknowledged tick and unsent bytes."""
+
+    def __init__(self, connection: socket.socket):
+        self.connection = connection
+        self.acked = 0
+        self.incoming = b''
+        self.outgoing = b''
+
+class StateSyncServer:
+    """Send delta-compressed snapshots to local clients, once per frame.
+
+    All socket I/O is non-blocking. A client that has not finished
+    receiving its previous snapshot is skipped for the frame; its next
+    snapshot is still a valid delta, since deltas are always taken
+    against an acknowledged snapshot.
+
+    Attributes:
+        address (str): The address the server listens on.
+        quantum (int): Position quantization step, in pixels.
+        tick (int): Number of snapshots taken.
+        clients (list[_Client]): Connected clients.
+        bytes_sent (int): Payload and length bytes queued for all clients.
+        full_snapshots (int): Full snapshots sent.
+        delta_snapshots (int): Delta snapshots sent.
+        ticks_sent (int): Ticks on which at least one snapshot was sent.
+    """
+
+    def __init__(self, address: str, quantum: int = 1):
+        """Start listening.
+
+        Args:
+            address (str): 'host:port' for TCP, or the path of a Unix socket.
+                Port 0 picks a free port; see `address` for the one chosen.
+            quantum (int): Position quantization step, in pixels.
+        """
+
+        self.quantum = quantum
+        self.family, bind_address = parse_address(address)
+        if self.family == socket.AF_UNIX and os.path.exists(bind_address):
+            os.unlink(bind_address) # Left behind by a previous run.
+        self.listener = socket.socket(self.family, socket.SOCK_STREAM)
+        if self.family == socket.AF_INET:
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(bind_address)
+        self.listener.listen()
+        self.listener.setblocking(False)
+        if self.family == socket.AF_INET:
+            host, port = self.listener.getsockname()
+            self.address = f"{host}:{port}"
+        else:
+            self.address = bind_address
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.clients = []
+        self.tick = 0
+        self._history = {} # tick -> entities of the snapshot.
+        self._ids = {} # sprite -> entity id.
+        self._next_id = DRAGON_ID + 1
+        self._free_ids = deque() # (tick freed, id), reused once out of history.
+        self._previous_sprites = set()
+        self.bytes_sent = self.full_snapshots = self.delta_snapshots = self.ticks_sent = 0
+
+    def _entity_id(self, sprite):
+        """Return the id of a sprite, assigning one on first sight."""
+
+        entity_id = self._ids.get(sprite)
+        if entity_id is None:
+            # An id is only reused once no delta base can still contain it.
+            if self._free_ids and self._free_ids[0][0] <= self.tick - HISTORY:
+                entity_id = self._free_ids.popleft()[1]
+            else:
+                entity_id = self._next_id
+                self._next_id += 1
+            self._ids[sprite] = entity_id
+        return entity_id
+
+    def _snapshot(self, game: 'WhiteWalkerInvasion'):
+        """Return the quantized entities of the game, keyed by id."""
+
+        q = self.quantum
+        dragon = game.dragon.rect
+        entities = {DRAGON_ID: (DRAGON, dragon.x // q, dragon.y // q)}
+        sprites = set()
+        for kind, group in ((WALKER, game.white_walker_army.army),
+                            (ELEMENT, game.dragon.arsenal.arsenal)):
+            for sprite in group:
+                sprites.add(sprite)
+                entities[self._entity_id(sprite)] = (kind, sprite.rect.x // q,
+                                                     sprite.rect.y // q)
+        for sprite in self._previous_sprites - sprites:
+            self._free_ids.append((self.tick, self._ids.pop(sprite)))
+        self._previous_sprites = sprites
+        return entities
+
+    def publish(self, game: 'WhiteWalkerInvasion'):
+        """Take a snapshot of the game and send it to every ready client.
+
+        Args:
+            game (WhiteWalkerInvasion): The running game.
+        """
+
+        self._poll()
+        self.tick += 1
+        entities = self._snapshot(game)
+        self._history[self.tick] = entities
+        self._history.pop(self.tick - HISTORY, None)
+        if not self.clients:
+            return
+
+        stats = game.game_stats
+        stats = (game.game_active, stats.score, stats.high_score, stats.level,
+                 stats.dragons_left)
+        encoded = {} # Clients acknowledging the same tick share one encoding.
+        for client in self.clients:
+            if client.outgoing:
+                continue # Still sending an earlier snapshot.
+            base_tick = client.acked if client.acked in self._history else 0
+            payload = encoded.get(base_tick)
+            if payload is None:
+                payload = encoded[base_tick] = encode(
+                    self.tick, stats, entities, base_tick, self._history.get(base_tick))
+                if base_tick:
+                    self.delta_snapshots += 1
+                else:
+                    self.full_snapshots += 1
+            client.outgoing = LENGTH.pack(len(payload)) + payload
+            self.bytes_sent += len(client.outgoing)
+        if encoded:
+            self.ticks_sent += 1
+        self._flush()
+
+    def _poll(self):
+        """Accept new clients and read acknowledgements, without blocking."""
+
+        for key, _ in self.selector.select(timeout=0):
+            if key.fileobj is self.listener:
+                connection, _ = self.listener.accept()
+                connection.setblocking(False)
+                if self.family == socket.AF_INET:
+                    connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                client = _Client(connection)
+                self.clients.append(client)
+                self.selector.register(connection, selectors.EVENT_READ, client)
+                continue
+
+            client = key.data
+            try:
+                data = client.connection.recv(4096)
+            except (BlockingIOError, InterruptedError):
+                continue
+            except OSError:
+                data = b''
+            if not data:
+                self._drop(client)
+                continue
+            client.incoming += data
+            usable = len(client.incoming) - len(client.incoming) % ACK.size
+            for (tick,) in ACK.iter_unpack(client.incoming[:usable]):
+                client.acked = max(client.acked, tick)
+            client.incoming = client.incoming[usable:]
+
+    def _flush(self):
+        """Send as much pending data as every client's socket accepts."""
+
+        for client in list(self.clients):
+            if not client.outgoing:
+                continue
+            try:
+                sent = client.connection.send(client.outgoing)
+            except (BlockingIOError, InterruptedError):
+                continue
+            except OSError:
+                self._drop(client)
+                continue
+            client.outgoing = client.outgoing[sent:]
+
+    def _drop(self, client: _Client):
+        """Disconnect a client."""
+
+        self.selector.unregister(client.connection)
+        client.connection.close()
+        self.clients.remove(client)
+
+    def report(self):
+        """Return a one-line summary of the bandwidth used."""
+
+        sent = max(1, self.full_snapshots + self.delta_snapshots)
+        ticks = max(1, self.ticks_sent)
+        return (f"State sync: {self.ticks_sent} ticks, {self.full_snapshots} full and "
+                f"{self.delta_snapshots} delta snapshots, {self.bytes_sent / ticks:,.0f} "
+                f"bytes/tick ({self.bytes_sent / sent:,.0f} bytes/snapshot)")
+
+    def close(self):
+        """Disconnect all clients and stop listening."""
+
+        for client in list(self.clients):
+            self._drop(client)
+        self.selector.close()
+        self.listener.close()
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.unlink(self.address)
+        print(self.report())
+
+class NullSyncServer:
+    """A sync server with StateSyncServer's interface that sends nothing."""
+
+    def publish(self, game: 'WhiteWalkerInvasion'):
+        pass
+
+    def close(self):
+        pass
+
+class StateSyncClient:
+    """Reference client: receives snapshots, applies deltas and acknowledges.
+
+    Attributes:
+        state (WorldState): The most recently received state.
+        messages (int): Number of snapshots received.
+        bytes_received (int): Number of bytes received.
+    """
+
+    def __init__(self, address: str, timeout: float = 5.0):
+        """Connect to a server.
+
+        Args:
+            address (str): 'host:port' for TCP, or the path of a Unix socket.
+            timeout (float): Seconds to wait for data before giving up.
+        """
+
+        family, connect_address = parse_address(address)
+        self.connection = socket.socket(family, socket.SOCK_STREAM)
+        self.connection.settimeout(timeout)
+        self.connection.connect(connect_address)
+        self.state = WorldState()
+        self.messages = self.bytes_received = 0
+        # Decoded states the server may still use as delta bases.
+        self._states = {}
+
+    def _receive_exactly(self, size: int):
+        """Read exactly `size` bytes, raising ConnectionError at end of stream."""
+
+        chunks = []
+        while size:
+            chunk = self.connection.recv(size)
+            if not chunk:
+                raise ConnectionError('server closed the connection')
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b''.join(chunks)
+
+    def receive(self):
+        """Receive and apply the next snapshot, then acknowledge it.
+
+        Returns:
+            WorldState: The new state.
+        """
+
+        (length,) = LENGTH.unpack(self._receive_exactly(LENGTH.size))
+        payload = self._receive_exactly(length)
+        self.state = decode(payload, self._states)
+        self.messages += 1
+        self.bytes_received += LENGTH.size + length
+
+        self._states[self.state.tick] = self.state
+        # Ticks can be skipped, so prune by age rather than one tick at a time.
+        for tick in [tick for tick in self._states if tick <= self.state.tick - HISTORY]:
+            del self._states[tick]
+        self.connection.sendall(ACK.pack(self.state.tick))
+        return self.state
+
+    def close(self):
+        """Close the connection."""
+
+        self.connection.close()
+
+def main():
+    """Connect to a running game and print what is received."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--address', default='127.0.0.1:7777',
+                        help="server address, 'host:port' or a Unix socket path")
+    parser.add_argument('--ticks', type=int, default=600,
+                        help='number of snapshots to receive')
+    args = parser.parse_args()
+
+    client = StateSyncClient(args.address)
+    start = time.perf_counter()
+    try:
+        for _ in range(args.ticks):
+            state = client.receive()
+            if state.tick % 60 == 0:
+                print(f"tick {state.tick}: score {state.score}, level {state.level}, "
+                      f"{state.count(WALKER)} walkers, {state.count(ELEMENT)} elements")
+    except ConnectionError as e:
+        print(e)
+    finally:
+        client.close()
+    elapsed = time.perf_counter() - start
+    print(f"Received {client.messages} snapshots, "
+          f"{client.bytes_received / max(1, client.messages):,.0f} bytes/snapshot, "
+          f"{client.bytes_received / elapsed / 1024:,.1f} KiB/s")
+
+if __name__ == '__main__':
+    main()
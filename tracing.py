@@ -0,0 +1,195 @@
+"""Lightweight per-frame tracing, exported as Chrome trace JSON.
+
+Tracer records begin/end spans (e.g. each phase of `run_game`) and instant
+events (level-ups, lost lives, asset loads) into a ring buffer that is
+allocated once up front, so recording never allocates or does I/O. When the
+game exits, the buffer is written as Chrome trace event JSON, which can be
+opened in chrome://tracing or https://ui.perfetto.dev to inspect hitches.
+
+When tracing is off, the game uses a NullTracer with the same interface
+whose methods do nothing.
+"""
+
+import json
+import os
+import time
+from array import array
+
+# Chrome trace phases used by the recorded events.
+BEGIN = 'B'
+END = 'E'
+INSTANT = 'i'
+
+class _Span:
+    """Context manager recording a begin/end pair for one span name."""
+
+    __slots__ = ('tracer', 'name')
+
+    def __init__(self, tracer: 'Tracer', name: str):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.tracer.begin(self.name)
+
+    def __exit__(self, *exc_info):
+        self.tracer.end(self.name)
+
+class Tracer:
+    """Record spans and instant events into a preallocated ring buffer.
+
+    Once the buffer is full, the oldest events are overwritten, so memory
+    stays constant no matter how long the game runs.
+
+    Attributes:
+        path (str): File the trace is written to by `dump()`.
+        capacity (int): Number of events the ring buffer holds.
+        count (int): Total number of events recorded so far.
+    """
+
+    def __init__(self, path: str, capacity: int):
+        """Allocate the ring buffer.
+
+        Args:
+            path (str): File the trace is written to by `dump()`.
+            capacity (int): Number of events the ring buffer holds.
+        """
+
+        self.path = path
+        self.capacity = capacity
+        self.count = 0
+        self._names = [None] * capacity
+        self._phases = [None] * capacity
+        self._args = [None] * capacity
+        self._times = array('d', bytes(8 * capacity))
+        # Span context managers are reused per name instead of allocated per call.
+        self._spans = {}
+
+    def _record(self, name: str, phase: str, args: dict = None):
+        """Write one event into the next slot of the ring buffer."""
+
+        index = self.count % self.capacity
+        self._names[index] = name
+        self._phases[index] = phase
+        self._args[index] = args
+        self._times[index] = time.perf_counter()
+        self.count += 1
+
+    def begin(self, name: str):
+        """Record the start of a span.
+
+        Args:
+            name (str): Name of the span.
+        """
+
+        self._record(name, BEGIN)
+
+    def end(self, name: str):
+        """Record the end of a span.
+
+        Args:
+            name (str): Name of the span (the same as passed to `begin`).
+        """
+
+        self._record(name, END)
+
+    def span(self, name: str):
+        """Return a context manager recording a span around its block.
+
+        Args:
+            name (str): Name of the span.
+
+        Returns:
+            _Span: Reusable context manager for the span.
+        """
+
+        span = self._spans.get(name)
+        if span is None:
+            span = self._spans[name] = _Span(self, name)
+        return span
+
+    def instant(self, name: str, args: dict = None):
+        """Record an instant event, such as a level-up.
+
+        Args:
+            name (str): Name of the event.
+            args (dict): Optional details shown with the event.
+        """
+
+        self._record(name, INSTANT, args)
+
+    def events(self):
+        """Return the buffered events as Chrome trace event dicts, oldest first.
+
+        End events whose begin was overwritten by the ring buffer are
+        dropped, so every span in the output is complete.
+
+        Returns:
+            list[dict]: The trace events.
+        """
+
+        first = max(0, self.count - self.capacity)
+        pid = os.getpid()
+        open_spans = {}
+        events = []
+        for number in range(first, self.count):
+            index = number % self.capacity
+            name = self._names[index]
+            phase = self._phases[index]
+            if phase == BEGIN:
+                open_spans[name] = open_spans.get(name, 0) + 1
+            elif phase == END:
+                if not open_spans.get(name):
+                    continue # Its begin event was overwritten.
+                open_spans[name] -= 1
+
+            event = {
+                'name': name,
+                'ph': phase,
+                'ts': self._times[index] * 1e6, # Chrome traces use microseconds.
+                'pid': pid,
+                'tid': 0,
+            }
+            if phase == INSTANT:
+                event['s'] = 'g' # Draw instant events across the whole timeline.
+            if self._args[index] is not None:
+                event['args'] = self._args[index]
+            events.append(event)
+        return events
+
+    def dump(self):
+        """Write the buffered events to `path` as Chrome trace JSON."""
+
+        trace = {'traceEvents': self.events(), 'displayTimeUnit': 'ms'}
+        with open(self.path, 'w') as trace_file:
+            json.dump(trace, trace_file)
+        print(f"Wrote {len(trace['traceEvents'])} trace events to {self.path}")
+
+class _NullSpan:
+    """Context manager that does nothing, used when tracing is off."""
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+class NullTracer:
+    """A tracer with Tracer's interface that records nothing."""
+
+    _span = _NullSpan()
+
+    def begin(self, name: str):
+        pass
+
+    def end(self, name: str):
+        pass
+
+    def span(self, name: str):
+        return self._span
+
+    def instant(self, name: str, args: dict = None):
+        pass
+
+    def dump(self):
+        pass
@@ -0,0 +1,585 @@
+"""A batched, NumPy-backed version of the game rules for automated players.
+
+VectorWhiteWalkerEnv steps K independent games at once inside one process,
+in the style of a gym vector environment. Instead of one sprite per entity,
+every quantity is stored in a NumPy array with one row per game, so a single
+call to `step()` advances all K games with a handful of array operations.
+
+The rules mirror the sprite-based game frame for frame:
+- `Dragon._update_dragon_movement` and `DragonArsenal.update_arsenal`
+- `WhiteWalkerArmy.update_army` (edge check, drop, vertical movement)
+- `IceShots.update` and `IceShots.fire`: the walkers' ice shots are
+  already arrays of positions and velocities, so each game gets a row of
+  shot slots, switched off with an alive mask like the elements
+- `WhiteWalkerInvasion._check_collisions`, including
+  `WhiteWalkerArmy.check_left_edge`, `IceShots.check_hit`,
+  `WhiteWalkerArmy.check_collisions` (with pygame's groupcollide removal
+  order) and `Settings.increase_difficulty` on level-up, whose per-level
+  values are looked up in the settings' DifficultyTable.
+Mixed formations of enemy types (enemy_types.py) are mirrored with one
+type index per walker slot: each type's hit points, drop speed and points
+are looked up from small per-type arrays, so a frame with several types
+on screen still takes the same few array operations.
+Endless mode (waves.py) and swept collisions are not mirrored, so games
+compared with it must play in the 'levels' game mode with 'discrete'
+collisions, one frame per step.
+Positions are kept as floats and converted to whole pixels the same way
+pygame.Rect does (rounding halves away from zero), so collisions happen on
+exactly the same frames as in the real game.
+"""
+
+import numpy as np
+
+from enemy_types import formation_types
+from settings import Settings
+from white_walker_army import WhiteWalkerArmy
+
+# Movement part of an action. Adding SHOOT to any of them also fires.
+NOOP = 0
+UP = 1
+DOWN = 2
+SHOOT = 3
+# Number of distinct actions: three movements, each with or without a shot.
+NUM_ACTIONS = 6
+
+def _to_pixels(values: np.ndarray):
+    """Convert float positions to whole pixels the way pygame.Rect does.
+
+    Args:
+        values (np.ndarray): Float positions.
+
+    Returns:
+        np.ndarray: Integer positions, with halves rounded away from zero.
+    """
+
+    return np.copysign(np.floor(np.abs(values) + 0.5), values).astype(np.int64)
+
+class VectorWhiteWalkerEnv:
+    """Step many games of White Walker Invasion at once with NumPy arrays.
+
+    Each of the K games is one row in every array. Walkers occupy a fixed
+    slot in the formation (in the same order `_army_formation` creates
+    them) and are switched off with an alive mask instead of being removed.
+    Finished games are restarted automatically, like `restart_game`.
+
+    Attributes:
+        num_envs (int): Number of games stepped together (K).
+        settings (Settings): Settings shared by all games.
+        dragon_y (np.ndarray): (K,) float y position of each dragon.
+        dragon_top (np.ndarray): (K,) dragon rect top in pixels.
+        walker_x, walker_y (np.ndarray): (K, W) float walker positions.
+        walker_left, walker_top (np.ndarray): (K, W) walker rect positions.
+        walker_alive (np.ndarray): (K, W) mask of walkers still in the army.
+        walker_kind (np.ndarray): (K, W) enemy type index of each walker.
+        walker_hit_points (np.ndarray): (K, W) hits each walker can still take.
+        type_hit_points, type_speed, type_points (np.ndarray): Hit points,
+            drop speed multiplier and point multiplier of each enemy type.
+        element_x (np.ndarray): (K, E) float x position of each element.
+        element_left, element_top (np.ndarray): (K, E) element rect positions.
+        element_alive (np.ndarray): (K, E) mask of elements in flight.
+        ice_x, ice_y, ice_vx, ice_vy (np.ndarray): (K, S) float positions and
+            velocities of the ice shots. The S slots per game grow, up to
+            `ice_shot_capacity`, when a volley does not fit.
+        ice_alive (np.ndarray): (K, S) mask of ice shots in flight.
+        ice_countdown (np.ndarray): (K,) frames until each army's next volley.
+        army_direction (np.ndarray): (K,) vertical army direction (1 or -1).
+        lives (np.ndarray): (K,) dragons left in each game.
+        score, level, frames (np.ndarray): (K,) per-game statistics.
+        dragon_speed, element_speed, army_speed (np.ndarray): (K,) dynamic speeds.
+        walker_points (np.ndarray): (K,) points per walker destroyed.
+    """
+
+    def __init__(self, num_envs: int, settings: Settings = None):
+        """Create K games and reset them to their starting state.
+
+        Args:
+            num_envs (int): Number of games stepped together (K).
+            settings (Settings): Settings used by every game. A fresh
+                Settings instance is created when omitted.
+        """
+
+        self.num_envs = num_envs
+        if settings is None:
+            settings = Settings()
+            settings.initialize_dynamic_settings()
+        self.settings = settings
+        self._setup_formation()
+
+        k = num_envs
+        walkers = len(self.formation_x)
+        elements = settings.element_amount
+
+        self.dragon_y = np.zeros(k)
+        self.dragon_top = np.zeros(k, dtype=np.int64)
+
+        self.walker_x = np.zeros((k, walkers))
+        self.walker_y = np.zeros((k, walkers))
+        self.walker_left = np.zeros((k, walkers), dtype=np.int64)
+        self.walker_top = np.zeros((k, walkers), dtype=np.int64)
+        self.walker_alive = np.zeros((k, walkers), dtype=bool)
+        self.walker_kind = np.zeros((k, walkers), dtype=np.int64)
+        self.walker_hit_points = np.zeros((k, walkers), dtype=np.int64)
+
+        # Enemy types in settings order, as indexed by `EnemyType.index`.
+        types = list(settings.enemy_types.values())
+        self.type_hit_points = np.array([hit_points for _, hit_points, _, _ in types],
+                                        dtype=np.int64)
+        self.type_speed = np.array([speed for _, _, speed, _ in types])
+        self.type_points = np.array([points for _, _, _, points in types], dtype=np.int64)
+        self._formation_kinds = {} # Walker type indices of each level's formation.
+
+        self.element_x = np.zeros((k, elements))
+        self.element_left = np.zeros((k, elements), dtype=np.int64)
+        self.element_top = np.zeros((k, elements), dtype=np.int64)
+        self.element_alive = np.zeros((k, elements), dtype=bool)
+
+        self.ice_x = np.zeros((k, 0))
+        self.ice_y = np.zeros((k, 0))
+        self.ice_vx = np.zeros((k, 0))
+        self.ice_vy = np.zeros((k, 0))
+        self.ice_alive = np.zeros((k, 0), dtype=bool)
+        # Room for a few volleys of the whole formation to start with.
+        self._grow_ice_shots(min(4 * self.formation_rows, settings.ice_shot_capacity))
+        self.ice_countdown = np.zeros(k, dtype=np.int64)
+
+        # The army direction survives restarts, just like on WhiteWalkerArmy.
+        self.army_direction = np.full(k, settings.army_direction, dtype=np.int64)
+        self.lives = np.zeros(k, dtype=np.int64)
+        self.score = np.zeros(k, dtype=np.int64)
+        self.level = np.zeros(k, dtype=np.int64)
+        self.frames = np.zeros(k, dtype=np.int64)
+
+        self.dragon_speed = np.zeros(k)
+        self.element_speed = np.zeros(k)
+        self.army_speed = np.zeros(k)
+        self.walker_points = np.zeros(k, dtype=np.int64)
+        self._difficulty_arrays = settings.difficulty_table.as_arrays(1)
+
+    def _setup_formation(self):
+        """Compute the starting walker positions used by every level.
+
+        Uses the same sizing and offsets as `WhiteWalkerArmy.create_army`,
+        and lists walkers column by column, as `_army_formation` does.
+        """
+
+        s = self.settings
+        army_height, army_width = WhiteWalkerArmy.calc_army_size(
+            s.walker_height, s.screen_height, s.walker_width, s.screen_width)
+        y_offset, x_offset = WhiteWalkerArmy.calc_offsets(
+            s.walker_height, s.screen_height, s.walker_width, s.screen_width,
+            army_height, army_width)
+
+        columns, rows = np.meshgrid(np.arange(army_width), np.arange(army_height),
+                                    indexing='ij')
+        self.formation_x = (s.walker_width * columns + x_offset).ravel().astype(np.int64)
+        self.formation_y = (s.walker_height * rows + y_offset).ravel().astype(np.int64)
+        self.formation_columns = columns.ravel()
+        self.formation_rows = army_height
+
+        # The dragon's rect sits on the left edge, centered vertically.
+        self.dragon_start = s.screen_height // 2 - s.dragon_height // 2
+
+    def reset(self):
+        """Restart every game.
+
+        Returns:
+            dict: The batched observation (see `_observe`).
+        """
+
+        self._restart(np.ones(self.num_envs, dtype=bool))
+        return self._observe()
+
+    def step(self, actions):
+        """Advance every game by one frame.
+
+        Args:
+            actions (array-like): (K,) actions, each a movement (NOOP, UP or
+                DOWN) optionally plus SHOOT.
+
+        Returns:
+            tuple: (observation, rewards, dones, info). Rewards are the
+            points scored this frame. Games flagged in `dones` have already
+            been restarted; `info` holds their final 'score', 'level' and
+            'frames' (the values for other games are their running totals).
+        """
+
+        actions = np.asarray(actions)
+        moves = actions % SHOOT
+        shooting = actions >= SHOOT
+        dones = np.zeros(self.num_envs, dtype=bool)
+
+        self._shoot(shooting)
+        self._update_dragon(moves)
+        self._update_elements()
+        self._update_army()
+        self._update_ice_shots()
+        self._fire_ice_shots()
+
+        # Dragon touching any walker costs a life (and recenters the dragon), as
+        # does any walker crossing the left edge or an ice shot hitting the
+        # dragon. The checks stop at the first one that happens, as with `or`.
+        hit = self._dragon_collisions()
+        self.dragon_y[hit] = self.dragon_start
+        self.dragon_top[hit] = self.dragon_start
+        crossed = (self.walker_alive & (self.walker_left <= -10)).any(axis=1)
+        frozen = self._ice_hits(~(hit | crossed))
+        self._lose_life(hit | crossed | frozen, dones)
+
+        rewards = self._element_collisions()
+        self.score += rewards
+
+        # A destroyed army starts the next, harder level (whose formation
+        # depends on the level).
+        cleared = ~self.walker_alive.any(axis=1)
+        self.level[cleared] += 1
+        self._apply_difficulty(cleared)
+        self._reset_level(cleared)
+
+        self.frames += 1
+        info = {
+            'score': self.score.copy(),
+            'level': self.level.copy(),
+            'frames': self.frames.copy(),
+        }
+        self._restart(dones)
+        return self._observe(), rewards, dones, info
+
+    def _shoot(self, shooting: np.ndarray):
+        """Fire an element in every game that asked to and has room for one.
+
+        Args:
+            shooting (np.ndarray): (K,) mask of games that pressed shoot.
+        """
+
+        s = self.settings
+        can_shoot = shooting & (self.element_alive.sum(axis=1) < s.element_amount)
+        games = np.flatnonzero(can_shoot)
+        # Use the first free slot in each game.
+        slots = np.argmin(self.element_alive[games], axis=1)
+
+        # The element's midright is placed at the dragon's midright.
+        left = s.dragon_width - s.element_width
+        self.element_x[games, slots] = left
+        self.element_left[games, slots] = left
+        self.element_top[games, slots] = (self.dragon_top[games] + s.dragon_height // 2
+                                          - s.element_height // 2)
+        self.element_alive[games, slots] = True
+
+    def _update_dragon(self, moves: np.ndarray):
+        """Move each dragon up or down, staying inside the screen.
+
+        Args:
+            moves (np.ndarray): (K,) movement part of each action.
+        """
+
+        s = self.settings
+        down = (moves == DOWN) & (self.dragon_top + s.dragon_height < s.screen_height)
+        up = (moves == UP) & (self.dragon_top > 0)
+        self.dragon_y += self.dragon_speed * down
+        self.dragon_y -= self.dragon_speed * up
+        self.dragon_top = _to_pixels(self.dragon_y)
+
+    def _update_elements(self):
+        """Move every element right and remove those past the right edge."""
+
+        s = self.settings
+        self.element_x += self.element_speed[:, None]
+        self.element_left = _to_pixels(self.element_x)
+        offscreen = self.element_left + s.element_width >= s.screen_width
+        self.element_alive &= ~offscreen
+
+    def _update_army(self):
+        """Drop and reverse armies at an edge, then move all walkers vertically."""
+
+        s = self.settings
+        at_edge = self.walker_alive & (
+            (self.walker_top + s.walker_height >= s.screen_height)
+            | (self.walker_top <= 0))
+        dropping = at_edge.any(axis=1)
+        self.walker_x[dropping] -= s.army_drop_speed * self.type_speed[self.walker_kind[dropping]]
+        self.army_direction[dropping] *= -1
+
+        self.walker_y += (self.army_speed * self.army_direction)[:, None]
+        self.walker_top = _to_pixels(self.walker_y)
+        self.walker_left = _to_pixels(self.walker_x)
+
+    def _update_ice_shots(self):
+        """Move every ice shot and remove those that left the screen."""
+
+        s = self.settings
+        size = s.ice_shot_size
+        self.ice_x += self.ice_vx
+        self.ice_y += self.ice_vy
+        inside = ((self.ice_x > -size) & (self.ice_x < s.screen_width)
+                  & (self.ice_y > -size) & (self.ice_y < s.screen_height))
+        self.ice_alive &= inside
+
+    def _fire_ice_shots(self):
+        """Fire a volley in every game whose army is due one.
+
+        The front (leftmost) walker of every row fires at the dragon's
+        center, like `IceShots.fire`; a volley that does not fit in the
+        game's free slots (and `ice_shot_capacity`) is cut short, keeping
+        the rows in the order the sprite game finds them.
+        """
+
+        s = self.settings
+        if s.ice_shot_interval <= 0:
+            return # Enemy fire is disabled.
+        self.ice_countdown -= 1
+        due = self.ice_countdown <= 0
+        self.ice_countdown[due] = s.ice_shot_interval
+        games = np.flatnonzero(due)
+        if not games.size:
+            return
+
+        # Walker slots as (game, column, row): slots are listed column by column.
+        rows = self.formation_rows
+        alive = self.walker_alive[games].reshape(len(games), -1, rows)
+        left = np.where(alive, self.walker_left[games].reshape(alive.shape), np.iinfo(np.int64).max)
+        front = left.argmin(axis=1) # Ties go to the first walker, as in the sprite group.
+        firing = alive.any(axis=1)
+        # The sprite game meets the rows in the order of their first live walker.
+        first = alive.argmax(axis=1) * rows + np.arange(rows)
+        order = np.argsort(np.where(firing, first, np.iinfo(np.int64).max), axis=1, kind='stable')
+        front = np.take_along_axis(front, order, axis=1)
+        firing = np.take_along_axis(firing, order, axis=1)
+
+        needed = int(firing.sum(axis=1).max())
+        free = ~self.ice_alive[games]
+        if needed > free.sum(axis=1).min() and self.ice_alive.shape[1] < s.ice_shot_capacity:
+            self._grow_ice_shots(min(s.ice_shot_capacity, 2 * self.ice_alive.shape[1] + needed))
+            free = ~self.ice_alive[games]
+        # Each volley fills the game's free slots in order, as many as there are.
+        rank = np.cumsum(firing, axis=1) - 1
+        firing &= rank < free.sum(axis=1)[:, None]
+        free_slots = np.argsort(~free, axis=1, kind='stable')
+        batch, row = np.nonzero(firing)
+        game = games[batch]
+        slot = free_slots[batch, rank[batch, row]]
+        walker = front[batch, row] * rows + order[batch, row]
+
+        # Start at the walker's midleft, aimed at the dragon's center.
+        start_x = self.walker_left[game, walker].astype(float)
+        start_y = (self.walker_top[game, walker] + s.walker_height // 2).astype(float)
+        dx = s.dragon_width // 2 - start_x
+        dy = self.dragon_top[game] + s.dragon_height // 2 - start_y
+        speed = s.ice_shot_speed / np.maximum(np.hypot(dx, dy), 1.0)
+        half = s.ice_shot_size / 2
+        self.ice_x[game, slot] = start_x - half
+        self.ice_y[game, slot] = start_y - half
+        self.ice_vx[game, slot] = dx * speed
+        self.ice_vy[game, slot] = dy * speed
+        self.ice_alive[game, slot] = True
+
+    def _grow_ice_shots(self, slots: int):
+        """Make room for `slots` ice shots per game, keeping those in flight."""
+
+        extra = slots - self.ice_alive.shape[1]
+        pad = ((0, 0), (0, extra))
+        self.ice_x = np.pad(self.ice_x, pad)
+        self.ice_y = np.pad(self.ice_y, pad)
+        self.ice_vx = np.pad(self.ice_vx, pad)
+        self.ice_vy = np.pad(self.ice_vy, pad)
+        self.ice_alive = np.pad(self.ice_alive, pad)
+
+    def _ice_hits(self, mask: np.ndarray):
+        """Remove the ice shots touching the dragon in the games in `mask`.
+
+        Args:
+            mask (np.ndarray): (K,) games to check.
+
+        Returns:
+            np.ndarray: (K,) mask of games where an ice shot hit the dragon.
+        """
+
+        s = self.settings
+        size = s.ice_shot_size
+        # Whole pixels the way `IceShots.check_hit` rounds them.
+        left = np.floor(self.ice_x + 0.5)
+        top = np.floor(self.ice_y + 0.5)
+        dragon_top = self.dragon_top[:, None]
+        hit = (mask[:, None] & self.ice_alive
+               & (left < s.dragon_width) & (left + size > 0)
+               & (top < dragon_top + s.dragon_height) & (top + size > dragon_top))
+        self.ice_alive &= ~hit
+        return hit.any(axis=1)
+
+    def _dragon_collisions(self):
+        """Return a (K,) mask of games where the dragon touches a walker."""
+
+        s = self.settings
+        top = self.dragon_top[:, None]
+        overlap = (
+            self.walker_alive
+            & (self.walker_left < s.dragon_width)
+            & (self.walker_left + s.walker_width > 0)
+            & (self.walker_top < top + s.dragon_height)
+            & (self.walker_top + s.walker_height > top))
+        return overlap.any(axis=1)
+
+    def _element_collisions(self):
+        """Remove colliding walkers and elements and return the points scored.
+
+        pygame's groupcollide visits walkers in formation order, and each
+        walker removes every element it touches. An element is therefore
+        consumed by the first walker (lowest slot) that overlaps it, and
+        costs that walker one hit point; a walker dies when its hit points
+        run out.
+
+        Returns:
+            np.ndarray: (K,) points scored this frame.
+        """
+
+        s = self.settings
+        w_left = self.walker_left[:, :, None]
+        w_top = self.walker_top[:, :, None]
+        e_left = self.element_left[:, None, :]
+        e_top = self.element_top[:, None, :]
+        overlap = (
+            self.walker_alive[:, :, None]
+            & self.element_alive[:, None, :]
+            & (w_left < e_left + s.element_width)
+            & (w_left + s.walker_width > e_left)
+            & (w_top < e_top + s.element_height)
+            & (w_top + s.walker_height > e_top))
+
+        element_hit = overlap.any(axis=1)
+        first_walker = overlap.argmax(axis=1)
+        games, elements = np.nonzero(element_hit)
+
+        damage = np.zeros(self.walker_alive.shape, dtype=np.int64)
+        np.add.at(damage, (games, first_walker[games, elements]), 1)
+        self.walker_hit_points -= damage
+        killed = (damage > 0) & (self.walker_hit_points <= 0)
+        self.walker_alive &= ~killed
+        self.element_alive &= ~element_hit
+
+        points = (killed * self.type_points[self.walker_kind]).sum(axis=1)
+        return points * self.walker_points
+
+    def _lose_life(self, mask: np.ndarray, dones: np.ndarray):
+        """Apply `_check_game_status` to the games in `mask`.
+
+        Games with lives left lose one and restart the level; the others
+        are flagged as finished.
+
+        Args:
+            mask (np.ndarray): (K,) games where a life was lost.
+            dones (np.ndarray): (K,) finished-game flags, updated in place.
+        """
+
+        has_lives = mask & (self.lives > 0)
+        self.lives[has_lives] -= 1
+        self._reset_level(has_lives)
+        dones |= mask & ~has_lives
+
+    def _reset_level(self, mask: np.ndarray):
+        """Clear elements and rebuild the army for the games in `mask`.
+
+        Args:
+            mask (np.ndarray): (K,) games whose level is reset.
+        """
+
+        self.element_alive[mask] = False
+        self.ice_alive[mask] = False
+        self.ice_countdown[mask] = self.settings.ice_shot_interval
+        self.walker_alive[mask] = True
+        self.walker_x[mask] = self.formation_x
+        self.walker_y[mask] = self.formation_y
+        self.walker_left[mask] = self.formation_x
+        self.walker_top[mask] = self.formation_y
+        # The enemy types come from each game's level, as in `create_army`.
+        for level in np.unique(self.level[mask]):
+            games = mask & (self.level == level)
+            kinds = self._level_kinds(int(level))
+            self.walker_kind[games] = kinds
+            self.walker_hit_points[games] = self.type_hit_points[kinds]
+
+    def _level_kinds(self, level: int):
+        """Return the enemy type index of every walker slot on a level.
+
+        Args:
+            level (int): The level, starting at 1.
+
+        Returns:
+            np.ndarray: (W,) type indices, with column patterns repeated
+            like `WhiteWalkerArmy._army_formation` does.
+        """
+
+        pattern = formation_types(self.settings, level)
+        kinds = self._formation_kinds.get(pattern)
+        if kinds is None:
+            names = list(self.settings.enemy_types)
+            indices = np.array([names.index(name) for name in pattern], dtype=np.int64)
+            kinds = indices[self.formation_columns % len(pattern)]
+            self._formation_kinds[pattern] = kinds
+        return kinds
+
+    def _apply_difficulty(self, mask: np.ndarray):
+        """Set the scaled settings of the games in `mask` for their level.
+
+        This is the batched `Settings.increase_difficulty`: each game's
+        speeds and point value are read from the difficulty table at its
+        current level.
+
+        Args:
+            mask (np.ndarray): (K,) games whose level changed.
+        """
+
+        levels = self.level[mask]
+        if levels.size and levels.max() >= len(self._difficulty_arrays[0]):
+            # Grow the cached arrays well past the highest level reached.
+            self._difficulty_arrays = self.settings.difficulty_table.as_arrays(
+                2 * int(levels.max()))
+
+        dragon_speed, element_speed, army_speed, walker_points = self._difficulty_arrays
+        self.dragon_speed[mask] = dragon_speed[levels]
+        self.element_speed[mask] = element_speed[levels]
+        self.army_speed[mask] = army_speed[levels]
+        self.walker_points[mask] = walker_points[levels]
+
+    def _restart(self, mask: np.ndarray):
+        """Apply `restart_game` to the games in `mask`.
+
+        Args:
+            mask (np.ndarray): (K,) games to restart.
+        """
+
+        self.lives[mask] = self.settings.starting_dragon_count
+        self.score[mask] = 0
+        self.level[mask] = 1
+        self.frames[mask] = 0
+        self._apply_difficulty(mask)
+
+        self._reset_level(mask)
+        self.dragon_y[mask] = self.dragon_start
+        self.dragon_top[mask] = self.dragon_start
+
+    def _observe(self):
+        """Return a batched observation of every game.
+
+        Returns:
+            dict: Copies of the dragon y ('dragon_y', (K,)), walker
+            positions, mask, enemy types and hit points ('walker_x',
+            'walker_y', 'walker_alive', 'walker_kind', 'walker_hit_points',
+            (K, W)), element positions and mask ('element_x', 'element_y',
+            'element_alive', (K, E)), ice shot positions and mask ('ice_x',
+            'ice_y', 'ice_alive', (K, S)) and lives ('lives', (K,)).
+        """
+
+        return {
+            'dragon_y': self.dragon_y.copy(),
+            'walker_x': self.walker_x.copy(),
+            'walker_y': self.walker_y.copy(),
+            'walker_alive': self.walker_alive.copy(),
+            'walker_kind': self.walker_kind.copy(),
+            'walker_hit_points': self.walker_hit_points.copy(),
+            'element_x': self.element_x.copy(),
+            'element_y': self.element_top.astype(float),
+            'element_alive': self.element_alive.copy(),
+            'ice_x': self.ice_x.copy(),
+            'ice_y': self.ice_y.copy(),
+            'ice_alive': self.ice_alive.copy(),
+            'lives': self.lives.copy(),
+        }
@@ -0,0 +1,221 @@
+"""Built-in gameplay capture with a background writer thread.
+
+VideoCapture copies every rendered frame out of the display surface into
+a pool of preallocated buffers and hands it to a writer thread, which
+converts it to RGB and writes it out in one of three modes:
+
+- 'ffmpeg': piped into a local ffmpeg process, encoding an .mp4 file;
+- 'png': one numbered PNG file per frame;
+- 'raw': all frames appended to a single file of packed RGB24 pixels
+  (for example: ffmpeg -f rawvideo -pix_fmt rgb24 -s 1200x700 -r 60 -i capture.rgb).
+
+The default mode, 'auto', uses ffmpeg if it is installed and PNG files
+otherwise. The game thread only does one memory copy per frame (from the
+surface's pixel view into a pooled buffer) and never waits for I/O: if
+every buffer is still queued for writing, the frame is dropped and
+counted instead.
+
+Capture is toggled with F11, or started at launch with the WW_CAPTURE
+environment variable set to a mode. Output goes to `settings.capture_dir`.
+"""
+
+import queue
+import shutil
+import struct
+import subprocess
+import threading
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pygame
+
+MODES = ('auto', 'ffmpeg', 'png', 'raw')
+
+def write_png(path: Path, rgb: np.ndarray, level: int = 1):
+    """Write an RGB image as a PNG file.
+
+    zlib releases the GIL while compressing, unlike `pygame.image.save`, so
+    the game thread keeps running while the writer thread encodes.
+
+    Args:
+        path (Path): File to write.
+        rgb (np.ndarray): (height, width, 3) uint8 pixels.
+        level (int): zlib compression level; low levels are much faster.
+    """
+
+    height, width, _ = rgb.shape
+    # Every row starts with its filter type; 0 means unfiltered.
+    rows = np.zeros((height, width * 3 + 1), np.uint8)
+    rows[:, 1:] = rgb.reshape(height, width * 3)
+
+    def chunk(kind: bytes, data: bytes):
+        return (struct.pack('>I', len(data)) + kind + data
+                + struct.pack('>I', zlib.crc32(kind + data)))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0) # 8-bit RGB.
+    with open(path, 'wb') as png_file:
+        png_file.write(b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+                       + chunk(b'IDAT', zlib.compress(rows.data, level))
+                       + chunk(b'IEND', b''))
+
+class VideoCapture:
+    """Capture rendered frames and write them from a background thread.
+
+    Attributes:
+        output_dir (Path): Directory captures are saved in.
+        mode (str): Requested output mode (one of MODES).
+        pool_size (int): Number of preallocated frame buffers.
+        fps (int): Frame rate written into encoded videos.
+        active (bool): Whether a capture is in progress.
+        captured (int): Frames copied into the pool in the current capture.
+        dropped (int): Frames dropped because no buffer was free.
+        written (int): Frames written by the writer thread.
+    """
+
+    def __init__(self, output_dir: Path, mode: str = 'auto', pool_size: int = 32,
+                 fps: int = 60):
+        """Prepare the capture (nothing is allocated until it starts).
+
+        Args:
+            output_dir (Path): Directory captures are saved in.
+            mode (str): Output mode, one of MODES.
+            pool_size (int): Number of preallocated frame buffers.
+            fps (int): Frame rate written into encoded videos.
+        """
+
+        if mode not in MODES:
+            raise ValueError(f"Unknown capture mode '{mode}'. Choose from: {', '.join(MODES)}")
+        self.output_dir = output_dir
+        self.mode = mode
+        self.pool_size = pool_size
+        self.fps = fps
+        self.active = False
+        self.captured = self.dropped = self.written = 0
+        self._thread = None
+
+    def start(self, surface: pygame.Surface):
+        """Allocate the buffer pool and start the writer thread.
+
+        Args:
+            surface (pygame.Surface): The display surface that will be captured.
+        """
+
+        if self.active:
+            return
+        if surface.get_bitsize() != 32:
+            print(f"Cannot capture a {surface.get_bitsize()}-bit display surface")
+            return
+
+        width, height = surface.get_size()
+        # Buffers hold the surface's own 32-bit pixels, so capturing is one copy.
+        self._free = queue.SimpleQueue()
+        for _ in range(self.pool_size):
+            self._free.put(np.empty((height, width), np.uint32))
+        self._filled = queue.SimpleQueue()
+        self._shifts = surface.get_shifts()[:3]
+
+        mode = self.mode
+        if mode == 'auto':
+            mode = 'ffmpeg' if shutil.which('ffmpeg') else 'png'
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.output_dir / f"capture-{time.strftime('%Y%m%d-%H%M%S')}"
+        self._sink = self._open_sink(mode, width, height)
+
+        self.captured = self.dropped = self.written = 0
+        self.active = True
+        self._thread = threading.Thread(target=self._write_frames, name='capture-writer',
+                                        daemon=True)
+        self._thread.start()
+        print(f"Capturing ({mode}) to {self.path}")
+
+    def _open_sink(self, mode: str, width: int, height: int):
+        """Open the output for a mode and return a function writing one RGB frame."""
+
+        if mode == 'ffmpeg':
+            self.path = self.path.with_suffix('.mp4')
+            self._encoder = subprocess.Popen(
+                ['ffmpeg', '-loglevel', 'error', '-y', '-f', 'rawvideo',
+                 '-pix_fmt', 'rgb24', '-s', f"{width}x{height}", '-r', str(self.fps),
+                 '-i', '-', '-c:v', 'libx264', '-pix_fmt', 'yuv420p', str(self.path)],
+                stdin=subprocess.PIPE)
+            return lambda rgb, number: self._encoder.stdin.write(rgb.data)
+        self._encoder = None
+
+        if mode == 'raw':
+            self.path = self.path.with_suffix('.rgb')
+            self._raw_file = open(self.path, 'wb')
+            return lambda rgb, number: self._raw_file.write(rgb.data)
+
+        self.path.mkdir()
+        return lambda rgb, number: write_png(self.path / f"frame-{number:06d}.png", rgb)
+
+    def capture(self, surface: pygame.Surface):
+        """Copy a rendered frame into a free buffer, or drop it (game thread).
+
+        Does nothing unless a capture is in progress. Never blocks.
+
+        Args:
+            surface (pygame.Surface): The display surface, fully drawn.
+        """
+
+        if not self.active:
+            return
+        try:
+            buffer = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return
+        # The view is (width, height); its transpose matches the buffer's memory order.
+        pixels = surface.get_view('2')
+        np.copyto(buffer, np.asarray(pixels).T)
+        del pixels # Unlock the surface for drawing.
+        self._filled.put(buffer)
+        self.captured += 1
+
+    def _write_frames(self):
+        """Convert and write queued frames until stopped (writer thread)."""
+
+        red, green, blue = self._shifts
+        rgb = None
+        while True:
+            buffer = self._filled.get()
+            if buffer is None:
+                break
+            if rgb is None:
+                rgb = np.empty(buffer.shape + (3,), np.uint8)
+            rgb[..., 0] = buffer >> red
+            rgb[..., 1] = buffer >> green
+            rgb[..., 2] = buffer >> blue
+            self._free.put(buffer) # The pixels are copied, so the buffer is free again.
+            try:
+                self._sink(rgb, self.written)
+            except OSError as e:
+                print(f"Capture writer stopped: {e}")
+                break
+            self.written += 1
+
+    def stop(self):
+        """Finish writing the queued frames and close the output."""
+
+        if not self.active:
+            return
+        self.active = False
+        self._filled.put(None)
+        self._thread.join()
+        if self._encoder is not None:
+            self._encoder.stdin.close()
+            self._encoder.wait()
+        elif self.path.suffix == '.rgb':
+            self._raw_file.close()
+        print(f"Captured {self.written} frames to {self.path} "
+              f"({self.dropped} dropped because the writer fell behind)")
+
+    def toggle(self, surface: pygame.Surface):
+        """Start capturing if stopped, or stop and finish writing if running."""
+
+        if self.active:
+            self.stop()
+        else:
+            self.start(surface)
@@ -0,0 +1,174 @@
+"""Endless mode: walkers streaming in from the right edge in waves.
+
+In endless mode (`settings.game_mode`, or the WW_GAME_MODE environment
+variable) there is no fixed formation. Walkers enter at the right edge on
+the rows of the formation's grid, which moves up and down and drops like
+the formation does, and they walk toward the dragon at
+`settings.stream_speed` (times their enemy type's speed). The game levels
+up after every `settings.waves_per_level` waves and goes on until the
+dragon runs out of lives.
+
+Waves are lazy generators of spawns: `(delay, row, type name)` tuples,
+where the delay is the number of frames after the previous spawn. The
+patterns are small generator functions (`column`, `train`, `staircase`,
+`pause`) that are composed with `itertools.chain` and `repeat`.
+`level_waves` builds a level's waves from them with the level's enemy
+types, and `endless_waves` chains the levels forever. Nothing is built
+ahead: the spawner only holds the next spawn, and a walker only exists
+from the frame it enters until it is destroyed or reaches the left edge,
+so memory stays bounded however long a run lasts.
+
+WaveSpawner pulls the spawns that are due once per frame, and creates at
+most `settings.spawns_per_frame` walkers per frame. The rest of a big wave
+waits for the next frames and enters as far left as it would have walked
+by then, so a full column is spread over a few frames instead of causing
+a spike.
+"""
+
+import itertools
+import math
+from typing import TYPE_CHECKING
+
+from enemy_types import formation_types
+
+# Type checking is used to avoid circular imports.
+if TYPE_CHECKING:
+    from settings import Settings
+    from white_walker_army import WhiteWalkerArmy
+
+# Spawn marking the end of a level's waves (compared by identity).
+LEVEL_UP = (0, None, None)
+
+def column(kind: str, rows, delay: int = 0):
+    """Yield one walker on each of `rows`, all entering in the same frame."""
+
+    for row in rows:
+        yield delay, row, kind
+        delay = 0
+
+def staircase(kind: str, rows, spacing: int):
+    """Yield one walker on each of `rows`, `spacing` frames apart."""
+
+    for row in rows:
+        yield spacing, row, kind
+
+def train(kind: str, row: int, count: int, spacing: int):
+    """Yield `count` walkers one behind the other on a row."""
+
+    return staircase(kind, itertools.repeat(row, count), spacing)
+
+def pause(frames: int):
+    """Yield a wait of `frames` frames without a walker."""
+
+    yield frames, None, None
+
+def repeat(make_wave, times: int):
+    """Yield the spawns of `times` waves, each made by calling `make_wave()`."""
+
+    for _ in range(times):
+        yield from make_wave()
+
+def level_waves(settings: 'Settings', level: int, num_rows: int):
+    """Yield the spawns of one level's waves.
+
+    Each wave is made of one of the level's enemy types (from
+    `settings.enemy_formations`). Walkers one behind the other enter a
+    walker width apart, so later levels get longer waves rather than
+    denser ones, with shorter pauses in between.
+
+    Args:
+        settings (Settings): Game settings for the wave sizes and speeds.
+        level (int): Level, starting at 1.
+        num_rows (int): Number of rows of the grid.
+
+    Yields:
+        tuple[int, int | None, str | None]: Spawns, as described in the module docstring.
+    """
+
+    kinds = formation_types(settings, level)
+    rows = range(num_rows)
+    length = 2 + level // 2 # Columns or walkers per row in a wave.
+    for wave in range(settings.waves_per_level):
+        kind = kinds[wave % len(kinds)]
+        speed = settings.stream_speed * settings.enemy_types[kind][2]
+        spacing = math.ceil(settings.walker_width / speed) # Frames to walk a walker width.
+        shape = (level + wave) % 3
+        if shape == 0:
+            # Full columns, one behind the other.
+            yield from repeat(lambda: column(kind, rows, spacing), length)
+        elif shape == 1:
+            # Down the rows and back up, a walker on each.
+            yield from staircase(kind, itertools.chain(rows, reversed(rows[:-1])),
+                                 spacing // 2)
+        else:
+            # A checkerboard: every other row, then the rows in between.
+            yield from repeat(lambda: itertools.chain(column(kind, rows[::2], spacing),
+                                                      column(kind, rows[1::2], spacing)),
+                              length)
+        yield from pause(max(settings.wave_pause // 3,
+                             settings.wave_pause - 15 * (level - 1)))
+
+def endless_waves(settings: 'Settings', num_rows: int, level: int = 1):
+    """Yield the spawns of every level from `level` on, with LEVEL_UP after each.
+
+    Args:
+        settings (Settings): Game settings for the wave sizes and speeds.
+        num_rows (int): Number of rows of the grid.
+        level (int): Level to start at.
+    """
+
+    for level in itertools.count(level):
+        yield from level_waves(settings, level, num_rows)
+        yield LEVEL_UP
+
+class WaveSpawner:
+    """Creates the walkers of the endless waves as they become due.
+
+    Attributes:
+        army (WhiteWalkerArmy): The army the walkers are added to.
+        settings (Settings): Game settings for the waves and the spawn cap.
+        num_rows (int): Number of rows of the grid.
+        waves (Iterator[tuple]): The spawns still to come.
+        level_ups (int): Levels whose waves have all been sent and that the
+            game has not leveled up for yet.
+        spawned (int): Walkers created in the last frame.
+    """
+
+    def __init__(self, army: 'WhiteWalkerArmy', num_rows: int):
+        """Start the waves at the current difficulty level.
+
+        Args:
+            army (WhiteWalkerArmy): The army the walkers are added to.
+            num_rows (int): Number of rows of the grid.
+        """
+
+        self.army = army
+        self.settings = army.settings
+        self.num_rows = num_rows
+        self.restart(self.settings.difficulty_level)
+
+    def restart(self, level: int):
+        """Start the waves over from the first wave of `level`."""
+
+        self.waves = endless_waves(self.settings, self.num_rows, level)
+        self.level_ups = 0
+        self.spawned = 0
+        self._next = next(self.waves)
+        self._wait = self._next[0] # Frames until the next spawn is due.
+
+    def update(self):
+        """Advance one frame and create the walkers that are due."""
+
+        self._wait -= 1
+        self.spawned = 0
+        while self._wait <= 0:
+            _, row, kind = self._next
+            if self._next is LEVEL_UP:
+                self.level_ups += 1
+            elif kind is not None:
+                if self.spawned == self.settings.spawns_per_frame:
+                    break # The other due walkers enter in the next frames.
+                self.army.spawn_walker(row, kind, -self._wait)
+                self.spawned += 1
+            self._next = next(self.waves)
+            self._wait += self._next[0]
@@ -1,10 +1,10 @@
-import pygame
 from pygame.sprite import Sprite
 from typing import TYPE_CHECKING
 
 # Type checking is used to avoid circular imports.
 if TYPE_CHECKING:
     from white_walker_army import WhiteWalkerArmy
+    from enemy_types import EnemyType
 
 class Walker(Sprite):
     """A class to represent a single White Walker (enemy).
@@ -12,26 +12,39 @@ class Walker(Sprite):
     Each Walker is a sprite that belongs to a WhiteWalkerArmy. Walkers
     are positioned in a grid and move vertically up and down according
     to the army's direction, with occasional horizontal drops toward
-    the left side of the screen.
+    the left side of the screen. In endless mode they also walk toward
+    the dragon every frame. The army moves the walkers of each enemy type
+    with one plain loop (see `WhiteWalkerArmy._move_batches`). Its enemy
+    type (see enemy_types.py) gives it its image, hit points, drop speed
+    and points.
 
     Attributes:
         army (WhiteWalkerArmy): The army instance that owns this walker.
         screen (pygame.Surface): The game's display surface.
         boundaries (pygame.Rect): Rect representing the screen boundaries.
         settings (Settings): Game settings for walker speed and sprite size.
-        image (pygame.Surface): Loaded and scaled walker sprite image.
+        kind (EnemyType): The walker's enemy type.
+        image (pygame.Surface): The type's scaled sprite image.
+        hit_points (int): Hits left before the walker is destroyed.
         rect (pygame.Rect): Rectangular area representing the walker's position.
         x (float): Horizontal position stored as a float.
         y (float): Vertical position stored as a float for smooth movement.
+        row (int): Row of the formation the walker is in (see `WhiteWalkerArmy.index_rows`).
+        start_x, start_y (float): Position at the start of the path since the
+            last collision check (used by swept collisions).
+        start_frame (int): Frame number the path starts at.
     """
     
-    def __init__(self, army: 'WhiteWalkerArmy', x: float, y: float):
+    def __init__(self, army: 'WhiteWalkerArmy', x: float, y: float,
+                 kind: 'EnemyType' = None):
         """Initialize the walker and set its starting position.
 
         Args:
             army (WhiteWalkerArmy): The White Walker army that this walker belongs to.
             x (float): Initial x-coordinate for the walker.
             y (float): Initial y-coordinate for the walker.
+            kind (EnemyType): The walker's enemy type (defaults to the
+                army's first type).
         """
         
         super().__init__() # Initialize the Sprite parent class.
@@ -40,10 +53,10 @@ class Walker(Sprite):
         self.boundaries = army.game.screen.get_rect()
         self.settings = army.game.settings
 
-        # Load and scale the walker image.
-        self.image = pygame.image.load(self.settings.walker_file)
-        self.image = pygame.transform.scale(self.image,
-            (self.settings.walker_width, self.settings.walker_height))
+        # The scaled image, shared by all walkers of the type.
+        self.kind = kind or next(iter(army.enemy_types.values()))
+        self.image = self.kind.image
+        self.hit_points = self.kind.hit_points
         
         self.rect = self.image.get_rect() # Get the rectangular area of the image.
         
@@ -54,25 +67,14 @@ class Walker(Sprite):
         # Store coordinates as floats for smooth movement.
         self.x = float(self.rect.x)
         self.y = float(self.rect.y)
+        self.row = 0
+        self.reset_path(army.game.frame_number)
 
-    def update(self):
-        """Move the walker vertically based on the army's direction.
+    def reset_path(self, frame: int):
+        """Start the walker's path for swept collisions where it is now."""
 
-        The walker's vertical position (y) is updated using the army's
-        `army_direction` and the configured `army_speed`. The rect is then
-        updated from the float coordinates.
-        """
-        
-        temp_speed = self.settings.army_speed
-
-        # Update the y-coordinate by adding (speed * direction).
-        # Direction is 1 for down, -1 for up.
-        self.y += temp_speed * self.army.army_direction
-        
-        # Update the rectangle's position from the float coordinates.
-        self.rect.y = self.y
-        # Note: self.x remains constant during vertical movement.
-        self.rect.x = self.x
+        self.start_x, self.start_y = self.x, self.y
+        self.start_frame = frame
 
     def check_edges(self):
         """Check if the walker has reached the top or bottom edge.
@@ -1,11 +1,19 @@
+import bisect
+import itertools
+import numpy as np
 import pygame
 from white_walker import Walker
+from ice_shots import IceShots
+from enemy_types import load_enemy_types, formation_types
+from waves import WaveSpawner
 
 from typing import TYPE_CHECKING
 
 # Type checking is used to avoid circular imports.
 if TYPE_CHECKING:
     from alien_invasion import WhiteWalkerInvasion
+    from arsenal import DragonArsenal
+    from enemy_types import EnemyType
 
 class WhiteWalkerArmy:
     """A class to manage the army of white walkers.
@@ -13,14 +21,31 @@ class WhiteWalkerArmy:
     The WhiteWalkerArmy class is responsible for creating the enemy
     formation, updating their movement, detecting edge collisions,
     handling drops toward the dragon, and checking for collisions with
-    projectiles and critical boundaries.
+    projectiles and critical boundaries. The formation's columns are made
+    of the enemy types the level's pattern lists (see enemy_types.py). In
+    endless mode there is no formation: the walkers stream in from the
+    right edge in waves (see waves.py), on the rows of the formation's grid.
 
     Attributes:
         game (WhiteWalkerInvasion): Reference to the main game instance.
         settings (Settings): Game settings used for army speed and size.
         army (pygame.sprite.Group): Group containing all active Walker sprites.
+        enemy_types (dict[str, EnemyType]): The enemy types, by name.
+        batches (dict[str, pygame.sprite.Group]): The walkers of each enemy
+            type, drawn together with the type's shared image.
         army_direction (int): Vertical direction of movement (1 for down, -1 for up).
         army_drop_speed (float): Amount to move horizontally toward the dragon on a drop.
+        dropped (bool): Whether the army dropped on its last update.
+        ice_shots (IceShots): Ice shots fired by the walkers at the dragon.
+        rows (list[list[Walker]]): Walkers of each formation row, sorted by x,
+            used to find beam hits without testing every walker.
+        grid_top (float): Top of the formation's grid of rows, which moves
+            with the walkers.
+        grid_rows (int): Number of rows of the grid.
+        spawner (WaveSpawner | None): Creates the walkers in endless mode,
+            None in levels mode.
+        stream_speed (float): Pixels per frame walkers walk toward the
+            dragon, times their type's speed (0 in levels mode).
     """
    
     def __init__(self, game: 'WhiteWalkerInvasion'):
@@ -35,10 +60,28 @@ class WhiteWalkerArmy:
       
        # A Sprite Group to hold all active White Walker sprites.
         self.army = pygame.sprite.Group()
+        # The enemy types, and a group of the walkers of each type.
+        self.enemy_types = load_enemy_types(self.settings, game.tracer)
+        self.batches = {name: pygame.sprite.Group() for name in self.enemy_types}
       
        # 1 for down, -1 for up, controls vertical movement.
         self.army_direction = self.settings.army_direction
         self.army_drop_speed = self.settings.army_drop_speed
+        self.dropped = False
+        self.ice_shots = IceShots(game)
+        self.rows = []
+        self.grid_top = 0.0
+        self.grid_rows = 0
+
+        # In endless mode, walkers come from a wave spawner instead of a formation.
+        self.spawner = None
+        self.stream_speed = 0.0
+        if game.game_mode == 'endless':
+            settings = self.settings
+            num_rows, _ = self.calc_army_size(settings.walker_height, settings.screen_height,
+                                              settings.walker_width, settings.screen_width)
+            self.spawner = WaveSpawner(self, num_rows)
+            self.stream_speed = settings.stream_speed
 
         self.create_army() 
 
@@ -48,7 +91,9 @@ class WhiteWalkerArmy:
         This method calculates how many walkers fit in the right half of the
         screen (both vertically and horizontally), computes appropriate offsets
         to center the formation vertically and align it on the right side, and
-        then creates and positions walker sprites in a grid.
+        then creates and positions walker sprites in a grid, with the
+        columns' enemy types from the pattern of the current difficulty level.
+        In endless mode only the grid is reset, and the spawner fills it.
         """
         
         walker_height = self.settings.walker_height
@@ -61,11 +106,95 @@ class WhiteWalkerArmy:
         
         # Calculate the starting (x, y) coordinates for the top-left walker.
         y_offset, x_offset = self.calc_offsets(walker_height, screen_height, walker_width, screen_width, army_height, army_width)
+        self.grid_top = float(y_offset)
+        self.grid_rows = army_height
+        if self.spawner is not None:
+            self.rows = [[] for _ in range(army_height)]
+            return
         
         # Populate the army based on the calculated formation.
-        self._army_formation(walker_height, walker_width, army_height, army_width, y_offset, x_offset)
+        column_types = formation_types(self.settings, self.settings.difficulty_level)
+        self._army_formation(walker_height, walker_width, army_height, army_width, y_offset,
+                             x_offset, column_types)
+        self.index_rows()
+
+    def index_rows(self):
+        """Build the row index of the formation used to resolve beam hits.
+
+        Walkers in a row share their y and move together, so each row's
+        walkers are sorted by x once. Each walker's row is found from its
+        position in the grid (`grid_top`). Enemy types drop and walk at
+        different speeds, so drops (see `_drop_white_walker_army`) and, in
+        endless mode, every frame re-sort the rows.
+        """
+
+        walker_height = self.settings.walker_height
+        self.rows = [[] for _ in range(self.grid_rows)]
+        walker: Walker
+        for walker in sorted(self.army.sprites(), key=lambda walker: walker.x):
+            walker.row = round((walker.y - self.grid_top) / walker_height)
+            self.rows[walker.row].append(walker)
+
+    def first_walker_on_ray(self, origin: tuple):
+        """Find the first walker hit by a ray going right from `origin`.
+
+        The row is computed from the ray's y, then a binary search over the
+        sorted x positions of that row finds the first walker whose right
+        edge is past the origin.
+
+        Args:
+            origin (tuple[int, int]): Point the ray starts from.
+
+        Returns:
+            Walker | None: The walker hit, or None if the ray hits nothing.
+        """
 
-    def _army_formation(self, walker_height, walker_width, army_height, army_width, y_offset, x_offset):
+        walker_height = self.settings.walker_height
+        # The top of the formation, from any walker and its row.
+        top = next((row[0].rect.y - row[0].row * walker_height
+                    for row in self.rows if row), None)
+        if top is None:
+            return None
+        x, y = origin
+        row = (y - top) // walker_height
+        if not 0 <= row < len(self.rows):
+            return None
+        walkers = self.rows[row]
+        index = bisect.bisect_right(walkers, x, key=lambda walker: walker.rect.right)
+        return walkers[index] if index < len(walkers) else None
+
+    def check_beam(self, arsenal: 'DragonArsenal'):
+        """Resolve a beam fired by the dragon against the army.
+
+        The first walker on the beam's ray is destroyed, and the beam is
+        shown up to it (or across the screen if it hits nothing).
+
+        Args:
+            arsenal (DragonArsenal): The dragon's arsenal, which may have a
+                beam pending.
+
+        Returns:
+            dict: The destroyed walker mapped to the beam, like
+            `check_collisions` (empty if no walker was destroyed).
+        """
+
+        if not arsenal.beam_pending:
+            return {}
+        origin = self.game.dragon.rect.midright
+        walker = self.first_walker_on_ray(origin)
+        if walker is None:
+            arsenal.show_beam(origin, self.settings.screen_width)
+            return {}
+        arsenal.show_beam(origin, walker.rect.centerx)
+        walker.hit_points -= 1
+        if walker.hit_points > 0:
+            return {} # The walker survives the hit.
+        walker.kill()
+        self.rows[walker.row].remove(walker)
+        return {walker: [arsenal.beam_rect]}
+
+    def _army_formation(self, walker_height, walker_width, army_height, army_width, y_offset,
+                        x_offset, column_types=('walker',)):
         """Create and position individual walkers in a grid formation.
 
         Args:
@@ -75,20 +204,25 @@ class WhiteWalkerArmy:
             army_width (int): Number of columns in the formation.
             y_offset (int): Starting y offset to vertically center the army.
             x_offset (int): Starting x offset to place the army on the right side.
+            column_types (tuple[str, ...]): Enemy types of the columns from the
+                front (left) back, repeated over all columns.
 
         Returns:
             None
         """
         
         for column in range(army_width):
+            # Every walker in a column is of the same type.
+            kind = self.enemy_types[column_types[column % len(column_types)]]
             for row in range(army_height):
                 # Calculate the y-coordinate for the current walker
                 current_y = walker_height * row + y_offset
                 # Calculate the x-coordinate for the current walker
                 current_x = walker_width * column + x_offset
-                self._create_walker(current_x, current_y)
+                self._create_walker(current_x, current_y, kind)
 
-    def calc_offsets(self, walker_height, screen_height, walker_width, screen_width, army_height, army_width):
+    @staticmethod
+    def calc_offsets(walker_height, screen_height, walker_width, screen_width, army_height, army_width):
         """Calculate offsets to center the army vertically and place it on the right.
 
         This method computes:
@@ -124,7 +258,8 @@ class WhiteWalkerArmy:
         return y_offset, x_offset
 
 
-    def calc_army_size(self, walker_height, screen_height, walker_width, screen_width):
+    @staticmethod
+    def calc_army_size(walker_height, screen_height, walker_width, screen_width):
         """Calculate the maximum number of rows and columns that fit on the screen.
 
         The army is constrained to the right half of the screen horizontally.
@@ -163,100 +298,309 @@ class WhiteWalkerArmy:
         return int(army_height), int(army_width)
 
     
-    def _create_walker(self, current_x: int, current_y: int):
+    def _create_walker(self, current_x: int, current_y: int, kind: 'EnemyType' = None):
         """Create a single Walker instance and add it to the army group.
 
         Args:
             current_x (int): X-coordinate of the new walker's position.
             current_y (int): Y-coordinate of the new walker's position.
+            kind (EnemyType): The walker's enemy type.
 
         Returns:
             None
         """
        
-        new_walker = Walker(self, current_x, current_y)
-        self.army.add(new_walker)
+        self.add_walkers(Walker(self, current_x, current_y, kind))
+
+    def spawn_walker(self, row: int, kind_name: str, late: int = 0):
+        """Create a walker entering from the right edge on a row of the grid.
+
+        Args:
+            row (int): Row of the grid the walker enters on.
+            kind_name (str): Name of the walker's enemy type.
+            late (int): Frames the walker was held back by the spawn cap; it
+                enters as far left as it would have walked in that time.
+        """
+
+        kind = self.enemy_types[kind_name]
+        x = self.settings.screen_width - late * self.stream_speed * kind.speed
+        y = self.grid_top + row * self.settings.walker_height
+        walker = Walker(self, x, y, kind)
+        walker.x, walker.y = x, y
+        walker.reset_path(self.game.frame_number)
+        walker.row = row
+        self.add_walkers(walker)
+        bisect.insort(self.rows[row], walker, key=lambda walker: walker.x)
+
+    def add_walkers(self, *walkers: Walker):
+        """Add walkers to the army and to the batches of their types."""
+
+        self.army.add(*walkers)
+        for walker in walkers:
+            self.batches[walker.kind.name].add(walker)
+
+    def empty(self):
+        """Remove every walker from the army and the batches."""
+
+        self.army.empty()
+        for batch in self.batches.values():
+            batch.empty()
     
     def _check_army_edges(self):
         """Check if any walker has reached a vertical edge and trigger a drop.
 
         If any walker reaches the top or bottom of the screen, the entire
         army is moved horizontally left (toward the dragon) and the vertical
-        direction (`army_direction`) is reversed.
+        direction (`army_direction`) is reversed. In endless mode the whole
+        grid bounces instead, so walkers can enter on any row at any time.
 
         Returns:
             None
         """
         
-        walker: Walker
-        for walker in self.army:
-            if walker.check_edges():
-                #Moving the army toward the dragon.
-                self._drop_white_walker_army() 
-                
-                # Reverse the vertical movement direction (up/down).
-                self.army_direction *= -1 
-                break # Only need to drop once per direction change.
+        self.dropped = self.at_edge()
+        if self.dropped:
+            #Moving the army toward the dragon.
+            self._drop_white_walker_army() 
+            
+            # Reverse the vertical movement direction (up/down).
+            self.army_direction *= -1 
+
+    def at_edge(self):
+        """Return True if the army drops and turns around on its next update."""
+
+        if self.spawner is not None:
+            bottom = self.grid_top + self.grid_rows * self.settings.walker_height
+            return bottom >= self.settings.screen_height or self.grid_top <= 0
+        # Only need to find one walker at an edge.
+        return any(walker.check_edges() for walker in self.army)
    
     def _drop_white_walker_army(self):
         """Move every walker horizontally towards the left side of the screen.
 
         This method decreases each walker's x-coordinate by the configured
-        `army_drop_speed`, effectively dropping the army closer to the dragon.
+        `army_drop_speed`, times its enemy type's speed, effectively dropping
+        the army closer to the dragon. A faster type can pass a slower one,
+        so the rows of the beam's index are sorted again (nearly sorted
+        lists sort in linear time).
 
         Returns:
             None
         """
         
-        for walker in self.army:
-            walker.x -= self.army_drop_speed
+        for batch_name, batch in self.batches.items():
+            drop = self.army_drop_speed * self.enemy_types[batch_name].speed
+            for walker in batch:
+                walker.x -= drop
+        for row in self.rows:
+            row.sort(key=lambda walker: walker.x)
+
+
+    def _move_batches(self):
+        """Move every walker by one frame, one enemy type at a time.
+
+        Every walker moves vertically by `army_speed` in the army's
+        direction, and all walkers of a type walk toward the dragon by the
+        same step (the army's `stream_speed`, 0 outside endless mode, times
+        the type's speed). So each type's step is worked out once, and its
+        walkers are moved by one Python loop, with their rects updated from
+        the float coordinates.
+
+        This is deliberately not vectorized. Keeping each type's positions
+        in NumPy arrays (as vector_env.py does) makes the step one array
+        operation, but every walker's rect must still be written back, and
+        that alone costs as much as this loop. Measured, the arrays were
+        slower at every army size: 24 vs 7 us for 45 walkers, 455 vs 304 us
+        for 2000. The vectorized rules live in VectorWhiteWalkerEnv.
+        """
 
+        dy = self.settings.army_speed * self.army_direction
+        for batch_name, batch in self.batches.items():
+            dx = self.stream_speed * self.enemy_types[batch_name].speed
+            for walker in batch:
+                walker.y += dy
+                walker.x -= dx
+                walker.rect.y = walker.y
+                walker.rect.x = walker.x
 
     def update_army(self):
         """Update the army's movement and position.
 
         This method checks whether the army has hit a vertical edge (and needs
-        to drop and reverse direction), and then updates the position of each
-        walker sprite in the army group.
+        to drop and reverse direction), and then moves the walkers of each
+        enemy type with one loop (see `_move_batches`). In endless mode, the walkers that
+        are due enter next. Then the ice shots in flight move and the front
+        walkers fire new ones when a volley is due.
 
         Returns:
             None
         """
         
         self._check_army_edges() # Check if vertical movement needs to be reversed and dropped.
-        self.army.update() # Call the update method for every walker in the group.
+        self.grid_top += self.settings.army_speed * self.army_direction
+        self._move_batches()
+        if self.spawner is not None:
+            # Types walk at different speeds, so keep the rows sorted by x.
+            for row in self.rows:
+                row.sort(key=lambda walker: walker.x)
+            self.spawner.update() # Let in the walkers that are due.
+        self.ice_shots.update() # Move the ice shots and drop those off screen.
+        self.ice_shots.fire(self) # Fire a volley at the dragon if one is due.
 
     def draw(self):
         """Draw all walkers to the screen.
 
-        Iterates over each walker in the army group and calls its draw
-        method to render it on the game's display surface.
+        Each enemy type's walkers are drawn with one `blits` call of the
+        type's shared image, then the ice shots are drawn in one batch.
         """
         
-        walker: 'Walker'
-        for walker in self.army:
-            walker.draw_walker()
+        screen = self.game.screen
+        for batch_name, batch in self.batches.items():
+            image = self.enemy_types[batch_name].image
+            screen.blits(zip(itertools.repeat(image), (walker.rect for walker in batch)),
+                         doreturn=False)
+        self.ice_shots.draw(screen)
     
     def check_collisions(self, other_group):
         """Check for collisions between walkers and a given projectile group.
 
         This method uses `pygame.sprite.groupcollide` to detect collisions
         between the army and another group (typically the dragon's elements).
-        Colliding walkers and projectiles are removed from their groups.
+        Colliding projectiles are removed from their group, and each costs
+        the walker it hit one hit point; walkers without hit points left are
+        removed from the army. In swept collision mode, the projectiles' and
+        walkers' paths since the last check are tested instead (see
+        `_check_swept_collisions`).
 
         Args:
             other_group (pygame.sprite.Group): Group of projectiles to check
                 collisions against.
 
         Returns:
-            dict: A mapping from walker sprites to lists of collided projectiles.
+            dict: A mapping from destroyed walker sprites to lists of
+            collided projectiles.
         """
         
+        if self.game.collision_mode == 'swept':
+            return self._check_swept_collisions(other_group)
+
         # Checks for collisions:
-        # True: remove the walker from the army group upon collision.
+        # False: keep the walker in the army group, it may have hit points left.
         # True: remove the projectile from the "other_group" upon collision.
-        return pygame.sprite.groupcollide(self.army, other_group, True, True)
+        collisions = pygame.sprite.groupcollide(self.army, other_group, False, True)
+        destroyed = {}
+        for walker, projectiles in collisions.items():
+            walker.hit_points -= len(projectiles)
+            if walker.hit_points <= 0:
+                walker.kill()
+                self.rows[walker.row].remove(walker) # Keep the row index current.
+                destroyed[walker] = projectiles
+        return destroyed
     
+    def _check_swept_collisions(self, other_group):
+        """Check for collisions along the paths since the last check.
+
+        Every projectile and walker moved in a straight line since the
+        last check (or since it appeared), from its start position to its
+        current one; a projectile that left the screen stops where it left.
+        All projectile-walker pairs are tested at once with NumPy: on each
+        axis, the times their rects overlap follow from their relative
+        velocity (the slab test for moving AABBs), and a pair collides if
+        those times overlap within the time both existed. The contacts are
+        then resolved in time order, so a projectile hits the first walker
+        on its path, and a walker destroyed by an earlier contact lets later
+        projectiles through. Since only the order of contacts matters, the
+        same hits happen however many frames pass between checks.
+
+        Args:
+            other_group (pygame.sprite.Group): Group of projectiles (Elements)
+                to check collisions against.
+
+        Returns:
+            dict: A mapping from destroyed walker sprites to lists of
+            collided projectiles, like the discrete check.
+        """
+
+        frame = self.game.frame_number
+        walkers = self.army.sprites()
+        projectiles = other_group.sprites()
+        destroyed = {}
+        # Walkers only ever move toward the dragon, so no path reaches further
+        # left than the front walker of a row: projectiles short of it hit nothing.
+        front = min((row[0].x for row in self.rows if row), default=None)
+        if front is not None and any(p.x + p.rect.width > front for p in projectiles):
+            for time, walker_index, projectile_index in self._swept_contacts(
+                    walkers, projectiles, frame):
+                walker, projectile = walkers[walker_index], projectiles[projectile_index]
+                if walker.hit_points <= 0 or not projectile.alive():
+                    continue # Destroyed by an earlier contact.
+                projectile.kill()
+                walker.hit_points -= 1
+                if walker.hit_points <= 0:
+                    walker.kill()
+                    self.rows[walker.row].remove(walker) # Keep the row index current.
+                    destroyed[walker] = [projectile]
+
+        # The next paths start here.
+        for walker in self.army:
+            walker.reset_path(frame)
+        for projectile in other_group.sprites():
+            if projectile.end_frame is not None:
+                projectile.kill() # Left the screen without hitting anything.
+            else:
+                projectile.reset_path(frame)
+        return destroyed
+
+    @staticmethod
+    def _swept_contacts(walkers: list, projectiles: list, frame: int):
+        """Find every projectile-walker pair whose paths collide.
+
+        Args:
+            walkers (list[Walker]): The walkers, in army order.
+            projectiles (list[Element]): The projectiles, in group order.
+            frame (int): Frame number the paths end at.
+
+        Returns:
+            list[tuple[float, int, int]]: (time of contact, walker index,
+            projectile index) of each colliding pair, sorted by time, then
+            by walker and projectile order.
+        """
+
+        # Each path as (start frame, end frame, start x, start y, x, y, width, height).
+        a = np.array([(p.start_frame, frame if p.end_frame is None else p.end_frame,
+                       p.start_x, p.rect.y, p.x, p.rect.y, p.rect.width, p.rect.height)
+                      for p in projectiles], float)
+        b = np.array([(w.start_frame, frame, w.start_x, w.start_y, w.x, w.y,
+                       w.rect.width, w.rect.height) for w in walkers], float)
+
+        # Velocities per frame, as (axis, projectile, walker) arrays.
+        a_v = ((a[:, 4:6] - a[:, 2:4]) / np.maximum(a[:, 1:2] - a[:, :1], 1)).T[:, :, None]
+        b_v = ((b[:, 4:6] - b[:, 2:4]) / np.maximum(b[:, 1:2] - b[:, :1], 1)).T[:, None, :]
+        # Each pair is tested from when both exist (start) until one is gone.
+        a_start, b_start = a[:, :1], b[:, 0]
+        start = np.maximum(a_start, b_start)
+        duration = np.minimum(a[:, 1:2], b[:, 1]) - start
+        a_pos = a[:, 2:4].T[:, :, None] + a_v * (start - a_start)
+        b_pos = b[:, 2:4].T[:, None, :] + b_v * (start - b_start)
+
+        # Times (from `start`) each axis overlaps, for the projectile moving
+        # relative to the walker. Without relative motion on an axis, the
+        # division gives -inf and inf if the pair overlaps there, and
+        # infinities of the same sign (or NaN, if the edges touch) if it never does.
+        velocity = a_v - b_v
+        with np.errstate(divide='ignore', invalid='ignore'):
+            near = (b_pos - a_pos - a[:, 6:8].T[:, :, None]) / velocity
+            far = (b_pos + b[:, 6:8].T[:, None, :] - a_pos) / velocity
+        enter = np.minimum(near, far).max(axis=0)
+        leave = np.maximum(near, far).min(axis=0)
+        hit = (duration >= 0) & (enter < leave) & (enter < duration) & (leave > 0)
+
+        projectile_index, walker_index = np.nonzero(hit)
+        times = (start + np.maximum(enter, 0))[projectile_index, walker_index]
+        order = np.lexsort((projectile_index, walker_index, times))
+        return list(zip(times[order].tolist(), walker_index[order].tolist(),
+                        projectile_index[order].tolist()))
+
     def check_left_edge(self):
         """Check if any walker has moved past the critical left edge.
 
@@ -280,10 +624,18 @@ class WhiteWalkerArmy:
         """Return True if the army group is empty (all walkers destroyed).
 
         The army is considered destroyed when the sprite group is empty.
+        In endless mode, the army is never empty for good; instead this
+        returns True once for every level whose waves have all been sent.
 
         Returns:
             bool: True if no walkers remain, False otherwise.
         """
         
+        if self.spawner is not None:
+            if not self.spawner.level_ups:
+                return False
+            self.spawner.level_ups -= 1
+            return True
+
         # An empty sprite group evaluates to False in a boolean context.
-        return not self.army
\ No newline at end of file
+        return not self.army